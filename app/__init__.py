@@ -2,15 +2,20 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
 import os
+from .utils.cache import VersionedLRUCache, TTLCache
+from .utils import dbtuning, dbrouting, instrumentation
+from .utils.security import DEFAULT_ROUNDS, PasswordVerifier, configure_hashing
 
 load_dotenv()
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": dbrouting.RoutingSession})
 jwt = JWTManager()
 
 
-def create_app(testing: bool = False):
+def create_app(testing: bool = False, background: bool = True):
+    """Fábrica de la app. background=False no arranca hilos (servidor pre-fork: van en cada worker)."""
     app = Flask(__name__, instance_relative_config=True)
 
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-key")
@@ -20,24 +25,145 @@ def create_app(testing: bool = False):
     else:
         app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL", "sqlite:///lms.db")
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["DB_PROFILE"] = os.getenv("DB_PROFILE", "default")
+    db_settings = dbtuning.load_settings(app.config["DB_PROFILE"])
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = dbtuning.engine_options(app.config["SQLALCHEMY_DATABASE_URI"], db_settings)
+    # réplica de lectura para los GET (ver utils/dbrouting.py); sin configurar todo va al primario
+    replica = dbrouting.replica_url(app.config["SQLALCHEMY_DATABASE_URI"], os.getenv("DATABASE_REPLICA_URL"),
+                                    os.getenv("DB_READ_POOL", "0") == "1")
+    if replica:
+        app.config["SQLALCHEMY_BINDS"] = {dbrouting.BIND: replica}
+    app.config["DB_READ_STICKY_SECONDS"] = float(os.getenv("DB_READ_STICKY_SECONDS", "5"))
+    app.config["ANSWER_KEY_CACHE_SIZE"] = int(os.getenv("ANSWER_KEY_CACHE_SIZE", "256"))
+    app.config["LESSON_CACHE_SIZE"] = int(os.getenv("LESSON_CACHE_SIZE", "1024"))
+    app.config["CATALOG_TOTAL_TTL"] = float(os.getenv("CATALOG_TOTAL_TTL", "30"))
+    # en tests se baja el costo del hash para que la suite no pase el tiempo en PBKDF2
+    app.config["PASSWORD_HASH_ROUNDS"] = int(os.getenv("PASSWORD_HASH_ROUNDS", "1000" if testing else str(DEFAULT_ROUNDS)))
+    app.config["AUTH_VERIFY_WORKERS"] = int(os.getenv("AUTH_VERIFY_WORKERS", str(os.cpu_count() or 2)))
+    app.config["AUTH_VERIFY_QUEUE"] = int(os.getenv("AUTH_VERIFY_QUEUE", "32"))
+    app.config["AUTH_VERIFY_TIMEOUT"] = float(os.getenv("AUTH_VERIFY_TIMEOUT", "5"))
+    app.config["IDENTITY_CACHE_TTL"] = float(os.getenv("IDENTITY_CACHE_TTL", "30"))
+    app.config["ANALYTICS_CACHE_SIZE"] = int(os.getenv("ANALYTICS_CACHE_SIZE", "128"))
+    app.config["COURSE_OWNER_CACHE_SIZE"] = int(os.getenv("COURSE_OWNER_CACHE_SIZE", "4096"))
+    app.config["SNAPSHOT_IMPORT_MAX_LINES"] = int(os.getenv("SNAPSHOT_IMPORT_MAX_LINES", "200000"))
+    app.config["RESPONSE_CACHE_SIZE"] = int(os.getenv("RESPONSE_CACHE_SIZE", "0"))  # 0 = sin caché de respuestas
+    app.config["MIGRATE_ON_START"] = os.getenv("MIGRATE_ON_START", "1") == "1"
+    app.config["ATTEMPT_GRACE_SECONDS"] = int(os.getenv("ATTEMPT_GRACE_SECONDS", "30"))
+    app.config["ATTEMPT_SWEEP_INTERVAL"] = float(os.getenv("ATTEMPT_SWEEP_INTERVAL", "0" if testing else "60"))  # 0 = sin hilo
+    app.config["ATTEMPT_SWEEP_BATCH"] = int(os.getenv("ATTEMPT_SWEEP_BATCH", "500"))
+    app.config["SUBMIT_MODE"] = os.getenv("SUBMIT_MODE", "sync")  # sync | queue
+    app.config["SUBMIT_WORKERS"] = int(os.getenv("SUBMIT_WORKERS", "0" if testing else "2"))  # 0 = sin hilos
+    app.config["SUBMIT_BATCH"] = int(os.getenv("SUBMIT_BATCH", "100"))
+    app.config["SUBMIT_POLL_INTERVAL"] = float(os.getenv("SUBMIT_POLL_INTERVAL", "0.5"))
+    app.config["SUBMIT_CLAIM_TIMEOUT"] = float(os.getenv("SUBMIT_CLAIM_TIMEOUT", "60"))
+    app.config["PROGRESS_FLUSH_INTERVAL"] = float(os.getenv("PROGRESS_FLUSH_INTERVAL", "0" if testing else "2"))  # 0 = sin hilo
+    app.config["PROGRESS_FLUSH_MAX"] = int(os.getenv("PROGRESS_FLUSH_MAX", "500"))
+    # servidor de producción (python serve.py); los workers por defecto escalan con los núcleos
+    app.config["WEB_HOST"] = os.getenv("WEB_HOST", "0.0.0.0")
+    app.config["WEB_PORT"] = int(os.getenv("WEB_PORT", "8000"))
+    app.config["WEB_WORKERS"] = int(os.getenv("WEB_WORKERS", str(os.cpu_count() or 2)))
+    app.config["WEB_THREADS"] = int(os.getenv("WEB_THREADS", "8"))
+    app.config["WEB_KEEPALIVE"] = float(os.getenv("WEB_KEEPALIVE", "5"))
+    app.config["WEB_MAX_PENDING"] = int(os.getenv("WEB_MAX_PENDING", "64"))  # conexiones en espera de hilo; más = 503
+    app.config["WEB_GRACEFUL_TIMEOUT"] = float(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+    app.config["WEB_ACCESS_LOG"] = os.getenv("WEB_ACCESS_LOG", "0") == "1"
+    app.config["WARM_QUIZZES"] = int(os.getenv("WARM_QUIZZES", "50"))
+    app.config["WARM_COURSES"] = int(os.getenv("WARM_COURSES", "500"))
+    # 429 + Retry-After en login, búsqueda y entregas (reglas en utils/ratelimit.py; RATE_LIMITS las pisa)
+    app.config["RATE_LIMIT_ENABLED"] = os.getenv("RATE_LIMIT_ENABLED", "0" if testing else "1") == "1"
+    app.config["RATE_LIMIT_BACKEND"] = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    app.config["RATE_LIMITS"] = os.getenv("RATE_LIMITS", "")
+    # proxies propios delante de la app (balanceador, nginx): sin esto la "ip" de todos es la del proxy
+    app.config["TRUSTED_PROXIES"] = int(os.getenv("TRUSTED_PROXIES", "0"))
+    app.config["INSTRUMENTATION"] = os.getenv("INSTRUMENTATION", "1") == "1"
+    app.config["SQL_N_PLUS_ONE_THRESHOLD"] = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "0"))  # 0 = no detectar
 
+    if app.config["TRUSTED_PROXIES"] > 0:
+        # remote_addr/scheme salen de X-Forwarded-For/-Proto, tomando sólo los saltos agregados por ellos
+        n = app.config["TRUSTED_PROXIES"]
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=n, x_proto=n)
     db.init_app(app)
+    dbrouting.init_app(app, db, db_settings)
     jwt.init_app(app)
     CORS(app, resources={r"/api/*": {"origins": "*"}})
+    app.extensions["answer_keys"] = VersionedLRUCache(app.config["ANSWER_KEY_CACHE_SIZE"])
+    app.extensions["lesson_positions"] = VersionedLRUCache(app.config["LESSON_CACHE_SIZE"])
+    app.extensions["catalog_totals"] = TTLCache(ttl=app.config["CATALOG_TOTAL_TTL"])
+    configure_hashing(app.config["PASSWORD_HASH_ROUNDS"])
+    app.extensions["password_verifier"] = PasswordVerifier(workers=app.config["AUTH_VERIFY_WORKERS"],
+                                                           queue=app.config["AUTH_VERIFY_QUEUE"],
+                                                           timeout=app.config["AUTH_VERIFY_TIMEOUT"])
+    app.extensions["identity_cache"] = TTLCache(ttl=app.config["IDENTITY_CACHE_TTL"])
+    app.extensions["course_owners"] = VersionedLRUCache(app.config["COURSE_OWNER_CACHE_SIZE"])
+    app.extensions["quiz_analytics"] = VersionedLRUCache(app.config["ANALYTICS_CACHE_SIZE"])
+    if app.config["RESPONSE_CACHE_SIZE"] > 0:
+        from .utils.httpcache import ResponseCache
+        app.extensions["response_cache"] = ResponseCache(app.config["RESPONSE_CACHE_SIZE"])
 
     from . import models  # noqa
+    from . import migrations
+    from .utils import search, stats, attempts, submissions, progress, authz, ratelimit
     from .routes.auth import bp as auth_bp
     from .routes.courses import bp as courses_bp
     from .routes.quizzes import bp as quizzes_bp
     from .routes.me import bp as me_bp
 
+    authz.init_app(app)
+    ratelimit.init_app(app)
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
     app.register_blueprint(courses_bp, url_prefix="/api/courses")
     app.register_blueprint(quizzes_bp, url_prefix="/api/quizzes")
     app.register_blueprint(me_bp, url_prefix="/api/me")
 
     with app.app_context():
-        db.create_all()
+        dbtuning.install(db.engine, db_settings)
+        if app.config["INSTRUMENTATION"]:
+            instrumentation.init_instrumentation(app, *db.engines.values())
+        if app.config["MIGRATE_ON_START"]:
+            migrations.upgrade()
+        search.init_search(app)
+
+    app.extensions["progress_buffer"] = progress.ProgressBuffer(
+        app, app.config["PROGRESS_FLUSH_INTERVAL"], app.config["PROGRESS_FLUSH_MAX"])
+    if background:
+        start_background(app)
+
+    @app.cli.command("rebuild-search")
+    def rebuild_search():
+        """Regenera el índice FTS5 del catálogo desde cero."""
+        if not search.enabled():
+            print("FTS5 no disponible en este motor")
+            return
+        print(f"indexados {search.rebuild()} cursos")
+
+    @app.cli.command("db-upgrade")
+    def db_upgrade():
+        """Crea tablas nuevas y aplica las migraciones pendientes."""
+        applied = migrations.upgrade()
+        print(f"esquema en v{migrations.current_version()} (aplicadas: {applied or 'ninguna'})")
+
+    @app.cli.command("sweep-attempts")
+    def sweep_attempts():
+        """Cierra (puntaje 0) los intentos vencidos sin entregar."""
+        print(f"cerrados {attempts.sweep(app.config['ATTEMPT_SWEEP_BATCH'])} intentos")
+
+    @app.cli.command("process-submissions")
+    def process_submissions():
+        """Vacía la cola de entregas (SUBMIT_MODE=queue) sin levantar workers."""
+        n = submissions.drain(app.config["SUBMIT_BATCH"], app.config["SUBMIT_CLAIM_TIMEOUT"])
+        print(f"procesadas {n} entregas")
+
+    @app.cli.command("sync-replica")
+    def sync_replica():
+        """Copia el primario SQLite sobre el archivo de DATABASE_REPLICA_URL (pruebas locales)."""
+        print(f"réplica actualizada: {dbrouting.sync_sqlite_replica(db)}")
+
+    @app.cli.command("reconcile-stats")
+    def reconcile_stats():
+        """Reconstruye CursoStats desde Inscripcion/Leccion/IntentoQuiz/Progreso."""
+        n = stats.reconcile()
+        db.session.commit()
+        print(f"reconciliados {n} cursos")
 
     @app.get("/api/health")
     def health():
@@ -47,4 +173,53 @@ def create_app(testing: bool = False):
     def list_routes():
         return sorted([str(r) for r in app.url_map.iter_rules()])
 
+    @app.get("/api/_metrics")
+    def prometheus_metrics():
+        metrics = app.extensions.get("request_metrics")
+        if metrics is None:
+            return {"error": "instrumentación desactivada"}, 404
+        gauges = {f"lms_answer_key_cache_{k}": v for k, v in app.extensions["answer_keys"].stats().items()}
+        body = metrics.render(gauges)
+        if "rate_limiter" in app.extensions:
+            body += app.extensions["rate_limiter"].render()
+        return body, 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+    @app.get("/api/_cache")
+    def cache_stats():
+        out = {"answer_keys": app.extensions["answer_keys"].stats(),
+               "lesson_positions": app.extensions["lesson_positions"].stats()}
+        if "response_cache" in app.extensions:
+            out["responses"] = app.extensions["response_cache"].stats()
+        out["progress"] = app.extensions["progress_buffer"].stats()
+        if "rate_limiter" in app.extensions:
+            out["rate_limit_rejected"] = app.extensions["rate_limiter"].stats()
+        if "db_routing" in app.extensions:
+            out["db_routing"] = app.extensions["db_routing"].stats()
+        return out
+
     return app
+
+
+def start_background(app) -> None:
+    """Hilos de fondo (sweeper, vuelco de progreso, workers de entregas) según la config."""
+    from .utils import attempts, submissions
+    if app.config["ATTEMPT_SWEEP_INTERVAL"] > 0:
+        app.extensions["attempt_sweeper"] = attempts.AttemptSweeper(
+            app, app.config["ATTEMPT_SWEEP_INTERVAL"], app.config["ATTEMPT_SWEEP_BATCH"])
+        app.extensions["attempt_sweeper"].start()
+    if app.config["PROGRESS_FLUSH_INTERVAL"] > 0:
+        app.extensions["progress_buffer"].start()
+    if app.config["SUBMIT_MODE"] == "queue" and app.config["SUBMIT_WORKERS"] > 0:
+        app.extensions["submission_workers"] = submissions.SubmissionWorkers(
+            app, app.config["SUBMIT_WORKERS"], app.config["SUBMIT_BATCH"],
+            app.config["SUBMIT_POLL_INTERVAL"], app.config["SUBMIT_CLAIM_TIMEOUT"])
+        app.extensions["submission_workers"].start()
+
+
+def stop_background(app) -> None:
+    """Apagado ordenado: termina los hilos y vuelca el progreso pendiente."""
+    for name in ("submission_workers", "attempt_sweeper"):
+        worker = app.extensions.pop(name, None)
+        if worker is not None:
+            worker.stop()
+    app.extensions["progress_buffer"].stop()
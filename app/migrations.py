@@ -0,0 +1,99 @@
+"""Migraciones versionadas para bases existentes.
+
+create_all() sólo crea tablas nuevas: no agrega índices ni restricciones a tablas que
+ya existen. Cada migración es idempotente, se aplica una vez y queda registrada en
+schema_version. Una base creada desde cero ya nace con el esquema final, así que sus
+migraciones se marcan como aplicadas sin ejecutarse.
+
+Para agregar una: definir la función y sumarla al final de MIGRATIONS con el siguiente número.
+"""
+from datetime import datetime
+from sqlalchemy import inspect, text, select, insert
+from sqlalchemy.exc import IntegrityError
+from . import db
+from .models import SchemaVersion
+
+
+def _create_indexes(*names):
+    """Crea (si faltan) los índices declarados en los modelos con esos nombres."""
+    def run(conn):
+        wanted = set(names)
+        for table in db.metadata.sorted_tables:
+            for idx in table.indexes:
+                if idx.name in wanted:
+                    idx.create(conn, checkfirst=True)
+                    wanted.discard(idx.name)
+        if wanted:
+            raise RuntimeError(f"índices no declarados en los modelos: {sorted(wanted)}")
+    return run
+
+
+def _unique_enrollment(conn):
+    # antes no había restricción: se conserva la fila más antigua de cada (estudiante, curso)
+    for table in ("inscripcion", "progreso"):
+        conn.execute(text(f"DELETE FROM {table} WHERE id NOT IN "
+                          f"(SELECT min(id) FROM {table} GROUP BY estudiante_id, curso_id)"))
+    _create_indexes("uq_inscripcion_estudiante_curso", "uq_progreso_estudiante_curso")(conn)
+
+
+def _attempt_lifecycle(conn):
+    cols = {c["name"] for c in inspect(conn).get_columns("intento_quiz")}
+    if "numero" not in cols:
+        conn.execute(text("ALTER TABLE intento_quiz ADD COLUMN numero INTEGER"))
+    if "limite" not in cols:
+        conn.execute(text("ALTER TABLE intento_quiz ADD COLUMN limite DATETIME"))
+    # numera los intentos existentes por orden de alta dentro de (quiz, estudiante)
+    conn.execute(text("UPDATE intento_quiz SET numero = (SELECT count(*) FROM intento_quiz i2 "
+                      "WHERE i2.quiz_id = intento_quiz.quiz_id AND i2.estudiante_id = intento_quiz.estudiante_id "
+                      "AND i2.id <= intento_quiz.id) WHERE numero IS NULL"))
+    _create_indexes("uq_intento_numero", "ix_intento_abierto_limite")(conn)
+
+
+MIGRATIONS = [
+    (1, "índices de claves foráneas calientes y keyset del catálogo",
+     _create_indexes("ix_curso_estado_titulo_id", "ix_curso_docente", "ix_leccion_curso_orden",
+                     "ix_inscripcion_curso", "ix_quiz_curso", "ix_pregunta_quiz", "ix_opcion_pregunta",
+                     "ix_intento_quiz_estudiante", "ix_respuesta_intento")),
+    (2, "unicidad de inscripción y progreso por (estudiante, curso)", _unique_enrollment),
+    (3, "número de intento y deadline en intento_quiz", _attempt_lifecycle),
+]
+
+HEAD = MIGRATIONS[-1][0]
+
+
+def current_version() -> int:
+    if not inspect(db.engine).has_table(SchemaVersion.__tablename__):
+        return 0
+    return db.session.execute(select(db.func.max(SchemaVersion.version))).scalar() or 0
+
+
+def upgrade() -> list:
+    """create_all + migraciones pendientes; devuelve las versiones ejecutadas."""
+    fresh = not inspect(db.engine).has_table("usuario")
+    db.create_all()
+    with db.engine.connect() as conn:
+        done = {v for (v,) in conn.execute(select(SchemaVersion.version))}
+    applied = []
+    for version, descripcion, run in MIGRATIONS:
+        if version in done:
+            continue
+        try:
+            with db.engine.begin() as conn:
+                if not fresh:
+                    run(conn)
+                conn.execute(insert(SchemaVersion).values(version=version, descripcion=descripcion,
+                                                          aplicado=datetime.utcnow()))
+        except IntegrityError:
+            # sólo se ignora si otro proceso la registró primero (las migraciones son idempotentes);
+            # un IntegrityError del cuerpo de la migración (p. ej. un índice único) se propaga
+            if not _registered(version):
+                raise
+            continue
+        if not fresh:
+            applied.append(version)
+    return applied
+
+
+def _registered(version: int) -> bool:
+    with db.engine.connect() as conn:
+        return conn.execute(select(SchemaVersion.version).filter_by(version=version)).first() is not None
@@ -29,6 +29,12 @@ class Curso(db.Model):
     estado = db.Column(db.Enum(EstadoCurso), default=EstadoCurso.BORRADOR, nullable=False)
     docente_id = db.Column(db.Integer, db.ForeignKey("usuario.id"), nullable=False)
 
+    # keyset del catálogo público: WHERE estado = ? AND (titulo, id) > (?, ?) ORDER BY titulo, id
+    __table_args__ = (
+        db.Index("ix_curso_estado_titulo_id", "estado", "titulo", "id"),
+        db.Index("ix_curso_docente", "docente_id"),
+    )
+
 
 class Leccion(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -38,6 +44,8 @@ class Leccion(db.Model):
     video_url = db.Column(db.String(255))
     orden = db.Column(db.Integer, default=1)
 
+    __table_args__ = (db.Index("ix_leccion_curso_orden", "curso_id", "orden"),)
+
 
 class Inscripcion(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -45,6 +53,12 @@ class Inscripcion(db.Model):
     curso_id = db.Column(db.Integer, db.ForeignKey("curso.id"), nullable=False)
     fecha = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # el índice único también sirve las búsquedas por estudiante_id
+    __table_args__ = (
+        db.Index("uq_inscripcion_estudiante_curso", "estudiante_id", "curso_id", unique=True),
+        db.Index("ix_inscripcion_curso", "curso_id"),
+    )
+
 
 class Progreso(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -53,6 +67,8 @@ class Progreso(db.Model):
     ultima_leccion_id = db.Column(db.Integer, db.ForeignKey("leccion.id"))
     porcentaje = db.Column(db.Float, default=0.0)
 
+    __table_args__ = (db.Index("uq_progreso_estudiante_curso", "estudiante_id", "curso_id", unique=True),)
+
 
 class Quiz(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -61,12 +77,17 @@ class Quiz(db.Model):
     tiempo_limite_min = db.Column(db.Integer, default=20)
     intentos_max = db.Column(db.Integer, default=2)
 
+    __table_args__ = (db.Index("ix_quiz_curso", "curso_id"),)
+
 
 class Pregunta(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     quiz_id = db.Column(db.Integer, db.ForeignKey("quiz.id"), nullable=False)
     enunciado = db.Column(db.Text, nullable=False)
     tipo = db.Column(db.String(10), default="MULTIPLE")  # MULTIPLE o VF
+    opciones = db.relationship("Opcion", order_by="Opcion.id", lazy="select")
+
+    __table_args__ = (db.Index("ix_pregunta_quiz", "quiz_id"),)
 
 
 class Opcion(db.Model):
@@ -75,6 +96,8 @@ class Opcion(db.Model):
     texto = db.Column(db.String(255), nullable=False)
     correcta = db.Column(db.Boolean, default=False)
 
+    __table_args__ = (db.Index("ix_opcion_pregunta", "pregunta_id"),)
+
 
 class IntentoQuiz(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -83,3 +106,60 @@ class IntentoQuiz(db.Model):
     fecha = db.Column(db.DateTime, default=datetime.utcnow)
     puntaje = db.Column(db.Float)
     entregado = db.Column(db.Boolean, default=False)
+    numero = db.Column(db.Integer)  # 1..intentos_max por (quiz, estudiante)
+    limite = db.Column(db.DateTime)  # deadline de entrega (UTC); None = sin tiempo
+
+    __table_args__ = (
+        db.Index("ix_intento_quiz_estudiante", "quiz_id", "estudiante_id"),
+        db.Index("uq_intento_numero", "quiz_id", "estudiante_id", "numero", unique=True),
+        db.Index("ix_intento_abierto_limite", "entregado", "limite"),
+    )
+
+
+class RespuestaIntento(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    intento_id = db.Column(db.Integer, db.ForeignKey("intento_quiz.id"), nullable=False)
+    pregunta_id = db.Column(db.Integer, db.ForeignKey("pregunta.id"), nullable=False)
+    opcion_id = db.Column(db.Integer, db.ForeignKey("opcion.id"))
+    correcta = db.Column(db.Boolean, default=False, nullable=False)
+
+    __table_args__ = (db.Index("ix_respuesta_intento", "intento_id"),)
+
+
+class CursoStats(db.Model):
+    """Contadores materializados por curso; los mantienen los write paths (ver utils/stats.py)."""
+    curso_id = db.Column(db.Integer, db.ForeignKey("curso.id"), primary_key=True)
+    inscritos = db.Column(db.Integer, nullable=False, default=0)
+    lecciones = db.Column(db.Integer, nullable=False, default=0)
+    intentos = db.Column(db.Integer, nullable=False, default=0)  # intentos entregados
+    suma_puntaje = db.Column(db.Float, nullable=False, default=0.0)
+    completados = db.Column(db.Integer, nullable=False, default=0)  # progreso al 100%
+
+
+class ContenidoVersion(db.Model):
+    """Versión de contenido por clave ("catalogo", "curso:<id>") para ETags y cachés de respuesta."""
+    clave = db.Column(db.String(40), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    actualizado = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class SchemaVersion(db.Model):
+    """Migraciones aplicadas (ver app/migrations.py)."""
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    descripcion = db.Column(db.String(200), nullable=False)
+    aplicado = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class EntregaPendiente(db.Model):
+    """Cola durable de entregas (modo SUBMIT_MODE=queue); la procesan los workers de utils/submissions.py."""
+    id = db.Column(db.Integer, primary_key=True)
+    intento_id = db.Column(db.Integer, db.ForeignKey("intento_quiz.id"), nullable=False, unique=True)
+    estudiante_id = db.Column(db.Integer, db.ForeignKey("usuario.id"), nullable=False)
+    respuestas = db.Column(db.Text, nullable=False)  # JSON
+    estado = db.Column(db.String(12), nullable=False, default="PENDIENTE")  # PENDIENTE|PROCESANDO|LISTO|ERROR
+    resultado = db.Column(db.Text)  # JSON con correctas/total/puntaje o el error
+    creado = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    tomado_por = db.Column(db.String(32))
+    tomado_en = db.Column(db.DateTime)
+
+    __table_args__ = (db.Index("ix_entrega_estado", "estado", "id"),)
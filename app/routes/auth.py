@@ -1,8 +1,8 @@
-from flask import Blueprint, request
+from flask import Blueprint, request, current_app
 from flask_jwt_extended import create_access_token
 from .. import db
 from ..models import Usuario, Rol
-from ..utils.security import hash_password, verify_password
+from ..utils.security import hash_password, VerifierBusy
 
 bp = Blueprint("auth", __name__)
 
@@ -28,9 +28,21 @@ def login():
     data = request.get_json() or {}
     email = data.get("email")
     pwd = data.get("password")
+    if not email or not pwd:
+        return {"error": "credenciales inválidas"}, 401
     user = Usuario.query.filter_by(email=email).first()
-    if not user or not verify_password(pwd, user.password_hash):
+    if not user:
+        return {"error": "credenciales inválidas"}, 401
+    try:
+        ok, new_hash = current_app.extensions["password_verifier"].verify_and_update(pwd, user.password_hash)
+    except VerifierBusy:
+        return {"error": "servicio ocupado, reintente"}, 503, {"Retry-After": "1"}
+    if not ok:
         return {"error": "credenciales inválidas"}, 401
+    if new_hash:
+        # hash con parámetros viejos: se actualiza a la política vigente
+        user.password_hash = new_hash
+        db.session.commit()
     # identidad como STRING; rol en claims adicionales
     token = create_access_token(identity=str(user.id),
                                 additional_claims={"rol": user.rol.value})
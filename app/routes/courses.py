@@ -1,32 +1,36 @@
 ﻿from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
 from .. import db
-from ..models import Curso, Leccion, EstadoCurso, Inscripcion, Progreso
-from ..utils.authz import require_role
+from ..models import Curso, Leccion, EstadoCurso, Inscripcion, Progreso, Usuario, Rol
+from ..utils.authz import require_role, require_course_owner
+from ..utils import search, stats, httpcache, progress, dbrouting
+from ..utils.bulk import chunks, insert_ignore
 
 bp = Blueprint("courses", __name__)
 
+BULK_ENROLL_MAX = 10000
+LESSON_IMPORT_MAX = 5000
 
-@bp.get("/")
-def list_public():
-    cursos = Curso.query.filter_by(estado=EstadoCurso.PUBLICADO).all()
-    return {"items": [{"id": c.id, "titulo": c.titulo, "docente_id": c.docente_id} for c in cursos]}
+# Cache-Control por ruta: el catálogo tolera unos segundos; el resto siempre revalida (304 barato)
+CACHE_CATALOGO = "public, max-age=30"
+CACHE_CURSO = "public, no-cache"
 
 
-@bp.get("/<int:curso_id>")
-def get_course(curso_id):
-    c = Curso.query.get_or_404(curso_id)
-    return {"id": c.id, "titulo": c.titulo, "descripcion": c.descripcion, "estado": c.estado.value, "docente_id": c.docente_id}
+def _content_changed(curso_id: int) -> None:
+    """Reindexa el curso y sube las versiones de contenido (curso + catálogo) antes del commit."""
+    search.index_course(curso_id)
+    httpcache.bump(httpcache.CATALOGO, httpcache.curso_key(curso_id))
 
 
 @bp.get("/<int:curso_id>/lessons")
+@httpcache.conditional(lambda curso_id: httpcache.curso_key(curso_id), CACHE_CURSO)
 def list_lessons(curso_id):
     les = Leccion.query.filter_by(curso_id=curso_id).order_by(Leccion.orden.asc()).all()
     return {"items": [{"id": leccion.id, "titulo": leccion.titulo, "orden": leccion.orden} for leccion in les]}
 
 
 @bp.post("/")
-@jwt_required()
 @require_role("DOCENTE")
 def create_course():
     user_id = int(get_jwt_identity())
@@ -35,48 +39,113 @@ def create_course():
               estado=EstadoCurso(data.get("estado", "BORRADOR")),
               docente_id=user_id)
     db.session.add(c)
+    db.session.flush()
+    _content_changed(c.id)
+    stats.ensure(c.id)
     db.session.commit()
     return {"id": c.id, "titulo": c.titulo}, 201
 
 
 @bp.post("/<int:curso_id>/lessons")
-@jwt_required()
-@require_role("DOCENTE")
+@require_course_owner("curso_id")
 def add_lesson(curso_id):
     data = request.get_json() or {}
     le = Leccion(curso_id=curso_id, titulo=data["titulo"],
                  contenido=data.get("contenido", ""), video_url=data.get("video_url"),
                  orden=data.get("orden", 1))
     db.session.add(le)
+    _content_changed(curso_id)
+    stats.bump(curso_id, lecciones=1)
     db.session.commit()
+    progress.invalidate_course(curso_id)
     return {"id": le.id, "titulo": le.titulo}, 201
 
 
 @bp.post("/<int:curso_id>/publish")
-@jwt_required()
-@require_role("DOCENTE")
+@require_course_owner("curso_id")
 def publish_course(curso_id):
     curso = Curso.query.get_or_404(curso_id)
     curso.estado = EstadoCurso.PUBLICADO
+    _content_changed(curso.id)
     db.session.commit()
     return {"ok": True}
 
 
+def _enroll_many(curso_id: int, estudiante_ids: list) -> dict:
+    """Inscribe en lote (Inscripcion + Progreso) sin commit; devuelve {estudiante_id: estado}.
+
+    "inscrito" sale de lo que el INSERT ... ON CONFLICT DO NOTHING devolvió: si otra inscripción
+    ganó la carrera después de la lectura de `previos`, ese estudiante queda como "ya_inscrito".
+    """
+    estados = {}
+    ids = list(dict.fromkeys(estudiante_ids))
+    for lote in chunks(ids):
+        validos = {uid for (uid,) in db.session.query(Usuario.id)
+                   .filter(Usuario.id.in_(lote), Usuario.rol == Rol.ESTUDIANTE)}
+        previos = {uid for (uid,) in db.session.query(Inscripcion.estudiante_id)
+                   .filter(Inscripcion.curso_id == curso_id, Inscripcion.estudiante_id.in_(lote))}
+        candidatos = [uid for uid in lote if uid in validos and uid not in previos]
+        insertados = set()
+        if candidatos:
+            insertados = set(db.session.scalars(
+                insert_ignore(Inscripcion).returning(Inscripcion.estudiante_id),
+                [{"estudiante_id": uid, "curso_id": curso_id} for uid in candidatos]))
+        if insertados:
+            db.session.execute(insert_ignore(Progreso),
+                               [{"estudiante_id": uid, "curso_id": curso_id, "porcentaje": 0.0} for uid in insertados])
+        for uid in lote:
+            estados[uid] = ("inscrito" if uid in insertados else
+                            "ya_inscrito" if uid in validos else "estudiante_invalido")
+    return estados
+
+
 @bp.post("/<int:curso_id>/enroll")
 @jwt_required()
 def enroll(curso_id):
     user_id = int(get_jwt_identity())
+    Curso.query.get_or_404(curso_id)
+    ins = Inscripcion.query.filter_by(estudiante_id=user_id, curso_id=curso_id).first()
+    if ins:
+        return {"error": "ya inscrito", "inscripcion_id": ins.id}, 409
     ins = Inscripcion(estudiante_id=user_id, curso_id=curso_id)
     db.session.add(ins)
-    db.session.commit()
-    pr = Progreso(estudiante_id=user_id, curso_id=curso_id, porcentaje=0.0)
-    db.session.add(pr)
-    db.session.commit()
+    db.session.add(Progreso(estudiante_id=user_id, curso_id=curso_id, porcentaje=0.0))
+    stats.bump(curso_id, inscritos=1)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return {"error": "ya inscrito"}, 409
     return {"ok": True, "inscripcion_id": ins.id}
+
+
+@bp.post("/<int:curso_id>/enroll/bulk")
+@require_course_owner("curso_id")
+def enroll_bulk(curso_id):
+    """Inscribe una cohorte: body = {"estudiante_ids": [1, 2, ...]}; una sola transacción."""
+    data = request.get_json(silent=True) or {}
+    raw = data.get("estudiante_ids")
+    if not isinstance(raw, list) or not raw or len(raw) > BULK_ENROLL_MAX:
+        return {"error": f"estudiante_ids debe ser lista de 1..{BULK_ENROLL_MAX} ids"}, 422
+    try:
+        ids = [int(x) for x in raw]
+    except (TypeError, ValueError):
+        return {"error": "estudiante_ids deben ser enteros"}, 422
+    estados = _enroll_many(curso_id, ids)
+    resultados = [{"estudiante_id": uid, "estado": estado} for uid, estado in estados.items()]
+    inscritos = sum(1 for r in resultados if r["estado"] == "inscrito")
+    stats.bump(curso_id, inscritos=inscritos)
+    db.session.commit()
+    return {"inscritos": inscritos, "resultados": resultados}
+
+
 # --- Extensiones: validaciÃ³n, bÃºsqueda/paginaciÃ³n y endpoints extra ---
 
 
-from flask import request
+import base64
+import json
+from flask import request, current_app
+from sqlalchemy import tuple_
 from werkzeug.exceptions import BadRequest
 from app.utils.authz import docente_required
 
@@ -97,41 +166,130 @@ def _parse_int(name, default, min_value=None, max_value=None):
         raise BadRequest(f"param '{name}' debe ser entero")
     if min_value is not None and v < min_value:
         raise BadRequest(f"param '{name}' < {min_value}")
-    if max_value is not None and v > {max_value}:
+    if max_value is not None and v > max_value:
         raise BadRequest(f"param '{name}' > {max_value}")
     return v
 
 
+def _encode_cursor(sort, order, key):
+    raw = json.dumps({"s": sort, "o": order, "k": key}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(token, sort, order):
+    """Devuelve la clave de orden del cursor; BadRequest si no corresponde a sort/order."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        key = data["k"]
+    except Exception:
+        raise BadRequest("cursor inválido")
+    if data.get("s") != sort or data.get("o") != order:
+        raise BadRequest("cursor no corresponde a sort/order")
+    return key
+
+
+def _catalog_total(query, q):
+    """COUNT(*) del catálogo cacheado unos segundos por término de búsqueda."""
+    totals = current_app.extensions["catalog_totals"]
+    total = totals.get(q)
+    if total is None:
+        total = query.order_by(None).count()
+        totals.put(q, total)
+    return total
+
+
 @bp.get("/")
+@httpcache.conditional(lambda: httpcache.CATALOGO, CACHE_CATALOGO)
 def list_public_courses():
-    """Lista cursos PUBLICADOS con paginaciÃ³n, bÃºsqueda y orden."""
+    """Lista cursos PUBLICADOS con paginación, búsqueda y orden.
+
+    Modo clásico: ?page=&size= (offset + total exacto).
+    Modo cursor (opt-in con ?cursor=, vacío para la primera página): keyset sobre
+    (titulo, id) o (id); devuelve next_cursor y sólo incluye total (cacheado) con ?total=1.
+    Con ?q= se usa el índice FTS5 (cursos + lecciones, prefijo en el último término);
+    sort=rank ordena por relevancia (sólo modo clásico).
+    """
     from app.models import Curso, EstadoCurso
     q = request.args.get("q", "").strip()
     sort = request.args.get("sort", "titulo")
     order = request.args.get("order", "asc").lower()
-    page = _parse_int("page", 1, 1)
     size = _parse_int("size", 10, 1, 100)
+    if sort not in ("titulo", "id", "rank"):
+        sort = "titulo"
+    if order != "desc":
+        order = "asc"
 
     query = Curso.query.filter(Curso.estado == EstadoCurso.PUBLICADO)
-    if q:
+    match = search.match_expression(q) if q and search.enabled() else None
+    fts = None
+    if match:
+        fts = search.ranked_ids(match)
+        query = query.join(fts, fts.c.curso_id == Curso.id)
+    elif q:
         like = f"%{q}%"
         query = query.filter(Curso.titulo.ilike(like) | Curso.descripcion.ilike(like))
 
-    valid_sorts = {"titulo": Curso.titulo, "id": Curso.id}
-    col = valid_sorts.get(sort, Curso.titulo)
-    if order == "desc":
-        col = col.desc()
-    query = query.order_by(col)
-
-    total = query.count()
-    items = query.offset((page - 1) * size).limit(size).all()
-    data = {
-        "page": page, "size": size, "total": total,
-        "items": [{"id": c.id, "titulo": c.titulo, "docente_id": c.docente_id} for c in items],
-    }
+    if sort == "rank":
+        if fts is None or "cursor" in request.args:
+            raise BadRequest("sort=rank requiere q y no admite cursor")
+        query = query.order_by(fts.c.rank, Curso.id)
+    else:
+        cols = [Curso.titulo, Curso.id] if sort == "titulo" else [Curso.id]
+        query = query.order_by(*[c.desc() if order == "desc" else c for c in cols])
+
+    def _item(c):
+        return {"id": c.id, "titulo": c.titulo, "docente_id": c.docente_id}
+
+    if "cursor" not in request.args:
+        page = _parse_int("page", 1, 1)
+        total = query.count()
+        items = query.offset((page - 1) * size).limit(size).all()
+        return _json_ok({"page": page, "size": size, "total": total, "items": [_item(c) for c in items]})
+
+    token = request.args.get("cursor", "")
+    data = {"size": size}
+    if request.args.get("total") in ("1", "true"):
+        data["total"] = _catalog_total(query, q)
+    if token:
+        key = _decode_cursor(token, sort, order)
+        if len(key) != len(cols):
+            raise BadRequest("cursor inválido")
+        row, bound = tuple_(*cols), tuple_(*key)
+        query = query.filter(row < bound if order == "desc" else row > bound)
+    rows = query.limit(size + 1).all()
+    items = rows[:size]
+    next_cursor = None
+    if len(rows) > size:
+        last = items[-1]
+        next_cursor = _encode_cursor(sort, order, [last.titulo, last.id] if sort == "titulo" else [last.id])
+    data.update({"next_cursor": next_cursor, "items": [_item(c) for c in items]})
     return _json_ok(data)
 
 
+@bp.get("/search")
+@httpcache.conditional(lambda: httpcache.CATALOGO, CACHE_CATALOGO)
+def search_courses():
+    """Búsqueda rankeada para type-ahead: cursos publicados que coinciden en título, descripción o lecciones."""
+    from app.models import Curso, EstadoCurso
+    q = request.args.get("q", "").strip()
+    limit = _parse_int("limit", 10, 1, 50)
+    match = search.match_expression(q)
+    if not match:
+        return _json_ok({"items": []})
+    if not search.enabled():
+        like = f"%{q}%"
+        rows = (Curso.query.filter(Curso.estado == EstadoCurso.PUBLICADO,
+                                   Curso.titulo.ilike(like) | Curso.descripcion.ilike(like))
+                .order_by(Curso.titulo, Curso.id).limit(limit).all())
+        return _json_ok({"items": [{"id": c.id, "titulo": c.titulo} for c in rows]})
+    fts = search.ranked_ids(match)
+    rows = (db.session.query(Curso.id, Curso.titulo)
+            .join(fts, fts.c.curso_id == Curso.id)
+            .filter(Curso.estado == EstadoCurso.PUBLICADO)
+            .order_by(fts.c.rank, Curso.id).limit(limit).all())
+    return _json_ok({"items": [{"id": cid, "titulo": titulo} for cid, titulo in rows]})
+
+
 @bp.post("/validate")
 @docente_required
 def validate_course_payload():
@@ -163,12 +321,13 @@ def list_my_courses():
 from flask import request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.exceptions import NotFound
-from sqlalchemy import func
+from sqlalchemy import func, update, case, insert
 
 
 @bp.get("/<int:course_id>")
+@httpcache.conditional(lambda course_id: httpcache.curso_key(course_id), CACHE_CURSO)
 def get_course_detail(course_id: int):
-    """Detalle pÃºblico de un curso (id, titulo, estado, #lecciones)."""
+    """Detalle público de un curso (datos + lecciones ordenadas)."""
     from app.models import Curso, Leccion
     c = Curso.query.get(course_id)
     if not c:
@@ -177,22 +336,19 @@ def get_course_detail(course_id: int):
     return _json_ok({
         "id": c.id,
         "titulo": c.titulo,
+        "descripcion": c.descripcion,
         "estado": c.estado.value,
+        "docente_id": c.docente_id,
         "lecciones": [{"id": leccion.id, "titulo": leccion.titulo, "orden": leccion.orden} for leccion in lessons]
     })
 
 
 @bp.patch("/<int:course_id>")
-@docente_required
+@require_course_owner()
 def update_course(course_id: int):
     """Actualiza tÃ­tulo/descripcion; verifica ownership del docente."""
     from app.models import Curso, db
-    uid = int(get_jwt_identity())
-    c = Curso.query.get(course_id)
-    if not c:
-        return _json_err("curso no encontrado", 404)
-    if c.docente_id != uid:
-        return _json_err("no autorizado (owner requerido)", 403)
+    c = db.session.get(Curso, course_id)
 
     body = request.get_json(silent=True) or {}
     titulo = (body.get("titulo") or "").strip()
@@ -206,55 +362,53 @@ def update_course(course_id: int):
         c.descripcion = descripcion
 
     db.session.add(c)
+    _content_changed(c.id)
     db.session.commit()
     return _json_ok({"id": c.id, "titulo": c.titulo})
 
 
 @bp.post("/<int:course_id>/unpublish")
-@docente_required
+@require_course_owner()
 def unpublish_course(course_id: int):
     """Pasa el curso a BORRADOR (deja de ser pÃºblico)."""
     from app.models import Curso, EstadoCurso, db
-    uid = int(get_jwt_identity())
-    c = Curso.query.get(course_id)
-    if not c:
-        return _json_err("curso no encontrado", 404)
-    if c.docente_id != uid:
-        return _json_err("no autorizado", 403)
+    c = db.session.get(Curso, course_id)
     c.estado = EstadoCurso.BORRADOR
     db.session.add(c)
+    _content_changed(c.id)
     db.session.commit()
     return _json_ok({"ok": True, "estado": c.estado.value})
 
 
 @bp.post("/<int:course_id>/hide")
-@docente_required
+@require_course_owner()
 def hide_course(course_id: int):
     """Oculta el curso (OCULTO)."""
     from app.models import Curso, EstadoCurso, db
-    uid = int(get_jwt_identity())
-    c = Curso.query.get(course_id)
-    if not c:
-        return _json_err("curso no encontrado", 404)
-    if c.docente_id != uid:
-        return _json_err("no autorizado", 403)
+    c = db.session.get(Curso, course_id)
     c.estado = EstadoCurso.OCULTO
     db.session.add(c)
+    _content_changed(c.id)
     db.session.commit()
     return _json_ok({"ok": True, "estado": c.estado.value})
 
 
+def _orden_duplicado(final: dict, tocadas: set):
+    """Primer `orden` repetido en {leccion_id: orden} que involucre alguna lección tocada, o None."""
+    por_orden = {}
+    for lid, orden in final.items():
+        por_orden.setdefault(orden, []).append(lid)
+    for orden, ids in sorted(por_orden.items()):
+        if len(ids) > 1 and tocadas.intersection(ids):
+            return orden
+    return None
+
+
 @bp.post("/<int:course_id>/lessons/reorder")
-@docente_required
+@require_course_owner()
 def reorder_lessons(course_id: int):
     """Reordena lecciones: body = [{"id":1,"orden":1},...]."""
-    from app.models import Curso, Leccion, db
-    uid = int(get_jwt_identity())
-    c = Curso.query.get(course_id)
-    if not c:
-        return _json_err("curso no encontrado", 404)
-    if c.docente_id != uid:
-        return _json_err("no autorizado", 403)
+    from app.models import Leccion, db
 
     body = request.get_json(silent=True) or []
     if not isinstance(body, list):
@@ -268,28 +422,174 @@ def reorder_lessons(course_id: int):
             orden = int(item.get("orden"))
         except Exception:
             return _json_err("id/orden invÃ¡lidos (enteros)")
+        if lid in desired:
+            return _json_err(f"lección {lid} repetida", 422)
         desired[lid] = orden
 
-    lessons = Leccion.query.filter_by(curso_id=c.id).all()
-    for leccion in lessons:
-        if leccion.id in desired:
-            leccion.orden = desired[leccion.id]
-            db.session.add(leccion)
-    db.session.commit()
-
-    out = [{"id": leccion.id, "titulo": leccion.titulo, "orden": leccion.orden} for leccion in
-           Leccion.query.filter_by(curso_id=c.id).order_by(Leccion.orden.asc()).all()]
+    # una lectura liviana (id, titulo, orden); el resultado se arma en memoria
+    actuales = {lid: (titulo, orden) for lid, titulo, orden in
+                db.session.query(Leccion.id, Leccion.titulo, Leccion.orden).filter_by(curso_id=course_id)}
+    ajenas = set(desired) - set(actuales)
+    if ajenas:
+        return _json_err(f"lecciones de otro curso o inexistentes: {sorted(ajenas)}", 422)
+    final = {lid: desired.get(lid, orden) for lid, (_, orden) in actuales.items()}
+    duplicado = _orden_duplicado(final, set(desired))
+    if duplicado is not None:
+        return _json_err(f"orden duplicado: {duplicado}", 422)
+
+    cambios = {lid: o for lid, o in desired.items() if actuales[lid][1] != o}
+    if cambios:
+        # un solo UPDATE ... SET orden = CASE id WHEN .. THEN .. END WHERE id IN (..)
+        db.session.execute(update(Leccion)
+                           .where(Leccion.id.in_(cambios))
+                           .values(orden=case(cambios, value=Leccion.id))
+                           .execution_options(synchronize_session=False))
+        httpcache.bump(httpcache.curso_key(course_id))
+        db.session.commit()
+        progress.invalidate_course(course_id)
+
+    out = [{"id": lid, "titulo": actuales[lid][0], "orden": o}
+           for lid, o in sorted(final.items(), key=lambda kv: (kv[1], kv[0]))]
     return _json_ok({"items": out})
 
 
+def _lesson_rows(course_id: int):
+    """Filas a importar desde un array JSON o NDJSON (una lección por línea)."""
+    if request.mimetype == "application/x-ndjson":
+        rows = []
+        for n, line in enumerate(request.stream, 1):
+            if not line.strip():
+                continue
+            if len(rows) >= LESSON_IMPORT_MAX:
+                raise BadRequest(f"máximo {LESSON_IMPORT_MAX} lecciones por importación")
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                raise BadRequest(f"línea {n}: JSON inválido")
+        return rows
+    rows = request.get_json(silent=True)
+    if not isinstance(rows, list):
+        raise BadRequest("se espera un array JSON o NDJSON")
+    if len(rows) > LESSON_IMPORT_MAX:
+        raise BadRequest(f"máximo {LESSON_IMPORT_MAX} lecciones por importación")
+    return rows
+
+
+@bp.post("/<int:course_id>/lessons/bulk")
+@require_course_owner()
+def import_lessons(course_id: int):
+    """Importa lecciones en una transacción: [{"titulo", "contenido"?, "video_url"?, "orden"?}, ...].
+
+    Sin `orden` se agregan al final en el orden recibido; un `orden` repetido (en el lote
+    o contra las lecciones existentes) rechaza la importación completa.
+    """
+    from app.models import Leccion
+    rows = _lesson_rows(course_id)
+    if not rows:
+        return _json_err("no hay lecciones para importar", 422)
+
+    existentes = {o for (o,) in db.session.query(Leccion.orden).filter_by(curso_id=course_id)}
+    usados = set(existentes)
+    valores = []
+    for i, item in enumerate(rows):
+        titulo = str(item.get("titulo") or "").strip() if isinstance(item, dict) else ""
+        if not titulo or len(titulo) > 120:
+            return {"error": "titulo requerido (<=120)", "fila": i}, 422
+        orden = item.get("orden")
+        if orden is not None:
+            try:
+                orden = int(orden)
+            except (TypeError, ValueError):
+                return {"error": "orden debe ser entero", "fila": i}, 422
+            if orden in usados:
+                return {"error": f"orden duplicado: {orden}", "fila": i}, 422
+            usados.add(orden)
+        valores.append({"curso_id": course_id, "titulo": titulo, "contenido": item.get("contenido", ""),
+                        "video_url": item.get("video_url"), "orden": orden})
+    siguiente = max(usados, default=0)
+    for v in valores:
+        if v["orden"] is None:
+            siguiente += 1
+            v["orden"] = siguiente
+
+    # RETURNING devuelve sólo las filas de esta sentencia: aunque otra importación concurrente
+    # repita los mismos `orden` (ningún índice los hace únicos), dentro del lote son distintos.
+    # No se pide sort_by_parameter_order: en SQLite degrada a un INSERT por fila.
+    id_de = {o: lid for lid, o in db.session.execute(insert(Leccion).returning(Leccion.id, Leccion.orden), valores)}
+    stats.bump(course_id, lecciones=len(valores))
+    _content_changed(course_id)
+    db.session.commit()
+    progress.invalidate_course(course_id)
+    items = [{"id": id_de[v["orden"]], "titulo": v["titulo"], "orden": v["orden"]} for v in valores]
+    return {"creadas": len(items), "items": items}, 201
+
+
 @bp.get("/<int:course_id>/metrics")
-@docente_required
+@require_course_owner()
 def course_metrics(course_id: int):
-    """MÃ©tricas simples: inscritos, lecciones totales."""
-    from app.models import Curso, Leccion, Inscripcion
-    c = Curso.query.get(course_id)
-    if not c:
-        return _json_err("curso no encontrado", 404)
-    total_lec = Leccion.query.filter_by(curso_id=course_id).count()
-    total_ins = Inscripcion.query.filter_by(curso_id=course_id).count()
-    return _json_ok({"inscritos": total_ins, "lecciones": total_lec})
+    """Métricas materializadas (CursoStats): una lectura por clave primaria."""
+    from app.models import CursoStats
+    st = db.session.get(CursoStats, course_id)
+    if st is None:
+        # curso anterior a CursoStats: se materializa una vez
+        with dbrouting.primary():  # lo reconstruido se persiste: no leer de una réplica atrasada
+            stats.reconcile(course_id)
+        db.session.commit()
+        st = db.session.get(CursoStats, course_id)
+    return _json_ok(stats.as_dict(st))
+
+
+@bp.get("/<int:course_id>/gradebook.<fmt>")
+@require_course_owner()
+def export_gradebook(course_id: int, fmt: str):
+    """Libro de calificaciones en streaming (CSV o NDJSON); sólo el docente dueño."""
+    from flask import Response, stream_with_context
+    from app.utils import gradebook
+    formatos = {"csv": (gradebook.csv_chunks, "text/csv; charset=utf-8"),
+                "ndjson": (gradebook.ndjson_chunks, "application/x-ndjson")}
+    if fmt not in formatos:
+        return _json_err("formato inválido (csv|ndjson)", 404)
+    chunks_fn, mimetype = formatos[fmt]
+    return Response(stream_with_context(chunks_fn(course_id)), mimetype=mimetype, headers={
+        "Content-Disposition": f'attachment; filename="gradebook-{course_id}.{fmt}"',
+        "Cache-Control": "no-store",
+        "X-Accel-Buffering": "no",  # que nginx no acumule la respuesta antes de enviarla
+    })
+
+
+@bp.get("/<int:course_id>/snapshot")
+@require_course_owner()
+def export_snapshot(course_id: int):
+    """Curso completo (lecciones, quizzes, preguntas y opciones) como NDJSON gzip en streaming."""
+    from flask import Response, stream_with_context
+    from app.models import Curso
+    from app.utils import snapshot
+    curso = db.session.get(Curso, course_id)
+    return Response(stream_with_context(snapshot.export_chunks(curso)), mimetype="application/gzip", headers={
+        "Content-Disposition": f'attachment; filename="curso-{course_id}.ndjson.gz"',
+        "Cache-Control": "no-store",
+        "X-Accel-Buffering": "no",
+    })
+
+
+@bp.post("/import")
+@docente_required
+def import_snapshot():
+    """Recrea un curso desde un snapshot (gzip o NDJSON plano) en una sola transacción.
+
+    El curso nuevo queda en BORRADOR a nombre del docente que importa; `?titulo=` lo renombra.
+    """
+    from app.utils import snapshot
+    from app.utils.authz import user_id
+    gzipped = request.mimetype == "application/gzip" or request.content_encoding == "gzip"
+    records = snapshot.read_records(request.stream, gzipped, current_app.config["SNAPSHOT_IMPORT_MAX_LINES"])
+    try:
+        out = snapshot.import_course(records, user_id(), titulo=request.args.get("titulo"))
+    except snapshot.SnapshotError as e:
+        db.session.rollback()
+        return _json_err(str(e), 422)
+    stats.ensure(out["id"])
+    stats.bump(out["id"], lecciones=out["lecciones"])
+    _content_changed(out["id"])
+    db.session.commit()
+    return out, 201
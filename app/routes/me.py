@@ -1,18 +1,32 @@
-from flask import Blueprint
+from datetime import datetime
+from flask import Blueprint, current_app, request
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from sqlalchemy import and_, or_, case, func
 from .. import db
-from ..models import Usuario, Inscripcion, Curso, Progreso
+from ..models import Usuario, Inscripcion, Curso, Progreso, Quiz, IntentoQuiz
+from ..utils import progress
 
 bp = Blueprint("me", __name__)
 
 
+def _identity(uid: int) -> dict:
+    """Datos básicos del usuario con caché TTL corta (IDENTITY_CACHE_TTL); 404 si no existe."""
+    cache = current_app.extensions["identity_cache"]
+    ident = cache.get(uid)
+    if ident is None:
+        u = Usuario.query.get_or_404(uid)
+        ident = {"id": u.id, "email": u.email, "rol": u.rol.value}
+        cache.put(uid, ident)
+    return ident
+
+
 @bp.get("/profile")
 @jwt_required()
 def profile():
     uid = int(get_jwt_identity())
     claims = get_jwt()
-    u = Usuario.query.get_or_404(uid)
-    return {"id": u.id, "email": u.email, "rol": claims.get("rol")}
+    u = _identity(uid)
+    return {"id": u["id"], "email": u["email"], "rol": claims.get("rol")}
 
 
 @bp.get("/enrollments")
@@ -25,3 +39,148 @@ def my_enrollments():
            .all())
     items = [{"inscripcion_id": i.id, "curso_id": c.id, "curso_titulo": c.titulo} for i, c in ins]
     return {"items": items}
+
+
+def _enrolled(buffer, uid: int, curso_id: int) -> bool:
+    key = (uid, curso_id)
+    if buffer.enrolled.get(key):
+        return True
+    ok = db.session.query(Progreso.id).filter_by(estudiante_id=uid, curso_id=curso_id).first() is not None
+    if ok:
+        buffer.enrolled.put(key, True)
+    return ok
+
+
+@bp.post("/progress")
+@jwt_required()
+def record_progress():
+    """Heartbeat del reproductor: body = {"curso_id", "leccion_id"}; se escribe coalescido."""
+    uid = int(get_jwt_identity())
+    data = request.get_json(silent=True) or {}
+    try:
+        curso_id, leccion_id = int(data["curso_id"]), int(data["leccion_id"])
+    except (KeyError, TypeError, ValueError):
+        return {"error": "curso_id y leccion_id enteros requeridos"}, 422
+    buffer = current_app.extensions["progress_buffer"]
+    if not _enrolled(buffer, uid, curso_id):
+        return {"error": "no inscrito en el curso"}, 403
+    porcentaje = progress.percentage(curso_id, leccion_id)
+    if porcentaje is None:
+        return {"error": "la lección no pertenece al curso"}, 422
+    return buffer.record(uid, curso_id, leccion_id, porcentaje), 202
+
+
+@bp.get("/progress")
+@jwt_required()
+def my_progress():
+    """Progreso por curso: lo persistido combinado con lo que aún está en el buffer."""
+    uid = int(get_jwt_identity())
+    buffer = current_app.extensions["progress_buffer"]
+    items = []
+    for p in Progreso.query.filter_by(estudiante_id=uid).order_by(Progreso.curso_id):
+        leccion_id, porcentaje = p.ultima_leccion_id, p.porcentaje or 0.0
+        pendiente = buffer.pending(uid, p.curso_id)
+        if pendiente is not None:
+            leccion_id, porcentaje = pendiente[0], max(porcentaje, pendiente[1])
+        items.append({"curso_id": p.curso_id, "ultima_leccion_id": leccion_id, "porcentaje": porcentaje})
+    return {"items": items}
+
+
+DASHBOARD_SECTIONS = {
+    "profile": ("id", "email", "rol"),
+    "enrollments": ("inscripcion_id", "curso_id", "curso_titulo", "ultima_leccion_id", "porcentaje"),
+    "quizzes": ("quiz_id", "curso_id", "titulo", "tiempo_limite_min", "intentos_usados", "intentos_restantes",
+                "mejor_puntaje", "intento_abierto"),
+}
+
+
+def _dashboard_fields(raw: str):
+    """`fields=profile,enrollments.porcentaje,...` → {sección: tupla de campos}; ValueError si no existe."""
+    if not raw:
+        return dict(DASHBOARD_SECTIONS)
+    wanted = {}
+    for token in (t.strip() for t in raw.split(",")):
+        if not token:
+            continue
+        section, _, field = token.partition(".")
+        if section not in DASHBOARD_SECTIONS or (field and field not in DASHBOARD_SECTIONS[section]):
+            raise ValueError(token)
+        wanted.setdefault(section, [])
+        if field:
+            wanted[section].append(field)
+    return {s: tuple(f) or DASHBOARD_SECTIONS[s] for s, f in wanted.items()}
+
+
+def _dashboard_enrollments(uid: int) -> list:
+    """Inscripciones + curso + progreso en una consulta; superpone lo que aún está en el buffer."""
+    rows = (db.session.query(Inscripcion.id, Curso.id, Curso.titulo, Progreso.ultima_leccion_id, Progreso.porcentaje)
+            .join(Curso, Curso.id == Inscripcion.curso_id)
+            .outerjoin(Progreso, and_(Progreso.estudiante_id == Inscripcion.estudiante_id,
+                                      Progreso.curso_id == Inscripcion.curso_id))
+            .filter(Inscripcion.estudiante_id == uid)
+            .order_by(Curso.titulo, Curso.id)
+            .all())
+    buffer = current_app.extensions["progress_buffer"]
+    items = []
+    for ins_id, curso_id, titulo, leccion_id, porcentaje in rows:
+        pendiente = buffer.pending(uid, curso_id)
+        if pendiente is not None:
+            leccion_id, porcentaje = pendiente[0], max(porcentaje or 0.0, pendiente[1])
+        items.append({"inscripcion_id": ins_id, "curso_id": curso_id, "curso_titulo": titulo,
+                      "ultima_leccion_id": leccion_id, "porcentaje": porcentaje or 0.0})
+    return items
+
+
+def _dashboard_quizzes(uid: int) -> list:
+    """Quizzes de los cursos inscritos con intentos propios agregados, en una consulta.
+
+    Sólo se listan los pendientes: con intentos disponibles o con un intento abierto en plazo.
+    """
+    now = datetime.utcnow()
+    abierto = and_(IntentoQuiz.entregado.is_(False),
+                   or_(IntentoQuiz.limite.is_(None), IntentoQuiz.limite >= now))
+    mios = (db.session.query(IntentoQuiz.quiz_id.label("quiz_id"),
+                             func.count().label("usados"),
+                             func.max(case((IntentoQuiz.entregado.is_(True), IntentoQuiz.puntaje))).label("mejor"),
+                             func.max(case((abierto, IntentoQuiz.id))).label("abierto_id"))
+            .filter(IntentoQuiz.estudiante_id == uid)
+            .group_by(IntentoQuiz.quiz_id)
+            .subquery())
+    rows = (db.session.query(Quiz, func.coalesce(mios.c.usados, 0), mios.c.mejor, mios.c.abierto_id)
+            .join(Inscripcion, and_(Inscripcion.curso_id == Quiz.curso_id, Inscripcion.estudiante_id == uid))
+            .outerjoin(mios, mios.c.quiz_id == Quiz.id)
+            .order_by(Quiz.curso_id, Quiz.id)
+            .all())
+    items = []
+    for q, usados, mejor, abierto_id in rows:
+        restantes = max(q.intentos_max - usados, 0) if q.intentos_max else None  # None = ilimitados
+        if restantes == 0 and abierto_id is None:
+            continue
+        items.append({"quiz_id": q.id, "curso_id": q.curso_id, "titulo": q.titulo,
+                      "tiempo_limite_min": q.tiempo_limite_min, "intentos_usados": usados,
+                      "intentos_restantes": restantes, "mejor_puntaje": mejor, "intento_abierto": abierto_id})
+    return items
+
+
+@bp.get("/dashboard")
+@jwt_required()
+def dashboard():
+    """Perfil, inscripciones con progreso y quizzes pendientes en una respuesta.
+
+    `?fields=` elige secciones y campos (p. ej. `enrollments.curso_titulo,quizzes`); las
+    secciones no pedidas no se consultan. Como máximo dos consultas más la de identidad.
+    """
+    uid = int(get_jwt_identity())
+    try:
+        fields = _dashboard_fields(request.args.get("fields", ""))
+    except ValueError as e:
+        return {"error": f"campo desconocido: {e}", "disponibles": {s: list(f) for s, f in DASHBOARD_SECTIONS.items()}}, 400
+    out = {}
+    if "profile" in fields:
+        u = _identity(uid)
+        perfil = {"id": u["id"], "email": u["email"], "rol": get_jwt().get("rol")}
+        out["profile"] = {k: perfil[k] for k in fields["profile"]}
+    for section, loader in (("enrollments", _dashboard_enrollments), ("quizzes", _dashboard_quizzes)):
+        if section in fields:
+            out[section] = [{k: item[k] for k in fields[section]} for item in loader(uid)]
+    return out, 200, {"Cache-Control": "private, no-store"}
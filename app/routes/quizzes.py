@@ -1,15 +1,33 @@
-﻿from flask import Blueprint, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+﻿from datetime import datetime
+from flask import Blueprint, request, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from sqlalchemy.orm import joinedload
 from .. import db
 try:
     from ..models import Quiz, Pregunta, Opcion, Intento
 except ImportError:
     from ..models import Quiz, Pregunta, Opcion, IntentoQuiz as Intento
-from ..utils.authz import require_role
+from ..models import EntregaPendiente
+from ..utils.authz import require_role, docente_required, owner_denied
+from ..utils import grading, stats, httpcache, attempts, submissions, analytics, dbrouting
 
 bp = Blueprint("quizzes", __name__)
 
+def _quiz_content_key(quiz_id: int):
+    curso_id = db.session.query(Quiz.curso_id).filter_by(id=quiz_id).scalar()
+    return httpcache.curso_key(curso_id) if curso_id is not None else None
+
+
+def _owned_quiz_course(quiz_id: int):
+    """(curso_id, None) si el docente es dueño del curso del quiz; si no (None, respuesta 404/403)."""
+    curso_id = db.session.query(Quiz.curso_id).filter_by(id=quiz_id).scalar()
+    if curso_id is None:
+        return None, ({"error": "quiz no encontrado"}, 404)
+    return curso_id, owner_denied(curso_id)
+
+
 @bp.get("/<int:quiz_id>")
+@httpcache.conditional(_quiz_content_key, "public, no-cache")
 def get_quiz(quiz_id: int):
     q = Quiz.query.get_or_404(quiz_id)
     preguntas = Pregunta.query.filter_by(quiz_id=quiz_id).all()
@@ -24,7 +42,6 @@ def get_quiz(quiz_id: int):
     }
 
 @bp.post("/")
-@jwt_required()
 @require_role("DOCENTE")
 def create_quiz():
     data = request.get_json(silent=True) or {}
@@ -39,14 +56,20 @@ def create_quiz():
         )
     except Exception as e:
         return {"error": "payload inválido", "detail": str(e)}, 422
+    denegado = owner_denied(q.curso_id)
+    if denegado:
+        return denegado
     db.session.add(q)
+    httpcache.bump(httpcache.curso_key(q.curso_id))
     db.session.commit()
     return {"id": q.id, "titulo": q.titulo}, 201
 
 @bp.post("/<int:quiz_id>/questions")
-@jwt_required()
 @require_role("DOCENTE")
 def add_question(quiz_id: int):
+    curso_id, denegado = _owned_quiz_course(quiz_id)
+    if denegado:
+        return denegado
     data = request.get_json(silent=True) or {}
     enun = (data.get("enunciado") or "").strip()
     tipo = (data.get("tipo") or "").strip()
@@ -67,36 +90,65 @@ def add_question(quiz_id: int):
         db.session.add(o)
         db.session.flush()
         created_opts.append({"id": o.id, "texto": o.texto, "correcta": o.correcta})
+    httpcache.bump(httpcache.quiz_key(quiz_id), httpcache.curso_key(curso_id))
     db.session.commit()
+    grading.invalidate_quiz(quiz_id)
     return {"id": p.id, "enunciado": p.enunciado, "tipo": p.tipo, "opciones": created_opts}, 201
 
+
+def _load_preguntas(quiz_id: int) -> list:
+    """Preguntas + opciones en UNA sentencia (joinedload), serializadas en una pasada."""
+    preguntas = (Pregunta.query.options(joinedload(Pregunta.opciones))
+                 .filter_by(quiz_id=quiz_id).order_by(Pregunta.id).all())
+    return [{
+        "id": p.id,
+        "enunciado": p.enunciado,
+        "tipo": p.tipo,
+        "opciones": [{"id": o.id, "texto": o.texto, "correcta": o.correcta} for o in p.opciones]
+    } for p in preguntas]
+
+
+def _vista_estudiante(items: list) -> list:
+    """Proyección sin el flag 'correcta'."""
+    return [{**p, "opciones": [{"id": o["id"], "texto": o["texto"]} for o in p["opciones"]]} for p in items]
+
+
 @bp.get("/<int:quiz_id>/questions")
 @jwt_required()
 def list_questions(quiz_id: int):
-    preguntas = Pregunta.query.filter_by(quiz_id=quiz_id).all()
-    items = []
-    for p in preguntas:
-        opts = Opcion.query.filter_by(pregunta_id=p.id).all()
-        items.append({
-            "id": p.id,
-            "enunciado": p.enunciado,
-            "tipo": p.tipo,
-            "opciones": [{"id": o.id, "texto": o.texto, "correcta": o.correcta} for o in opts]
-        })
-    return items  # el test espera lista
+    items = grading.answer_key_cache().get_or_load(("preguntas", quiz_id),
+                                                   dbrouting.primary_loader(lambda: _load_preguntas(quiz_id)),
+                                                   httpcache.shared_version(httpcache.quiz_key(quiz_id)))
+    # 'correcta' sólo para el dueño del curso: cualquiera puede registrarse como DOCENTE
+    if get_jwt().get("rol") in {"DOCENTE", "ADMIN"} and not _owned_quiz_course(quiz_id)[1]:
+        return items  # el test espera lista
+    return _vista_estudiante(items)
+
+
+@bp.get("/<int:quiz_id>/analytics")
+@docente_required
+def quiz_analytics(quiz_id: int):
+    """Dificultad, discriminación y distractores por pregunta; sólo el docente dueño del curso."""
+    _, denegado = _owned_quiz_course(quiz_id)
+    if denegado:
+        return denegado
+    return analytics.quiz_analytics(quiz_id)
+
 
 @bp.post("/<int:quiz_id>/attempts")
 @jwt_required()
 def start_attempt(quiz_id: int):
     user_id = int(get_jwt_identity())
     q = Quiz.query.get_or_404(quiz_id)
-    cnt = Intento.query.filter_by(quiz_id=quiz_id, estudiante_id=user_id).count()
-    if q.intentos_max and cnt >= q.intentos_max:
+    try:
+        it = attempts.start(q, user_id, grace_seconds=current_app.config["ATTEMPT_GRACE_SECONDS"])
+    except attempts.AttemptLimitReached:
         return {"error": "límite de intentos alcanzado"}, 409
-    it = Intento(quiz_id=quiz_id, estudiante_id=user_id)
-    db.session.add(it)
-    db.session.commit()
-    return {"intento_id": it.id}
+    except attempts.AttemptContended:
+        return {"error": "demasiadas altas simultáneas, reintente"}, 503, {"Retry-After": "1"}
+    return {"intento_id": it.id, "numero": it.numero,
+            "limite": it.limite.isoformat() + "Z" if it.limite else None}
+
 
 @bp.post("/attempts/<int:intento_id>/submit")
 @jwt_required()
@@ -110,25 +162,51 @@ def submit_attempt(intento_id: int):
     # Validación estricta del body para satisfacer tests (400/422 si falta o es inválido)
     if not isinstance(data, dict) or "respuestas" not in data or not isinstance(data["respuestas"], dict):
         return {"error": "se requiere JSON con 'respuestas' (dict)"}, 422
+    if it.entregado:
+        return {"error": "intento ya entregado"}, 409
 
     respuestas = data["respuestas"]
+    if current_app.config["SUBMIT_MODE"] == "queue":
+        return _enqueue_submission(it, respuestas)
 
-    preguntas = Pregunta.query.filter_by(quiz_id=it.quiz_id).all()
-    total = len(preguntas)
-    correctas = 0
-    for p in preguntas:
-        sel = respuestas.get(str(p.id)) or respuestas.get(p.id)
-        if sel is None:
-            continue
-        ok = Opcion.query.filter_by(id=int(sel), pregunta_id=p.id, correcta=True).first()
-        if ok:
-            correctas += 1
-
-    puntaje = int(round(100.0 * correctas / total)) if total else 0
-    for attr, value in (("correctas", correctas), ("total", total), ("puntaje", puntaje)):
-        try:
-            setattr(it, attr, value)
-        except Exception:
-            pass
+    # Clave de respuestas cacheada (una consulta en miss) y corrección en memoria
+    res = grading.grade(grading.get_answer_key(it.quiz_id), respuestas)
+    correctas, total, puntaje = res["correctas"], res["total"], res["puntaje"]
+    try:
+        # UPDATE condicional por PK: sólo una entrega gana y nunca fuera de plazo
+        attempts.close(it, puntaje)
+    except attempts.AttemptClosed as e:
+        return {"error": e.motivo}, 409
+    curso_id = db.session.get(Quiz, it.quiz_id).curso_id
+    stats.bump(curso_id, intentos=1, suma_puntaje=puntaje)
+    grading.save_results(it.id, res["detalle"])
     db.session.commit()
     return {"correctas": correctas, "total": total, "puntaje": puntaje}
+
+
+def _enqueue_submission(it, respuestas: dict):
+    """Modo cola: el plazo se valida ahora; la corrección la hacen los workers."""
+    if it.limite and it.limite < datetime.utcnow():
+        return {"error": "tiempo agotado"}, 409
+    ticket = submissions.enqueue(it, respuestas)
+    if ticket is None:
+        db.session.rollback()
+        return {"error": "intento ya entregado"}, 409
+    db.session.commit()
+    workers = current_app.extensions.get("submission_workers")
+    if workers:
+        workers.notify()
+    return ({"ticket": ticket, "estado": submissions.PENDIENTE}, 202,
+            {"Location": f"/api/quizzes/submissions/{ticket}"})
+
+
+@bp.get("/submissions/<int:ticket>")
+@jwt_required()
+def get_submission(ticket: int):
+    entrega = EntregaPendiente.query.get_or_404(ticket)
+    if entrega.estudiante_id != int(get_jwt_identity()):
+        return {"error": "forbidden"}, 403
+    headers = {"Cache-Control": "no-store"}
+    if entrega.estado in (submissions.PENDIENTE, submissions.PROCESANDO):
+        headers["Retry-After"] = "1"
+    return submissions.as_dict(entrega), 200, headers
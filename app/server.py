@@ -0,0 +1,255 @@
+"""Servidor de producción pre-fork (stdlib + werkzeug, sin dependencias nuevas).
+
+El master crea la app una sola vez (migraciones/chequeo de esquema, índice de búsqueda,
+imports de blueprints), precalienta cachés y recién entonces hace fork de los workers:
+cada worker hereda todo eso ya hecho (copy-on-write) y atiende el socket compartido con un
+pool acotado de hilos. Los hilos de fondo de la app arrancan en cada worker, después del fork.
+
+SIGTERM/SIGINT al master: los workers dejan de aceptar, terminan los requests en curso,
+vuelcan el progreso pendiente y salen; pasado WEB_GRACEFUL_TIMEOUT se los mata.
+Un worker que muere se reemplaza. Sin os.fork (Windows) se sirve en un solo proceso.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+log = logging.getLogger("lms.server")
+
+
+_SHED_BODY = b'{"error":"servidor saturado"}\n'
+SHED_RESPONSE = (b"HTTP/1.1 503 Service Unavailable\r\nRetry-After: 1\r\nContent-Type: application/json\r\n"
+                 b"Content-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(_SHED_BODY), _SHED_BODY))
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """BaseWSGIServer que atiende cada conexión en un pool de `threads` hilos (no uno por conexión).
+
+    A lo sumo `max_pending` conexiones esperan hilo; las que llegan con la cola llena reciben
+    503 + Retry-After en el acto en vez de esperar detrás de clientes lentos.
+    """
+
+    def __init__(self, sock: socket.socket, app, threads: int, keepalive: float, max_pending: int = 64):
+        handler = type("Handler", (WSGIRequestHandler,), {
+            "protocol_version": "HTTP/1.1",
+            "timeout": keepalive,  # una conexión keep-alive ociosa no retiene un hilo para siempre
+        })
+        self.multithread = threads > 1
+        host, port = sock.getsockname()[:2]
+        super().__init__(host, port, app, handler=handler, fd=sock.fileno())
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="http")
+        self._capacity = threads + max_pending
+        self._inflight = 0  # conexiones en un hilo o esperando uno
+        self._lock = threading.Lock()
+        self.shed = 0
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            lleno = self._inflight >= self._capacity
+            if lleno:
+                self.shed += 1
+            else:
+                self._inflight += 1
+        if lleno:
+            self._shed(request)
+            return
+        self._pool.submit(self._handle, request, client_address)
+
+    def _shed(self, request) -> None:
+        try:
+            request.settimeout(1.0)
+            request.sendall(SHED_RESPONSE)
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._lock:
+                self._inflight -= 1
+
+    def drain(self) -> None:
+        """Espera a que terminen los requests aceptados (llamar tras shutdown())."""
+        self._pool.shutdown(wait=True)
+
+
+def warm(app, quizzes: int = 50, courses: int = 500) -> dict:
+    """Precarga en el master lo que los workers leerían en sus primeros requests.
+
+    Claves de respuestas de los quizzes más recientes, dueños de cursos y un request por
+    ruta pública (compila el url_map y la caché de sentencias de SQLAlchemy).
+    """
+    from . import db
+    from .models import Curso, Quiz
+    from .utils import grading
+    with app.app_context():
+        quiz_ids = [q for (q,) in db.session.query(Quiz.id).order_by(Quiz.id.desc()).limit(quizzes)]
+        for quiz_id in quiz_ids:
+            grading.get_answer_key(quiz_id)
+        owners = app.extensions["course_owners"]
+        filas = db.session.query(Curso.id, Curso.docente_id).order_by(Curso.id.desc()).limit(courses).all()
+        for curso_id, docente_id in filas:
+            owners.put(curso_id, owners.version(curso_id), docente_id)
+        db.session.remove()
+    with app.test_client() as client:
+        for path in ("/api/health", "/api/courses/"):
+            client.get(path)
+    return {"quizzes": len(quiz_ids), "cursos": len(filas)}
+
+
+def _bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.create_server((host, port), family=socket.AF_INET6 if ":" in host else socket.AF_INET,
+                                backlog=backlog, reuse_port=False)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock, threads: int, keepalive: float) -> None:
+    from . import start_background, stop_background
+    server = PooledWSGIServer(sock, app, threads, keepalive, app.config["WEB_MAX_PENDING"])
+
+    def _stop(signum, frame):
+        # shutdown() espera a que serve_forever salga: no puede llamarse desde su propio hilo
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C llega a todo el grupo: decide el master
+    start_background(app)
+    try:
+        server.serve_forever(poll_interval=0.5)
+    finally:
+        server.drain()
+        stop_background(app)
+        server.server_close()
+
+
+class Master:
+    """Mantiene `workers` procesos hijos vivos sobre un socket ya abierto."""
+
+    def __init__(self, app, sock, workers: int, threads: int, keepalive: float, graceful_timeout: float):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.threads = threads
+        self.keepalive = keepalive
+        self.graceful_timeout = graceful_timeout
+        self.children = {}  # pid -> slot
+        self.stopping = False
+
+    def spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(self.app, self.sock, self.threads, self.keepalive)
+            except BaseException:
+                log.exception("worker %d falló", slot)
+                code = 1
+            finally:
+                logging.shutdown()
+                os._exit(code)  # sin atexit ni finalizadores heredados del master
+        self.children[pid] = slot
+
+    def _terminate(self, signum, frame) -> None:
+        if self.stopping:
+            return
+        self.stopping = True
+        log.info("apagando %d workers (señal %d)", len(self.children), signum)
+        for pid in list(self.children):
+            self._kill(pid, signal.SIGTERM)
+        signal.signal(signal.SIGALRM, self._force)
+        signal.alarm(max(1, int(self.graceful_timeout)))
+
+    def _force(self, signum, frame) -> None:
+        for pid in list(self.children):
+            log.warning("worker %d no terminó a tiempo: SIGKILL", pid)
+            self._kill(pid, signal.SIGKILL)
+
+    @staticmethod
+    def _kill(pid: int, sig) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._terminate)
+        signal.signal(signal.SIGINT, self._terminate)
+        for slot in range(self.workers):
+            self.spawn(slot)
+        log.info("master %d: %d workers x %d hilos", os.getpid(), self.workers, self.threads)
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, 0)
+            except ChildProcessError:
+                break
+            slot = self.children.pop(pid, None)
+            if slot is None or self.stopping:
+                continue
+            log.warning("worker %d salió (status %d); se reemplaza", pid, status)
+            time.sleep(0.1)  # evita un bucle de fork si el worker muere al arrancar
+            self.spawn(slot)
+        signal.alarm(0)
+        self.sock.close()
+
+
+def serve(app, host: str, port: int, workers: int, threads: int, keepalive: float = 5.0,
+          graceful_timeout: float = 30.0, warm_up: bool = True) -> None:
+    """Arranca el servidor con una app creada con create_app(background=False)."""
+    from . import db
+    t0 = time.perf_counter()
+    if warm_up:
+        log.info("precalentado: %s", warm(app, app.config["WARM_QUIZZES"], app.config["WARM_COURSES"]))
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()  # ninguna conexión abierta debe cruzar el fork
+    sock = _bind(host, port)
+    log.info("escuchando en http://%s:%d (listo en %.0f ms)", host, sock.getsockname()[1],
+             (time.perf_counter() - t0) * 1000)
+    if workers <= 1 or not hasattr(os, "fork"):
+        if workers > 1:
+            log.warning("os.fork no disponible: un solo proceso con %d hilos", threads)
+        try:
+            _run_worker(app, sock, threads, keepalive)
+        finally:
+            sock.close()
+        return
+    gc.freeze()  # lo cargado hasta acá queda fuera del GC: sus páginas siguen compartidas tras el fork
+    Master(app, sock, workers, threads, keepalive, graceful_timeout).run()
+
+
+def main(argv=None) -> None:
+    from . import create_app
+    t0 = time.perf_counter()
+    app = create_app(background=False)
+    cfg = app.config
+    parser = argparse.ArgumentParser(description="Servidor de producción (pre-fork) de lms-lite")
+    parser.add_argument("--host", default=cfg["WEB_HOST"])
+    parser.add_argument("--port", type=int, default=cfg["WEB_PORT"])
+    parser.add_argument("--workers", type=int, default=cfg["WEB_WORKERS"])
+    parser.add_argument("--threads", type=int, default=cfg["WEB_THREADS"])
+    parser.add_argument("--no-warm", action="store_true", help="no precalentar cachés en el master")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(process)d] %(levelname)s %(name)s: %(message)s")
+    if not cfg["WEB_ACCESS_LOG"]:
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    log.info("app creada en %.0f ms", (time.perf_counter() - t0) * 1000)
+    serve(app, args.host, args.port, max(1, args.workers), max(1, args.threads), cfg["WEB_KEEPALIVE"],
+          cfg["WEB_GRACEFUL_TIMEOUT"], warm_up=not args.no_warm)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Análisis de ítems por quiz: dificultad, discriminación y frecuencia de distractores.
+
+El conteo lo hace la BD: un GROUP BY (pregunta, opción, grupo extremo) sobre las respuestas
+entregadas, con el grupo por puntaje calculado con row_number() en la misma sentencia. Python
+sólo suma esas pocas filas (preguntas x opciones x 3) en totales por pregunta y por opción.
+El resultado se cachea por quiz junto con una huella (#intentos entregados, último id,
+versión del quiz en la BD) que cambia con cada entrega nueva.
+"""
+from flask import current_app
+from sqlalchemy import case, func, literal, select
+from .. import db
+from ..models import IntentoQuiz, RespuestaIntento
+from . import grading, httpcache
+
+GRUPO_EXTREMO = 0.27  # Kelley: 27% superior e inferior por puntaje total
+SUPERIOR, INFERIOR = 1, 2
+
+
+def fingerprint(quiz_id: int) -> tuple:
+    """Huella barata (una consulta agregada sobre ix_intento_quiz_estudiante + una lectura por PK)."""
+    n, ultimo = (db.session.query(func.count(IntentoQuiz.id), func.max(IntentoQuiz.id))
+                 .filter(IntentoQuiz.quiz_id == quiz_id, IntentoQuiz.entregado.is_(True)).one())
+    return n, ultimo, httpcache.shared_version(httpcache.quiz_key(quiz_id))
+
+
+def group_size(intentos: int) -> int:
+    """Tamaño de cada grupo extremo; 0 si con `intentos` no se pueden formar dos grupos disjuntos."""
+    k = int(round(intentos * GRUPO_EXTREMO))
+    return 0 if k == 0 or 2 * k > intentos else k
+
+
+def load_counts(quiz_id: int, intentos: int) -> tuple:
+    """([(pregunta_id, opcion_id, grupo, respuestas, aciertos)], k) en una sentencia agregada.
+
+    grupo es INFERIOR / SUPERIOR para los k intentos de menor / mayor puntaje y 0 para el resto.
+    """
+    k = group_size(intentos)
+    ranking = (select(IntentoQuiz.id, func.row_number().over(order_by=(IntentoQuiz.puntaje, IntentoQuiz.id))
+                      .label("rn"))
+               .where(IntentoQuiz.quiz_id == quiz_id, IntentoQuiz.entregado.is_(True))
+               .subquery())
+    grupo = case((ranking.c.rn <= k, INFERIOR), (ranking.c.rn > intentos - k, SUPERIOR), else_=0) if k else literal(0)
+    stmt = (select(RespuestaIntento.pregunta_id, RespuestaIntento.opcion_id, grupo.label("grupo"),
+                   func.count(), func.sum(case((RespuestaIntento.correcta.is_(True), 1), else_=0)))
+            .join(ranking, ranking.c.id == RespuestaIntento.intento_id)
+            .group_by(RespuestaIntento.pregunta_id, RespuestaIntento.opcion_id, "grupo"))
+    return db.session.execute(stmt).all(), k
+
+
+def compute(key: dict, counts: list, k: int) -> list:
+    """Totales por pregunta y por opción a partir de las filas agregadas de load_counts."""
+    por_pregunta = {p: {"total": 0, "correctas": 0, "sin_resp": 0, "sup_ok": 0, "inf_ok": 0} for p in key}
+    frec = {}
+    for pregunta_id, opcion_id, grupo, n, ok in counts:
+        acc = por_pregunta.get(pregunta_id)
+        if acc is None:
+            continue  # pregunta borrada o ajena a la clave actual
+        ok = ok or 0
+        acc["total"] += n
+        acc["correctas"] += ok
+        if opcion_id in key[pregunta_id]:
+            frec[opcion_id] = frec.get(opcion_id, 0) + n
+        else:
+            acc["sin_resp"] += n
+        if grupo == SUPERIOR:
+            acc["sup_ok"] += ok
+        elif grupo == INFERIOR:
+            acc["inf_ok"] += ok
+
+    out = []
+    for pregunta_id, opciones in key.items():
+        acc = por_pregunta[pregunta_id]
+        n = acc["total"]
+        items = []
+        for opcion_id, es_correcta in opciones.items():
+            f = frec.get(opcion_id, 0)
+            items.append({"opcion_id": opcion_id, "correcta": es_correcta, "frecuencia": f,
+                          "proporcion": round(f / n, 4) if n else None})
+        out.append({
+            "pregunta_id": pregunta_id,
+            "respuestas": n,
+            "sin_respuesta": acc["sin_resp"],
+            "dificultad": round(acc["correctas"] / n, 4) if n else None,  # proporción de aciertos
+            # índice D = p(superior) - p(inferior); los grupos tienen el mismo tamaño
+            "discriminacion": round((acc["sup_ok"] - acc["inf_ok"]) / k, 4) if k else None,
+            "opciones": items,
+        })
+    return out
+
+
+def build(quiz_id: int, intentos: int) -> dict:
+    key = grading.get_answer_key(quiz_id)
+    counts, k = load_counts(quiz_id, intentos)
+    preguntas = compute(key, counts, k)
+    return {"quiz_id": quiz_id, "respuestas": sum(p["respuestas"] for p in preguntas), "grupo_extremo": k,
+            "preguntas": preguntas}
+
+
+def quiz_analytics(quiz_id: int) -> dict:
+    """Resultado cacheado mientras la huella del quiz no cambie."""
+    cache = current_app.extensions["quiz_analytics"]
+    huella = fingerprint(quiz_id)
+    entry = cache.get(quiz_id)
+    if entry is not None and entry[0] == huella:
+        return entry[1]
+    data = build(quiz_id, huella[0])
+    data["intentos"] = huella[0]
+    cache.put(quiz_id, cache.version(quiz_id), (huella, data))
+    return data
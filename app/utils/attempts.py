@@ -0,0 +1,151 @@
+"""Ciclo de vida de intentos: alta atómica con límite, deadline en servidor y cierre por barrido."""
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, func, literal, and_, or_, exists
+from sqlalchemy.exc import IntegrityError
+from .. import db
+from ..models import IntentoQuiz, Quiz, EntregaPendiente
+from . import stats
+
+
+class AttemptLimitReached(Exception):
+    pass
+
+
+class AttemptContended(Exception):
+    """Todas las altas perdieron la carrera por el número de intento; el cliente puede reintentar."""
+
+
+class AttemptClosed(Exception):
+    """El intento ya fue entregado o venció su tiempo."""
+
+    def __init__(self, motivo: str):
+        super().__init__(motivo)
+        self.motivo = motivo
+
+
+def deadline_for(quiz: Quiz, now: datetime, grace_seconds: int):
+    if not quiz.tiempo_limite_min:
+        return None
+    return now + timedelta(minutes=quiz.tiempo_limite_min, seconds=grace_seconds)
+
+
+def start(quiz: Quiz, estudiante_id: int, grace_seconds: int = 30, retries: int = 3) -> IntentoQuiz:
+    """INSERT ... SELECT condicional: el número de intento sale de la misma sentencia.
+
+    El índice único (quiz_id, estudiante_id, numero) hace que dos altas concurrentes
+    no puedan tomar el mismo número; la perdedora reintenta y el WHERE corta al llegar
+    a intentos_max (AttemptLimitReached). Si pierde las `retries` veces lanza
+    AttemptContended: el estudiante puede seguir bajo el límite. Hace commit.
+    """
+    for _ in range(retries):
+        now = datetime.utcnow()
+        siguiente = (select(func.coalesce(func.max(IntentoQuiz.numero), 0) + 1)
+                     .where(IntentoQuiz.quiz_id == quiz.id, IntentoQuiz.estudiante_id == estudiante_id)
+                     .scalar_subquery())
+        fila = select(literal(quiz.id), literal(estudiante_id), siguiente,
+                      literal(deadline_for(quiz, now, grace_seconds), db.DateTime), literal(now, db.DateTime),
+                      literal(False))
+        if quiz.intentos_max:
+            fila = fila.where(siguiente <= quiz.intentos_max)
+        stmt = (IntentoQuiz.__table__.insert()
+                .from_select(["quiz_id", "estudiante_id", "numero", "limite", "fecha", "entregado"], fila)
+                .returning(IntentoQuiz.id))
+        try:
+            intento_id = db.session.execute(stmt).scalar()
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            continue
+        if intento_id is None:
+            raise AttemptLimitReached()
+        return db.session.get(IntentoQuiz, intento_id)
+    raise AttemptContended()
+
+
+def try_close(intento_id: int, puntaje: float, now: datetime = None) -> bool:
+    """UPDATE condicional por PK: True si este llamador cerró el intento (abierto y en plazo). Sin commit."""
+    now = now or datetime.utcnow()
+    res = db.session.execute(
+        update(IntentoQuiz)
+        .where(IntentoQuiz.id == intento_id, IntentoQuiz.entregado.is_(False),
+               or_(IntentoQuiz.limite.is_(None), IntentoQuiz.limite >= now))
+        .values(entregado=True, puntaje=puntaje)
+        .execution_options(synchronize_session=False))
+    return res.rowcount == 1
+
+
+def close_reason(intento_id: int) -> str:
+    return "intento ya entregado" if db.session.get(IntentoQuiz, intento_id).entregado else "tiempo agotado"
+
+
+def close(intento: IntentoQuiz, puntaje: float, now: datetime = None) -> None:
+    """Marca el intento como entregado sólo si sigue abierto y en plazo.
+
+    No hace commit; lanza AttemptClosed si otro request ya lo cerró o venció el deadline.
+    """
+    if not try_close(intento.id, puntaje, now):
+        db.session.rollback()
+        raise AttemptClosed(close_reason(intento.id))
+
+
+def sweep(batch_size: int = 500, now: datetime = None) -> int:
+    """Cierra con puntaje 0 los intentos vencidos y sin entregar, en lotes. Devuelve #cerrados.
+
+    Se saltan los intentos con una entrega encolada (SUBMIT_MODE=queue): su respuesta
+    llegó en plazo y la corregirá el worker.
+    """
+    now = now or datetime.utcnow()
+    en_cola = (exists().where(EntregaPendiente.intento_id == IntentoQuiz.id,
+                              EntregaPendiente.estado.in_(("PENDIENTE", "PROCESANDO"))))
+    abiertos_vencidos = and_(IntentoQuiz.entregado.is_(False), IntentoQuiz.limite < now, ~en_cola)
+    cerrados = 0
+    while True:
+        rows = (db.session.query(IntentoQuiz.id, Quiz.curso_id)
+                .join(Quiz, Quiz.id == IntentoQuiz.quiz_id)
+                .filter(abiertos_vencidos)
+                .limit(batch_size).all())
+        if not rows:
+            return cerrados
+        por_curso = {}
+        for intento_id, curso_id in rows:
+            por_curso.setdefault(curso_id, []).append(intento_id)
+        for curso_id, ids in por_curso.items():
+            res = db.session.execute(update(IntentoQuiz)
+                                     .where(IntentoQuiz.id.in_(ids), abiertos_vencidos)
+                                     .values(entregado=True, puntaje=0.0)
+                                     .execution_options(synchronize_session=False))
+            stats.bump(curso_id, intentos=res.rowcount)
+            cerrados += res.rowcount
+        db.session.commit()
+
+
+class AttemptSweeper:
+    """Hilo daemon que ejecuta sweep() cada `interval` segundos dentro de un app context."""
+
+    def __init__(self, app, interval: float, batch_size: int = 500):
+        self.app = app
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="attempt-sweeper", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    n = sweep(self.batch_size)
+                    if n:
+                        self.app.logger.info("sweeper: %d intentos vencidos cerrados", n)
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception("sweeper de intentos falló")
+                finally:
+                    db.session.remove()
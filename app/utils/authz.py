@@ -1,22 +1,99 @@
+"""Autorización por rol y por dueño de curso.
+
+El JWT se verifica una sola vez por request y los claims quedan en `g`; la pertenencia
+curso -> docente sale de una caché de proceso (el dueño de un curso no cambia) en vez de
+leer el Curso en cada ruta de docente.
+"""
 from functools import wraps
+from flask import g, current_app
 from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from .. import db
+from ..models import Curso
+
+
+def init_app(app) -> None:
+    @app.before_request
+    def _reset_claims():
+        # el app context puede reutilizarse entre requests (tests): los claims no deben filtrarse
+        g.pop("authz_claims", None)
+        g.pop("_jwt_extended_jwt", None)
+
+
+def claims() -> dict:
+    """Claims del JWT del request; verifica y decodifica sólo la primera vez.
+
+    Si @jwt_required() ya verificó el token en este request, se reutiliza ese resultado.
+    """
+    cached = g.get("authz_claims")
+    if cached is None:
+        if not g.get("_jwt_extended_jwt"):
+            verify_jwt_in_request()
+        cached = g.authz_claims = get_jwt() or {}
+    return cached
+
+
+def user_id() -> int:
+    return int(claims()[current_app.config["JWT_IDENTITY_CLAIM"]])
+
+
+def course_owner(curso_id: int):
+    """docente_id del curso (caché de proceso) o None si el curso no existe."""
+    cache = current_app.extensions["course_owners"]
+    owner = cache.get(curso_id)
+    if owner is None:
+        version = cache.version(curso_id)
+        owner = db.session.query(Curso.docente_id).filter_by(id=curso_id).scalar()
+        if owner is not None:
+            cache.put(curso_id, version, owner)
+    return owner
+
+
+def owner_denied(curso_id: int):
+    """None si el usuario del JWT es el dueño del curso; si no, la respuesta 404/403 a devolver."""
+    owner = course_owner(curso_id)
+    if owner is None:
+        return {"error": "curso no encontrado"}, 404
+    if owner != user_id():
+        return {"error": "no autorizado (owner requerido)"}, 403
+    return None
+
+
+def invalidate_course_owner(curso_id: int) -> None:
+    """Llamar si un curso cambia de docente o se borra."""
+    current_app.extensions["course_owners"].bump(curso_id)
 
 
 def require_role(*roles):
     """
     Uso:
-      @jwt_required()
       @require_role("DOCENTE")
       def create_course(): ...
+
+    Verifica el JWT por sí mismo (no hace falta @jwt_required()); si se apila bajo
+    @jwt_required() reutiliza el token que éste ya verificó, sin decodificarlo de nuevo.
     """
     def wrapper(fn):
         @wraps(fn)
         def inner(*args, **kwargs):
-            verify_jwt_in_request()
-            claims = get_jwt() or {}
-            rol = claims.get("rol")
+            rol = claims().get("rol")
             if rol not in roles:
                 return {"error": "forbidden", "needed": list(roles), "got": rol}, 403
             return fn(*args, **kwargs)
         return inner
     return wrapper
+
+
+def docente_required(fn):
+    """Atajo para rutas de docente (JWT válido + rol DOCENTE)."""
+    return require_role("DOCENTE")(fn)
+
+
+def require_course_owner(arg: str = "course_id"):
+    """Rol DOCENTE y dueño del curso indicado por el parámetro de ruta `arg`; 404 si no existe."""
+    def wrapper(fn):
+        @wraps(fn)
+        @docente_required
+        def inner(*args, **kwargs):
+            return owner_denied(kwargs[arg]) or fn(*args, **kwargs)
+        return inner
+    return wrapper
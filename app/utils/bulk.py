@@ -0,0 +1,19 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from .. import db
+
+
+def chunks(items: list, size: int = 500):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def dialect_insert(model):
+    """insert() del dialecto actual, con soporte de ON CONFLICT (SQLite / Postgres)."""
+    if db.session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def insert_ignore(model):
+    """INSERT ... ON CONFLICT DO NOTHING."""
+    return dialect_insert(model).on_conflict_do_nothing()
@@ -0,0 +1,106 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+
+class VersionedLRUCache:
+    """LRU acotado en memoria de proceso; cada clave lleva un número de versión.
+
+    Una entrada guardada con una versión anterior a la vigente se trata como
+    miss, así que una carga concurrente con un bump nunca deja datos viejos.
+    `source` es una versión externa opcional (p. ej. la de ContenidoVersion en la BD):
+    la entrada también es miss si se guardó con otra, así un bump en otro proceso
+    invalida la copia de éste.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._versions = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def version(self, key) -> int:
+        return self._versions.get(key, 0)
+
+    def get(self, key, source=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if (entry is None or entry[0] != self._versions.get(key, 0)
+                    or (source is not None and entry[1] != source)):
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, version: int, value, source=None) -> None:
+        with self._lock:
+            if version != self._versions.get(key, 0):
+                return  # se cargó antes de un bump: no se cachea
+            self._data[key] = (version, source, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def bump(self, key) -> int:
+        """Invalida la clave y devuelve la nueva versión."""
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            if self._data.pop(key, None) is not None:
+                self.evictions += 1
+            return self._versions[key]
+
+    def get_or_load(self, key, loader, source=None):
+        value = self.get(key, source)
+        if value is None:
+            version = self.version(key)
+            value = loader()
+            self.put(key, version, value, source)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "maxsize": self.maxsize,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class TTLCache:
+    """Caché clave -> valor con expiración fija (segundos) y tamaño acotado."""
+
+    def __init__(self, ttl: float = 30.0, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] < monotonic():
+                del self._data[key]
+                return None
+            return entry[1]
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = (monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
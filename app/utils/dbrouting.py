@@ -0,0 +1,209 @@
+"""Ruteo lectura/escritura: los GET de cursos, quizzes y /me leen de una réplica.
+
+La réplica es DATABASE_REPLICA_URL (otra BD o, en local, otro archivo SQLite) o, con
+DB_READ_POOL=1 y SQLite en archivo, un pool aparte de conexiones read-only sobre el mismo
+archivo (útil en WAL: los lectores no esperan al escritor). Todo lo demás va al primario:
+requests que no son GET, flush/INSERT/UPDATE/DELETE (también dentro de un GET, y desde ahí
+el resto del request) y los cargadores de cachés de proceso (`primary_loader`).
+
+Read-your-writes: tras un request que escribió, el mismo usuario lee del primario durante
+DB_READ_STICKY_SECONDS. En el worker que atendió la escritura lo garantiza una caché de proceso
+por usuario; en los demás workers sólo la cookie `lms_rw`, así que un cliente que no guarda
+cookies (scripts, apps con el JWT en un header) puede leer de la réplica un dato anterior a su
+propia escritura si el siguiente request cae en otro worker.
+"""
+import sqlite3
+import time
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+from . import dbtuning
+from .cache import TTLCache
+
+BIND = "replica"
+READ_BLUEPRINTS = {"courses", "quizzes", "me"}
+STICKY_COOKIE = "lms_rw"
+
+
+def replica_url(primary_uri: str, replica: str = None, read_pool: bool = False):
+    """URL del bind de lectura o None (sin ruteo). SQLite en memoria no admite un segundo pool."""
+    if replica:
+        return replica
+    url = make_url(primary_uri)
+    if not read_pool or url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    return f"sqlite:///file:{url.database}?mode=ro&uri=true"
+
+
+class RoutingSession(Session):
+    """Session de Flask-SQLAlchemy que elige réplica o primario por sentencia."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _reads_from_replica(clause):
+            return self._db.engines[BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _flush_writes(session, flush_context, instances):
+    # las lecturas que haga el flush (y el resto del request) van al primario
+    if has_request_context():
+        g.db_wrote = True
+
+
+def _is_write(clause) -> bool:
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, TextClause):
+        verbo = clause.text.split(None, 1)[:1]
+        return not verbo or verbo[0].upper() not in ("SELECT", "WITH")
+    return False
+
+
+def _reads_from_replica(clause) -> bool:
+    if not has_request_context() or "db_routing" not in current_app.extensions:
+        return False
+    if _is_write(clause):
+        g.db_wrote = True
+        return False
+    if g.get("db_wrote") or g.get("db_pinned"):
+        return False
+    route = g.get("db_route")
+    if route is None:
+        route = g.db_route = _decide()
+    return route
+
+
+def _decide() -> bool:
+    router = current_app.extensions["db_routing"]
+    if request.method not in ("GET", "HEAD") or request.blueprint not in READ_BLUEPRINTS:
+        router.primary += 1
+        return False
+    if _sticky(router):
+        router.sticky += 1
+        return False
+    router.replica += 1
+    return True
+
+
+def _user_key():
+    # claims ya verificados en este request (authz o @jwt_required); no se decodifica de nuevo
+    if "Authorization" not in request.headers:
+        return None
+    claims = g.get("authz_claims")
+    if claims is None:
+        try:
+            claims = get_jwt()
+        except RuntimeError:
+            return None
+    return claims.get(current_app.config["JWT_IDENTITY_CLAIM"])
+
+
+def _sticky(router) -> bool:
+    try:
+        if float(request.cookies.get(STICKY_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    user = _user_key()
+    return user is not None and router.recent_writers.get(user) is not None
+
+
+@contextmanager
+def primary():
+    """Fuerza el primario para las lecturas del bloque (lecturas que alimentan cachés o escrituras)."""
+    if not has_request_context():
+        yield
+        return
+    prev = g.get("db_pinned")
+    g.db_pinned = True
+    try:
+        yield
+    finally:
+        g.db_pinned = prev
+
+
+def primary_loader(loader):
+    """Envuelve el cargador de un get_or_load: una réplica atrasada no debe quedar cacheada
+    bajo una versión ya incrementada en el proceso."""
+    def load():
+        with primary():
+            return loader()
+    return load
+
+
+class Router:
+    def __init__(self, sticky_seconds: float):
+        self.sticky_seconds = sticky_seconds
+        self.recent_writers = TTLCache(ttl=sticky_seconds, maxsize=100_000)
+        self.replica = 0
+        self.primary = 0
+        self.sticky = 0
+
+    def stats(self) -> dict:
+        return {"replica": self.replica, "primary": self.primary, "sticky": self.sticky,
+                "sticky_seconds": self.sticky_seconds}
+
+
+def init_app(app, db, settings: dict) -> None:
+    """Activa el ruteo si hay bind de réplica configurado (SQLALCHEMY_BINDS[BIND])."""
+    if BIND not in app.config.get("SQLALCHEMY_BINDS", {}):
+        return
+    # Flask-SQLAlchemy crea una MetaData por bind; la réplica no tiene tablas propias (create_all/drop_all)
+    db.metadatas.pop(BIND, None)
+    router = app.extensions["db_routing"] = Router(app.config["DB_READ_STICKY_SECONDS"])
+    with app.app_context():
+        _install_replica_pragmas(db.engines[BIND], settings)
+
+    @app.before_request
+    def _reset_route():
+        # el app context puede reutilizarse entre requests (tests)
+        for name in ("db_route", "db_wrote", "db_pinned"):
+            g.pop(name, None)
+
+    @app.after_request
+    def _remember_write(response):
+        if g.get("db_wrote"):
+            user = _user_key()
+            if user is not None:
+                router.recent_writers.put(user, True)
+            response.set_cookie(STICKY_COOKIE, f"{time.time() + router.sticky_seconds:.3f}",
+                                max_age=max(1, int(router.sticky_seconds)), httponly=True, samesite="Lax")
+        return response
+
+
+def _install_replica_pragmas(engine, settings: dict) -> None:
+    if engine.dialect.name != "sqlite":
+        return
+    # journal_mode lo decide el primario; la réplica sólo lee
+    pragmas = dbtuning.sqlite_pragmas({k: v for k, v in settings.items() if k != "SQLITE_JOURNAL_MODE"})
+    pragmas.append("PRAGMA query_only=ON")
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for pragma in pragmas:
+            cur.execute(pragma)
+        cur.close()
+
+
+def sync_sqlite_replica(db) -> str:
+    """Copia el primario SQLite sobre el archivo de la réplica (backup online); para pruebas locales."""
+    origen, replica = db.engine.url, db.engines[BIND].url
+    if origen.get_backend_name() != "sqlite" or replica.get_backend_name() != "sqlite":
+        raise ValueError("sync sólo entre archivos SQLite")
+    destino = replica.database[5:] if replica.database.startswith("file:") else replica.database
+    if destino == origen.database:
+        raise ValueError("la réplica es el mismo archivo que el primario (pool read-only): no hay nada que copiar")
+    src, dst = sqlite3.connect(origen.database), sqlite3.connect(destino)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+    return destino
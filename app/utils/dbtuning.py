@@ -0,0 +1,89 @@
+import os
+from sqlalchemy import event
+
+# Perfiles de motor. "default" no toca nada (comportamiento histórico);
+# "production" activa WAL y un pool dimensionado. Cada valor se puede pisar por env.
+PROFILES = {
+    "default": {},
+    "production": {
+        "SQLITE_JOURNAL_MODE": "WAL",
+        "SQLITE_SYNCHRONOUS": "NORMAL",
+        "SQLITE_BUSY_TIMEOUT_MS": 5000,
+        "SQLITE_MMAP_SIZE": 256 * 1024 * 1024,
+        "SQLITE_CACHE_SIZE_KB": 64 * 1024,
+        "DB_POOL_SIZE": 10,
+        "DB_MAX_OVERFLOW": 20,
+        "DB_POOL_RECYCLE": 1800,
+        "DB_POOL_PRE_PING": True,
+    },
+}
+
+_CHOICES = {
+    "SQLITE_JOURNAL_MODE": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "SQLITE_SYNCHRONOUS": {"OFF", "NORMAL", "FULL", "EXTRA"},
+}
+_INT_KEYS = {"SQLITE_BUSY_TIMEOUT_MS", "SQLITE_MMAP_SIZE", "SQLITE_CACHE_SIZE_KB",
+             "DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_POOL_RECYCLE"}
+
+
+def load_settings(profile: str) -> dict:
+    """Perfil base + overrides de entorno; ValueError si el perfil no existe."""
+    if profile not in PROFILES:
+        raise ValueError(f"DB_PROFILE desconocido: {profile!r} (opciones: {', '.join(PROFILES)})")
+    settings = dict(PROFILES[profile])
+    for key in ("SQLITE_JOURNAL_MODE", "SQLITE_SYNCHRONOUS", "DB_POOL_PRE_PING", *_INT_KEYS):
+        raw = os.getenv(key)
+        if raw is None:
+            continue
+        if key in _INT_KEYS:
+            settings[key] = int(raw)
+        elif key == "DB_POOL_PRE_PING":
+            settings[key] = raw.lower() in ("1", "true", "yes")
+        else:
+            settings[key] = raw.upper()
+            if settings[key] not in _CHOICES[key]:
+                raise ValueError(f"{key} inválido: {raw!r}")
+    return settings
+
+
+def engine_options(uri: str, settings: dict) -> dict:
+    """SQLALCHEMY_ENGINE_OPTIONS: QueuePool dimensionado para servidores (Postgres, etc.)."""
+    if uri.startswith("sqlite"):
+        return {}
+    opts = {}
+    for key, opt in (("DB_POOL_SIZE", "pool_size"), ("DB_MAX_OVERFLOW", "max_overflow"),
+                     ("DB_POOL_RECYCLE", "pool_recycle"), ("DB_POOL_PRE_PING", "pool_pre_ping")):
+        if key in settings:
+            opts[opt] = settings[key]
+    return opts
+
+
+def sqlite_pragmas(settings: dict) -> list:
+    pragmas = []
+    if "SQLITE_JOURNAL_MODE" in settings:
+        pragmas.append(f"PRAGMA journal_mode={settings['SQLITE_JOURNAL_MODE']}")
+    if "SQLITE_SYNCHRONOUS" in settings:
+        pragmas.append(f"PRAGMA synchronous={settings['SQLITE_SYNCHRONOUS']}")
+    if "SQLITE_BUSY_TIMEOUT_MS" in settings:
+        pragmas.append(f"PRAGMA busy_timeout={int(settings['SQLITE_BUSY_TIMEOUT_MS'])}")
+    if "SQLITE_MMAP_SIZE" in settings:
+        pragmas.append(f"PRAGMA mmap_size={int(settings['SQLITE_MMAP_SIZE'])}")
+    if "SQLITE_CACHE_SIZE_KB" in settings:
+        pragmas.append(f"PRAGMA cache_size=-{int(settings['SQLITE_CACHE_SIZE_KB'])}")  # negativo = KiB
+    return pragmas
+
+
+def install(engine, settings: dict) -> None:
+    """Aplica los PRAGMA en cada conexión nueva (evento connect) si el motor es SQLite."""
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas(settings)
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for pragma in pragmas:
+            cur.execute(pragma)
+        cur.close()
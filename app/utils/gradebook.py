@@ -0,0 +1,101 @@
+"""Libro de calificaciones por curso (inscritos × quizzes) exportado en streaming.
+
+Una sola consulta agregada ordenada por estudiante; las filas se leen con yield_per
+(cursor de servidor donde el driver lo soporta) y se agrupan al vuelo, así la memoria
+no crece con el tamaño del curso.
+"""
+import csv
+import io
+import json
+from itertools import groupby
+from sqlalchemy import select, func, and_
+from sqlalchemy.orm import aliased
+from .. import db
+from ..models import Inscripcion, IntentoQuiz, Quiz, Usuario
+
+YIELD_PER = 1000
+FLUSH_ROWS = 500
+
+
+def quizzes(curso_id: int) -> list:
+    return db.session.query(Quiz.id, Quiz.titulo).filter_by(curso_id=curso_id).order_by(Quiz.id).all()
+
+
+def _query(curso_id: int):
+    """inscripto × quiz con intentos entregados: mejor puntaje, último (mayor `numero`) y cantidad."""
+    agg = (select(IntentoQuiz.estudiante_id, IntentoQuiz.quiz_id,
+                  func.max(IntentoQuiz.puntaje).label("mejor"),
+                  func.max(IntentoQuiz.numero).label("ultimo_numero"),
+                  func.count().label("intentos"))
+           .join(Quiz, Quiz.id == IntentoQuiz.quiz_id)
+           .where(Quiz.curso_id == curso_id, IntentoQuiz.entregado.is_(True))
+           .group_by(IntentoQuiz.estudiante_id, IntentoQuiz.quiz_id)
+           .subquery())
+    ultimo = aliased(IntentoQuiz)
+    return (select(Inscripcion.estudiante_id, Usuario.email, agg.c.quiz_id,
+                   agg.c.mejor, ultimo.puntaje, agg.c.intentos)
+            .join(Usuario, Usuario.id == Inscripcion.estudiante_id)
+            .outerjoin(agg, agg.c.estudiante_id == Inscripcion.estudiante_id)
+            # (quiz, estudiante, numero) es único: el último intento sale por índice
+            .outerjoin(ultimo, and_(ultimo.quiz_id == agg.c.quiz_id,
+                                    ultimo.estudiante_id == agg.c.estudiante_id,
+                                    ultimo.numero == agg.c.ultimo_numero))
+            .where(Inscripcion.curso_id == curso_id)
+            .order_by(Inscripcion.estudiante_id, agg.c.quiz_id))
+
+
+def iter_students(curso_id: int):
+    """(estudiante_id, email, {quiz_id: (mejor, ultimo, intentos)}) por inscripto, en streaming."""
+    result = db.session.execute(_query(curso_id).execution_options(yield_per=YIELD_PER))
+    try:
+        for (estudiante_id, email), filas in groupby(result, key=lambda r: (r[0], r[1])):
+            yield estudiante_id, email, {r[2]: (r[3], r[4], r[5]) for r in filas if r[2] is not None}
+    finally:
+        result.close()
+
+
+def _fmt(value):
+    return "" if value is None else f"{round(value, 2):g}"
+
+
+def csv_chunks(curso_id: int):
+    """Encabezado de inmediato y luego bloques de FLUSH_ROWS filas."""
+    qs = quizzes(curso_id)
+    buf = io.StringIO()
+    out = csv.writer(buf)
+    out.writerow(["estudiante_id", "email"] + [f"{titulo} ({col})" for _, titulo in qs
+                                               for col in ("mejor", "ultimo", "intentos")])
+    yield buf.getvalue()
+    buf.seek(0)
+    buf.truncate()
+    for n, (estudiante_id, email, notas) in enumerate(iter_students(curso_id), 1):
+        row = [estudiante_id, email]
+        for quiz_id, _ in qs:
+            mejor, ultimo, intentos = notas.get(quiz_id, (None, None, 0))
+            row += [_fmt(mejor), _fmt(ultimo), intentos]
+        out.writerow(row)
+        if n % FLUSH_ROWS == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def ndjson_chunks(curso_id: int):
+    """Una línea de cabecera con los quizzes y una línea JSON por estudiante."""
+    qs = quizzes(curso_id)
+    yield json.dumps({"quizzes": [{"id": qid, "titulo": titulo} for qid, titulo in qs]}) + "\n"
+    lines = []
+    for estudiante_id, email, notas in iter_students(curso_id):
+        lines.append(json.dumps({
+            "estudiante_id": estudiante_id,
+            "email": email,
+            "notas": {str(qid): {"mejor": mejor, "ultimo": ultimo, "intentos": n}
+                      for qid, (mejor, ultimo, n) in notas.items()},
+        }))
+        if len(lines) == FLUSH_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
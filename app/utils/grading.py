@@ -0,0 +1,80 @@
+from flask import current_app
+from sqlalchemy import insert
+from .. import db
+from ..models import Pregunta, Opcion, RespuestaIntento
+from . import dbrouting, httpcache
+
+
+def load_answer_key(quiz_id: int) -> dict:
+    """Clave de respuestas de un quiz en UNA consulta: {pregunta_id: {opcion_id: correcta}}."""
+    rows = (db.session.query(Pregunta.id, Opcion.id, Opcion.correcta)
+            .outerjoin(Opcion, Opcion.pregunta_id == Pregunta.id)
+            .filter(Pregunta.quiz_id == quiz_id)
+            .order_by(Pregunta.id)
+            .all())
+    key = {}
+    for pregunta_id, opcion_id, correcta in rows:
+        opciones = key.setdefault(pregunta_id, {})
+        if opcion_id is not None:
+            opciones[opcion_id] = bool(correcta)
+    return key
+
+
+def answer_key_cache():
+    return current_app.extensions["answer_keys"]
+
+
+def get_answer_key(quiz_id: int) -> dict:
+    """Clave compilada desde la caché LRU; se recarga de la BD en miss o si cambió la versión del quiz."""
+    return answer_key_cache().get_or_load(quiz_id, dbrouting.primary_loader(lambda: load_answer_key(quiz_id)),
+                                          httpcache.shared_version(httpcache.quiz_key(quiz_id)))
+
+
+def invalidate_quiz(quiz_id: int) -> None:
+    """Llamar tras cualquier alta/edición de preguntas u opciones del quiz (después del commit
+    que incluye httpcache.bump(quiz_key)); los demás procesos se enteran por esa versión."""
+    cache = answer_key_cache()
+    cache.bump(quiz_id)
+    cache.bump(("preguntas", quiz_id))
+
+
+def _selected_option(respuestas: dict, pregunta_id: int):
+    sel = respuestas.get(str(pregunta_id)) or respuestas.get(pregunta_id)
+    if sel is None:
+        return None
+    try:
+        return int(sel)
+    except (TypeError, ValueError):
+        return None
+
+
+def grade(key: dict, respuestas: dict) -> dict:
+    """Corrige en memoria; devuelve correctas/total/puntaje y el detalle por pregunta."""
+    total = len(key)
+    correctas = 0
+    detalle = []
+    for pregunta_id, opciones in key.items():
+        sel = _selected_option(respuestas, pregunta_id)
+        if sel not in opciones:
+            sel = None  # opción inexistente o de otra pregunta: cuenta como no respondida
+        ok = sel is not None and opciones[sel]
+        if ok:
+            correctas += 1
+        detalle.append({"pregunta_id": pregunta_id, "opcion_id": sel, "correcta": ok})
+    puntaje = int(round(100.0 * correctas / total)) if total else 0
+    return {"correctas": correctas, "total": total, "puntaje": puntaje, "detalle": detalle}
+
+
+def save_results(intento_id: int, detalle: list) -> None:
+    """Persiste el resultado por pregunta con un único executemany (sin commit)."""
+    if not detalle:
+        return
+    rows = [{"intento_id": intento_id, **d} for d in detalle]
+    db.session.execute(insert(RespuestaIntento), rows)
+
+
+def save_results_many(resultados: list) -> None:
+    """Como save_results para varios intentos [(intento_id, detalle), ...] en un solo executemany."""
+    rows = [{"intento_id": intento_id, **d} for intento_id, detalle in resultados for d in detalle]
+    if rows:
+        db.session.execute(insert(RespuestaIntento), rows)
@@ -0,0 +1,129 @@
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
+from threading import Lock
+from flask import current_app, request, make_response, Response
+from .. import db
+from ..models import ContenidoVersion
+from . import dbrouting
+from .bulk import dialect_insert
+
+CATALOGO = "catalogo"
+
+
+class ResponseCache:
+    """Cuerpos JSON ya serializados por (clave, URL), válidos para una versión de contenido."""
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, clave: str, path: str, version: int):
+        with self._lock:
+            entry = self._data.get((clave, path))
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._data.move_to_end((clave, path))
+            self.hits += 1
+            return entry[1]
+
+    def put(self, clave: str, path: str, version: int, body: bytes) -> None:
+        with self._lock:
+            self._data[(clave, path)] = (version, body)
+            self._data.move_to_end((clave, path))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, clave: str) -> None:
+        with self._lock:
+            for k in [k for k in self._data if k[0] == clave]:
+                del self._data[k]
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+def curso_key(curso_id: int) -> str:
+    return f"curso:{curso_id}"
+
+
+def quiz_key(quiz_id: int) -> str:
+    """Versión de preguntas/opciones de un quiz (valida las cachés de proceso de grading)."""
+    return f"quiz:{quiz_id}"
+
+
+def bump(*claves) -> None:
+    """Incrementa la versión de contenido (en la transacción actual, sin commit).
+
+    La versión vive en la BD, así que todos los procesos ven el cambio; la caché
+    de respuestas local además se purga aquí para liberar memoria.
+    """
+    now = datetime.utcnow().replace(microsecond=0)
+    responses = current_app.extensions.get("response_cache")
+    for clave in claves:
+        if responses is not None:
+            responses.invalidate(clave)
+        stmt = dialect_insert(ContenidoVersion).values(clave=clave, version=1, actualizado=now)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ContenidoVersion.clave],
+            set_={"version": ContenidoVersion.version + 1, "actualizado": now})
+        db.session.execute(stmt)
+
+
+def current_version(clave: str):
+    """(version, actualizado) leído por clave primaria; (0, None) si nunca se escribió."""
+    row = db.session.query(ContenidoVersion.version, ContenidoVersion.actualizado).filter_by(clave=clave).first()
+    return (row.version, row.actualizado) if row else (0, None)
+
+
+def shared_version(clave: str) -> int:
+    """Versión vigente leída del primario, para validar una caché de proceso.
+
+    Los bumps locales (VersionedLRUCache.bump) sólo llegan al worker que escribió; esta
+    lectura por PK hace que los demás workers descarten su copia en el siguiente uso.
+    """
+    with dbrouting.primary():
+        return current_version(clave)[0]
+
+
+def conditional(key_fn, cache_control: str):
+    """GET cacheable: ETag/Last-Modified por versión de contenido, 304 y caché de bytes opcional.
+
+    key_fn recibe los argumentos de la vista y devuelve la clave de versión
+    (o None para delegar sin caché, p. ej. si el recurso no existe).
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            clave = key_fn(**kwargs)
+            if clave is None:
+                return fn(*args, **kwargs)
+            version, modificado = current_version(clave)
+            etag = f"{request.endpoint}:{clave}:{version}"
+
+            not_modified = request.if_none_match.contains_weak(etag) if request.if_none_match else (
+                modificado is not None and request.if_modified_since is not None
+                and request.if_modified_since.replace(tzinfo=None) >= modificado)
+
+            responses = current_app.extensions.get("response_cache")
+            if not_modified:
+                resp = Response(status=304)
+            elif responses is not None and (body := responses.get(clave, request.full_path, version)) is not None:
+                resp = Response(body, mimetype="application/json")
+            else:
+                resp = make_response(fn(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+                if responses is not None:
+                    responses.put(clave, request.full_path, version, resp.get_data())
+            resp.set_etag(etag, weak=True)
+            if modificado is not None:
+                resp.last_modified = modificado
+            resp.headers["Cache-Control"] = cache_control
+            return resp
+        return inner
+    return wrapper
@@ -0,0 +1,115 @@
+"""Métricas por endpoint (latencia, #SQL, tiempo SQL) en formato Prometheus.
+
+Se engancha a los hooks de Flask y a los eventos de cursor del engine; los datos
+viven en memoria del proceso y se exponen en /api/_metrics.
+"""
+from collections import Counter, defaultdict
+from threading import Lock
+from time import perf_counter
+from flask import g, has_request_context, request, current_app
+from sqlalchemy import event
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _EndpointStats:
+    __slots__ = ("buckets", "count", "sum", "sql_count", "sql_time", "n_plus_one")
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.n_plus_one = 0
+
+
+class RequestMetrics:
+    def __init__(self, n_plus_one_threshold: int = 0):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._stats = defaultdict(_EndpointStats)
+        self._lock = Lock()
+
+    def record(self, endpoint: str, elapsed: float, sql_count: int, sql_time: float, n_plus_one: int = 0) -> None:
+        with self._lock:
+            st = self._stats[endpoint]
+            st.count += 1
+            st.sum += elapsed
+            for i, le in enumerate(BUCKETS):
+                if elapsed <= le:
+                    st.buckets[i] += 1
+            st.sql_count += sql_count
+            st.sql_time += sql_time
+            st.n_plus_one += n_plus_one
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {ep: (list(st.buckets), st.count, st.sum, st.sql_count, st.sql_time, st.n_plus_one)
+                    for ep, st in self._stats.items()}
+
+    def render(self, extra_gauges: dict = None) -> str:
+        """Exposición en texto Prometheus 0.0.4."""
+        snap = sorted(self.snapshot().items())
+        out = ["# HELP lms_request_duration_seconds Latencia de requests por endpoint.",
+               "# TYPE lms_request_duration_seconds histogram"]
+        for ep, (buckets, count, total, *_rest) in snap:
+            for le, n in zip(BUCKETS, buckets):
+                out.append(f'lms_request_duration_seconds_bucket{{endpoint="{ep}",le="{le}"}} {n}')
+            out.append(f'lms_request_duration_seconds_bucket{{endpoint="{ep}",le="+Inf"}} {count}')
+            out.append(f'lms_request_duration_seconds_sum{{endpoint="{ep}"}} {total:.6f}')
+            out.append(f'lms_request_duration_seconds_count{{endpoint="{ep}"}} {count}')
+        for name, idx, help_, fmt in (
+                ("lms_sql_statements_total", 3, "Sentencias SQL ejecutadas.", "{}"),
+                ("lms_sql_seconds_total", 4, "Tiempo en SQL.", "{:.6f}"),
+                ("lms_n_plus_one_total", 5, "Requests con sentencias repetidas sobre el umbral.", "{}")):
+            out.append(f"# HELP {name} {help_}")
+            out.append(f"# TYPE {name} counter")
+            for ep, values in snap:
+                out.append(f'{name}{{endpoint="{ep}"}} ' + fmt.format(values[idx]))
+        for name, value in sorted((extra_gauges or {}).items()):
+            out.append(f"# TYPE {name} gauge")
+            out.append(f"{name} {value}")
+        return "\n".join(out) + "\n"
+
+
+def _before_cursor(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "sql_t0" in g:
+        g.sql_t0 = perf_counter()
+
+
+def _after_cursor(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context() or "sql_t0" not in g:
+        return
+    g.sql_count += 1
+    g.sql_time += perf_counter() - g.sql_t0
+    if g.sql_statements is not None:
+        g.sql_statements[statement] += 1
+
+
+def init_instrumentation(app, *engines) -> None:
+    metrics = RequestMetrics(app.config.get("SQL_N_PLUS_ONE_THRESHOLD", 0))
+    app.extensions["request_metrics"] = metrics
+    for engine in engines:  # primario y réplica de lectura, si la hay
+        event.listen(engine, "before_cursor_execute", _before_cursor)
+        event.listen(engine, "after_cursor_execute", _after_cursor)
+
+    @app.before_request
+    def _start_timer():
+        g.req_t0 = perf_counter()
+        g.sql_t0 = 0.0
+        g.sql_count = 0
+        g.sql_time = 0.0
+        g.sql_statements = Counter() if metrics.n_plus_one_threshold else None
+
+    @app.after_request
+    def _record(response):
+        if "req_t0" not in g:
+            return response
+        endpoint = request.endpoint or "sin_ruta"
+        repeated = []
+        if g.sql_statements:
+            repeated = [(stmt, n) for stmt, n in g.sql_statements.items() if n > metrics.n_plus_one_threshold]
+            for stmt, n in repeated:
+                current_app.logger.warning("posible N+1 en %s: %d x %s", endpoint, n, stmt[:200])
+        metrics.record(endpoint, perf_counter() - g.req_t0, g.sql_count, g.sql_time, 1 if repeated else 0)
+        return response
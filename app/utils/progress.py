@@ -0,0 +1,172 @@
+"""Progreso por lección con escrituras coalescidas.
+
+Los heartbeats del reproductor van a un buffer en memoria que guarda sólo la última
+posición por (estudiante, curso); un hilo lo vuelca en lotes cada PROGRESS_FLUSH_INTERVAL
+segundos o al llegar a PROGRESS_FLUSH_MAX entradas, y al apagar el proceso.
+"""
+import atexit
+import threading
+from sqlalchemy import update, bindparam, case, tuple_
+from flask import current_app
+from .. import db
+from ..models import Leccion, Progreso
+from . import dbrouting, httpcache, stats
+from .bulk import chunks
+from .cache import TTLCache
+
+
+def _load_positions(curso_id: int) -> tuple:
+    ids = [lid for (lid,) in db.session.query(Leccion.id).filter_by(curso_id=curso_id)
+           .order_by(Leccion.orden, Leccion.id)]
+    return {lid: i + 1 for i, lid in enumerate(ids)}, len(ids)
+
+
+def lesson_positions(curso_id: int):
+    """({leccion_id: posición 1..n}, n) desde la caché de proceso; una consulta en miss.
+
+    Se valida contra la versión de contenido del curso, que sube con cada cambio de lecciones.
+    """
+    return current_app.extensions["lesson_positions"].get_or_load(
+        curso_id, dbrouting.primary_loader(lambda: _load_positions(curso_id)),
+        httpcache.shared_version(httpcache.curso_key(curso_id)))
+
+
+def invalidate_course(curso_id: int) -> None:
+    """Llamar tras altas, bajas o reordenamientos de lecciones del curso."""
+    current_app.extensions["lesson_positions"].bump(curso_id)
+
+
+def percentage(curso_id: int, leccion_id: int):
+    """% del curso al llegar a la lección según su orden; None si no pertenece al curso."""
+    posiciones, total = lesson_positions(curso_id)
+    pos = posiciones.get(leccion_id)
+    if pos is None:
+        return None
+    return round(100.0 * pos / total, 2)
+
+
+def write_batch(entries: dict) -> int:
+    """Vuelca {(estudiante_id, curso_id): (leccion_id, porcentaje)} en una transacción.
+
+    El porcentaje nunca baja (volver a ver una lección anterior sólo mueve ultima_leccion_id)
+    y los cruces a 100% suman al contador `completados` de CursoStats.
+    """
+    if not entries:
+        return 0
+    por_curso = {}
+    for lote in chunks([k for k, (_, pct) in entries.items() if pct >= 100.0]):
+        nuevos = (db.session.query(Progreso.curso_id)
+                  .filter(tuple_(Progreso.estudiante_id, Progreso.curso_id).in_(lote),
+                          Progreso.porcentaje < 100.0))
+        for (curso_id,) in nuevos:
+            por_curso[curso_id] = por_curso.get(curso_id, 0) + 1
+    for curso_id, n in por_curso.items():
+        stats.bump(curso_id, completados=n)
+    tabla = Progreso.__table__
+    stmt = (update(tabla)
+            .where(tabla.c.estudiante_id == bindparam("b_est"), tabla.c.curso_id == bindparam("b_curso"))
+            .values(ultima_leccion_id=bindparam("b_leccion"),
+                    porcentaje=case((tabla.c.porcentaje < bindparam("b_pct"), bindparam("b_pct")),
+                                    else_=tabla.c.porcentaje)))
+    db.session.execute(stmt, [{"b_est": est, "b_curso": curso, "b_leccion": lec, "b_pct": pct}
+                              for (est, curso), (lec, pct) in entries.items()])
+    db.session.commit()
+    return len(entries)
+
+
+class ProgressBuffer:
+    """Última posición por (estudiante, curso) pendiente de escribir."""
+
+    def __init__(self, app, interval: float = 2.0, max_entries: int = 500):
+        self.app = app
+        self.interval = interval
+        self.max_entries = max_entries
+        self._pending = {}
+        self._inflight = {}  # lote que se está escribiendo: sigue visible para las lecturas
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._full = threading.Event()
+        self._thread = None
+        self.flushes = 0
+        self.coalesced = 0
+        self.enrolled = TTLCache(ttl=300.0, maxsize=100_000)  # (estudiante, curso) con fila Progreso
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="progress-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Vuelco final (durable) al apagar; idempotente."""
+        self._stop.set()
+        self._full.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def record(self, estudiante_id: int, curso_id: int, leccion_id: int, porcentaje: float) -> dict:
+        key = (estudiante_id, curso_id)
+        with self._lock:
+            prev = self._pending.get(key)
+            if prev is not None:
+                self.coalesced += 1
+                porcentaje = max(porcentaje, prev[1])
+            self._pending[key] = (leccion_id, porcentaje)
+            full = len(self._pending) >= self.max_entries
+        if full:
+            if self._thread is not None:
+                self._full.set()
+            else:
+                self.flush()  # sin hilo (tests / CLI): vuelco en línea
+        return {"curso_id": curso_id, "ultima_leccion_id": leccion_id, "porcentaje": porcentaje}
+
+    def pending(self, estudiante_id: int, curso_id: int):
+        """Posición aún no escrita (leccion_id, porcentaje) o None."""
+        key = (estudiante_id, curso_id)
+        with self._lock:
+            return self._pending.get(key) or self._inflight.get(key)
+
+    def flush(self) -> int:
+        """Toma el lote actual y lo escribe; si falla lo devuelve al buffer sin pisar lo más nuevo."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+            if not batch:
+                return 0
+            try:
+                with self.app.app_context():
+                    try:
+                        n = write_batch(batch)
+                    except Exception:
+                        db.session.rollback()
+                        raise
+                    finally:
+                        db.session.remove()
+            except Exception:
+                with self._lock:
+                    for key, value in batch.items():
+                        newer = self._pending.get(key)
+                        self._pending[key] = value if newer is None else (newer[0], max(newer[1], value[1]))
+                    self._inflight = {}
+                raise
+            with self._lock:
+                self._inflight = {}
+            self.flushes += 1
+            return n
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._pending)
+        return {"pending": size, "flushes": self.flushes, "coalesced": self.coalesced}
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._full.wait(self.interval)
+            self._full.clear()
+            try:
+                self.flush()
+            except Exception:
+                self.app.logger.exception("flush de progreso falló; se reintenta en el próximo ciclo")
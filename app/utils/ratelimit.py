@@ -0,0 +1,246 @@
+"""Rate limiting (token bucket) y control de admisión (concurrencia) por ruta o blueprint.
+
+Las reglas se aplican en un before_request: si una se excede el request falla de inmediato
+con 429 + Retry-After en vez de esperar en cola hasta el timeout. La regla de una ruta
+("blueprint.endpoint") y la de su blueprint se aplican ambas.
+
+Regla: {"rate": "10/minute", "burst": 10, "key": "ip" | "user" | "global",
+        "concurrency": 8, "concurrency_key": "global", "arg": "q"}
+- rate/burst: ritmo sostenido y ráfaga del token bucket, por clave.
+- concurrency: máximo de requests simultáneos por `concurrency_key` (por defecto, toda la ruta).
+- arg: la regla sólo aplica si el query string trae ese argumento (p. ej. búsqueda con q=).
+- "user" usa la identidad del JWT y cae a la IP si el request no trae un token válido.
+
+Los contadores viven en un CounterBackend; MemoryBackend es por proceso. Un backend
+compartido (Redis, etc.) implementa los mismos tres métodos y se registra en BACKENDS.
+"""
+import json
+import math
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from threading import Lock
+from time import monotonic
+from flask import current_app, g, request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt
+
+DEFAULT_RULES = {
+    # PBKDF2: un atacante o un pico de logins no debe acaparar la CPU de verificación
+    "auth.login": {"rate": "10/minute", "burst": 10, "key": "ip"},
+    "courses.list_public_courses": {"rate": "20/second", "burst": 40, "key": "ip", "arg": "q", "concurrency": 16},
+    "courses.search_courses": {"rate": "20/second", "burst": 40, "key": "ip", "concurrency": 16},
+    "quizzes.submit_attempt": {"rate": "2/second", "burst": 5, "key": "user", "concurrency": 32},
+}
+
+_PERIODS = {"s": 1, "sec": 1, "second": 1, "m": 60, "min": 60, "minute": 60, "h": 3600, "hour": 3600,
+            "d": 86400, "day": 86400}
+_KEYS = {"ip", "user", "global"}
+_FIELDS = {"rate", "burst", "key", "concurrency", "concurrency_key", "arg"}
+
+
+class CounterBackend(ABC):
+    """Interfaz de contadores. Las implementaciones deben ser atómicas por clave."""
+
+    @abstractmethod
+    def take(self, key: str, rate: float, burst: int) -> float:
+        """Consume una ficha del bucket `key`; 0.0 si había, si no segundos hasta la próxima."""
+
+    @abstractmethod
+    def acquire(self, key: str, limit: int) -> bool:
+        """Ocupa un lugar si hay menos de `limit` en curso."""
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """Libera un lugar tomado con acquire."""
+
+
+class MemoryBackend(CounterBackend):
+    """Contadores en memoria del proceso; los buckets inactivos se descartan por LRU."""
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()  # key -> (fichas, instante)
+        self._inflight = defaultdict(int)
+        self._lock = Lock()
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        now = monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (float(burst), now))
+            tokens = min(float(burst), tokens + (now - last) * rate)
+            if tokens >= 1.0:
+                tokens -= 1.0
+                wait = 0.0
+            else:
+                wait = (1.0 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def acquire(self, key: str, limit: int) -> bool:
+        with self._lock:
+            if self._inflight[key] >= limit:
+                return False
+            self._inflight[key] += 1
+            return True
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            n = self._inflight[key] - 1
+            if n > 0:
+                self._inflight[key] = n
+            else:
+                del self._inflight[key]
+
+
+BACKENDS = {"memory": MemoryBackend}
+
+
+def parse_rate(spec: str) -> tuple:
+    """"10/minute" -> (10, 60.0). ValueError si no se entiende."""
+    try:
+        count, period = spec.split("/")
+        count = int(count)
+        seconds = float(_PERIODS[period.strip().lower()])
+    except (ValueError, KeyError, AttributeError):
+        raise ValueError(f"rate inválido: {spec!r} (ej. '10/minute')")
+    if count <= 0:
+        raise ValueError(f"rate inválido: {spec!r}")
+    return count, seconds
+
+
+def load_rules(raw: str = None) -> dict:
+    """DEFAULT_RULES + overrides JSON ({"blueprint[.endpoint]": regla | null}); ValueError si son inválidas."""
+    rules = {k: dict(v) for k, v in DEFAULT_RULES.items()}
+    if raw:
+        try:
+            overrides = json.loads(raw)
+        except ValueError:
+            raise ValueError("RATE_LIMITS debe ser un objeto JSON")
+        if not isinstance(overrides, dict):
+            raise ValueError("RATE_LIMITS debe ser un objeto JSON")
+        for target, rule in overrides.items():
+            if rule is None:
+                rules.pop(target, None)
+            else:
+                rules[target] = rule
+    return {target: _compile(target, rule) for target, rule in rules.items()}
+
+
+def _positive_int(target: str, rule: dict, field: str):
+    value = rule.get(field)
+    if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value <= 0):
+        raise ValueError(f"{field} inválido para {target!r}: se espera un entero positivo, no {value!r}")
+    return value
+
+
+def _compile(target: str, rule: dict) -> dict:
+    if not isinstance(rule, dict) or set(rule) - _FIELDS:
+        raise ValueError(f"regla inválida para {target!r}: campos permitidos {sorted(_FIELDS)}")
+    out = {"target": target, "key": rule.get("key", "ip"), "arg": rule.get("arg"),
+           "concurrency": _positive_int(target, rule, "concurrency"),
+           "concurrency_key": rule.get("concurrency_key", "global")}
+    if out["key"] not in _KEYS or out["concurrency_key"] not in _KEYS:
+        raise ValueError(f"key inválida para {target!r}: {sorted(_KEYS)}")
+    burst = _positive_int(target, rule, "burst")
+    if burst is not None and "rate" not in rule:
+        raise ValueError(f"burst sin rate para {target!r}")
+    if "rate" in rule:
+        count, seconds = parse_rate(rule["rate"])
+        out["rate"] = count / seconds
+        out["burst"] = burst or count
+    if "rate" not in out and not out["concurrency"]:
+        raise ValueError(f"regla sin rate ni concurrency para {target!r}")
+    return out
+
+
+class RateLimiter:
+    def __init__(self, rules: dict, backend: CounterBackend):
+        self.rules = rules
+        self.backend = backend
+        self.rejected = defaultdict(int)  # (target, "rate" | "concurrency") -> n
+        self._lock = Lock()
+
+    def rules_for(self, endpoint: str, blueprint: str) -> list:
+        return [r for r in (self.rules.get(blueprint), self.rules.get(endpoint)) if r is not None]
+
+    def _reject(self, rule: dict, kind: str, retry_after: float):
+        with self._lock:
+            self.rejected[(rule["target"], kind)] += 1
+        segundos = max(1, math.ceil(retry_after))
+        return ({"error": "demasiadas solicitudes, reintente más tarde", "retry_after": segundos}, 429,
+                {"Retry-After": str(segundos)})
+
+    def check(self):
+        """Aplica las reglas del request actual; devuelve la respuesta 429 o None."""
+        for rule in self.rules_for(request.endpoint or "", request.blueprint or ""):
+            if rule["arg"] and not request.args.get(rule["arg"]):
+                continue
+            if "rate" in rule:
+                wait = self.backend.take(f"r:{rule['target']}:{_client_key(rule['key'])}", rule["rate"], rule["burst"])
+                if wait > 0:
+                    return self._reject(rule, "rate", wait)
+            if rule["concurrency"]:
+                slot = f"c:{rule['target']}:{_client_key(rule['concurrency_key'])}"
+                if not self.backend.acquire(slot, rule["concurrency"]):
+                    return self._reject(rule, "concurrency", 1)
+                g.setdefault("ratelimit_slots", []).append(slot)
+        return None
+
+    def release(self) -> None:
+        for slot in g.pop("ratelimit_slots", ()):
+            self.backend.release(slot)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {f"{target}:{kind}": n for (target, kind), n in sorted(self.rejected.items())}
+
+    def render(self) -> str:
+        """Rechazos en texto Prometheus (se agrega a /api/_metrics)."""
+        out = ["# HELP lms_rate_limited_total Requests rechazados con 429 por regla.",
+               "# TYPE lms_rate_limited_total counter"]
+        with self._lock:
+            for (target, kind), n in sorted(self.rejected.items()):
+                out.append(f'lms_rate_limited_total{{rule="{target}",limit="{kind}"}} {n}')
+        return "\n".join(out) + "\n"
+
+
+def _client_key(kind: str) -> str:
+    if kind == "global":
+        return "*"
+    if kind == "user":
+        user = _identity()
+        if user is not None:
+            return f"u:{user}"
+    return f"ip:{request.remote_addr}"
+
+
+def _identity():
+    """Identidad del JWT si el request trae uno válido; deja los claims en g para authz."""
+    claims = g.get("authz_claims")
+    if claims is None:
+        try:
+            verify_jwt_in_request(optional=True)
+        except Exception:
+            return None  # token inválido o vencido: la ruta responderá 401 por su cuenta
+        claims = get_jwt()
+        if not claims:
+            return None
+        g.authz_claims = claims
+    return claims.get(current_app.config["JWT_IDENTITY_CLAIM"])
+
+
+def init_app(app) -> None:
+    if not app.config["RATE_LIMIT_ENABLED"]:
+        return
+    backend = BACKENDS[app.config["RATE_LIMIT_BACKEND"]]()
+    limiter = app.extensions["rate_limiter"] = RateLimiter(load_rules(app.config["RATE_LIMITS"]), backend)
+
+    @app.before_request
+    def _admission():
+        return limiter.check()
+
+    @app.teardown_request
+    def _release(_exc):
+        # teardown corre también con excepciones y al terminar una respuesta en streaming
+        limiter.release()
@@ -0,0 +1,78 @@
+import re
+from flask import current_app
+from sqlalchemy import text, Integer, Float
+from sqlalchemy.exc import OperationalError
+from .. import db
+
+# Una fila por curso (rowid = curso.id); las lecciones se agregan en una sola columna.
+_CREATE = ("CREATE VIRTUAL TABLE IF NOT EXISTS curso_fts USING fts5("
+           "titulo, descripcion, lecciones, tokenize = 'unicode61 remove_diacritics 2')")
+
+# Pesos bm25 por columna: titulo > descripcion > lecciones
+_RANK = "bm25(curso_fts, 10.0, 4.0, 1.0)"
+
+_SELECT_DOCS = """
+    SELECT c.id, c.titulo, coalesce(c.descripcion, ''),
+           coalesce((SELECT group_concat(l.titulo || ' ' || coalesce(l.contenido, ''), ' ')
+                     FROM leccion l WHERE l.curso_id = c.id), '')
+    FROM curso c
+"""
+
+
+def init_search(app) -> None:
+    """Crea el índice FTS5 si el motor lo soporta; si no, la búsqueda cae a ILIKE.
+
+    Si el índice se acaba de crear sobre una base con cursos (actualización), se llena una vez.
+    """
+    enabled = created = False
+    if db.engine.dialect.name == "sqlite":
+        try:
+            with db.engine.begin() as conn:
+                created = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'curso_fts'")).first() is None
+                conn.execute(text(_CREATE))
+            enabled = True
+        except OperationalError:
+            app.logger.warning("SQLite sin FTS5: búsqueda del catálogo con ILIKE")
+    app.extensions["search_fts"] = enabled
+    if enabled and created:
+        app.logger.info("índice de búsqueda creado: %d cursos indexados", rebuild())
+
+
+def enabled() -> bool:
+    return current_app.extensions.get("search_fts", False)
+
+
+def index_course(curso_id: int) -> None:
+    """Reindexa un curso dentro de la transacción actual (sin commit)."""
+    if not enabled():
+        return
+    db.session.flush()
+    db.session.execute(text("DELETE FROM curso_fts WHERE rowid = :id"), {"id": curso_id})
+    db.session.execute(text(f"INSERT INTO curso_fts(rowid, titulo, descripcion, lecciones) {_SELECT_DOCS} WHERE c.id = :id"),
+                       {"id": curso_id})
+
+
+def rebuild() -> int:
+    """Regenera el índice completo (bases existentes o tras cargas masivas). Devuelve #cursos."""
+    db.session.execute(text("DELETE FROM curso_fts"))
+    db.session.execute(text(f"INSERT INTO curso_fts(rowid, titulo, descripcion, lecciones) {_SELECT_DOCS}"))
+    db.session.commit()
+    return db.session.execute(text("SELECT count(*) FROM curso_fts")).scalar()
+
+
+def match_expression(q: str):
+    """Convierte texto libre en una consulta FTS5 segura; el último término es prefijo (type-ahead)."""
+    tokens = re.findall(r"\w+", q)
+    if not tokens:
+        return None
+    terms = [f'"{t}"' for t in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def ranked_ids(match: str):
+    """Subconsulta (curso_id, rank) ordenable; rank menor = más relevante."""
+    return (text(f"SELECT rowid AS curso_id, {_RANK} AS rank FROM curso_fts WHERE curso_fts MATCH :match")
+            .bindparams(match=match)
+            .columns(curso_id=Integer, rank=Float)
+            .subquery("fts"))
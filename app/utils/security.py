@@ -1,10 +1,67 @@
-from passlib.hash import pbkdf2_sha256
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from threading import BoundedSemaphore
+from passlib.context import CryptContext
+
+# 29000 iteraciones por defecto, sal aleatoria; seguro y sin límite de 72 bytes.
+# Las rondas quedan dentro del propio hash, así que se puede subir el costo sin romper hashes viejos.
+DEFAULT_ROUNDS = 29000
+
+_context = CryptContext(schemes=["pbkdf2_sha256"], pbkdf2_sha256__default_rounds=DEFAULT_ROUNDS)
+
+
+class VerifierBusy(Exception):
+    """El pool de verificación está saturado; el llamador debe responder 503."""
+
+
+def configure_hashing(rounds: int) -> None:
+    """Fija la política de hashing; hashes con otras rondas se re-hashean en el próximo login."""
+    global _context
+    _context = CryptContext(schemes=["pbkdf2_sha256"],
+                            pbkdf2_sha256__default_rounds=rounds,
+                            pbkdf2_sha256__min_rounds=rounds,
+                            pbkdf2_sha256__max_rounds=rounds)
 
 
 def hash_password(plain: str) -> str:
-    # 29000 iteraciones por defecto, sal aleatoria; seguro y sin límite de 72 bytes
-    return pbkdf2_sha256.hash(plain)
+    return _context.hash(plain)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pbkdf2_sha256.verify(plain, hashed)
+    return _context.verify(plain, hashed)
+
+
+def verify_and_update(plain: str, hashed: str):
+    """(ok, nuevo_hash): nuevo_hash no es None si el hash no cumple la política actual."""
+    return _context.verify_and_update(plain, hashed)
+
+
+class PasswordVerifier:
+    """Pool acotado para la verificación PBKDF2 (hashlib libera el GIL mientras itera).
+
+    Como mucho `workers + queue` verificaciones en vuelo; el resto falla rápido
+    con VerifierBusy en lugar de acumular hilos web esperando CPU.
+    """
+
+    def __init__(self, workers: int = 4, queue: int = 32, timeout: float = 5.0):
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwd-verify")
+        self._slots = BoundedSemaphore(workers + queue)
+
+    def verify_and_update(self, plain: str, hashed: str):
+        if not self._slots.acquire(blocking=False):
+            raise VerifierBusy()
+        try:
+            future = self._pool.submit(verify_and_update, plain, hashed)
+        except BaseException:
+            self._slots.release()
+            raise
+        # el lugar se libera cuando el trabajo termina o se cancela, no cuando el llamador deja de esperar
+        future.add_done_callback(lambda _f: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()  # si todavía estaba en cola no llega a correr
+            raise VerifierBusy()
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,173 @@
+"""Snapshot de un curso (contenido, sin alumnos) como NDJSON comprimido con gzip.
+
+Formato: una línea de cabecera {"tipo": "snapshot", "version": 1} y luego una línea por
+registro con "tipo" curso | leccion | quiz | pregunta | opcion, siempre padres antes que
+hijos (el `tipo` de una pregunta viaja como "tipo_pregunta"). Los ids del snapshot sólo
+sirven para enlazar registros; al importar se reasignan.
+"""
+import gzip
+import json
+import zlib
+from sqlalchemy import insert, select
+from .. import db
+from ..models import Curso, Leccion, Quiz, Pregunta, Opcion, EstadoCurso
+
+VERSION = 1
+YIELD_PER = 2000
+TIPOS_PREGUNTA = {"MULTIPLE"}  # los mismos que acepta POST /quizzes/<id>/questions
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def _records(curso: Curso):
+    yield {"tipo": "snapshot", "version": VERSION}
+    yield {"tipo": "curso", "titulo": curso.titulo, "descripcion": curso.descripcion}
+    consultas = (
+        ("leccion", select(Leccion.titulo, Leccion.contenido, Leccion.video_url, Leccion.orden)
+         .where(Leccion.curso_id == curso.id).order_by(Leccion.orden, Leccion.id)),
+        ("quiz", select(Quiz.id, Quiz.titulo, Quiz.tiempo_limite_min, Quiz.intentos_max)
+         .where(Quiz.curso_id == curso.id).order_by(Quiz.id)),
+        ("pregunta", select(Pregunta.id, Pregunta.quiz_id, Pregunta.enunciado, Pregunta.tipo.label("tipo_pregunta"))
+         .join(Quiz, Quiz.id == Pregunta.quiz_id).where(Quiz.curso_id == curso.id).order_by(Pregunta.id)),
+        ("opcion", select(Opcion.pregunta_id, Opcion.texto, Opcion.correcta)
+         .join(Pregunta, Pregunta.id == Opcion.pregunta_id).join(Quiz, Quiz.id == Pregunta.quiz_id)
+         .where(Quiz.curso_id == curso.id).order_by(Opcion.id)),
+    )
+    for tipo, stmt in consultas:
+        for row in db.session.execute(stmt.execution_options(yield_per=YIELD_PER)):
+            yield {"tipo": tipo, **row._asdict()}
+
+
+def export_chunks(curso: Curso, flush_bytes: int = 64 * 1024):
+    """Genera el snapshot comprimido en bloques de ~flush_bytes (memoria constante)."""
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: contenedor gzip
+    pendiente = []
+    size = 0
+    for rec in _records(curso):
+        line = (json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n").encode()
+        pendiente.append(line)
+        size += len(line)
+        if size >= flush_bytes:
+            out = gz.compress(b"".join(pendiente))
+            pendiente, size = [], 0
+            if out:
+                yield out
+    yield gz.compress(b"".join(pendiente)) + gz.flush()
+
+
+def read_records(stream, gzipped: bool, max_lines: int):
+    """Itera los registros de un snapshot (gzip o NDJSON plano); SnapshotError si es inválido."""
+    fh = gzip.GzipFile(fileobj=stream) if gzipped else stream
+    try:
+        for n, raw in enumerate(fh, 1):
+            if n > max_lines:
+                raise SnapshotError(f"snapshot demasiado grande (> {max_lines} líneas)")
+            if not raw.strip():
+                continue
+            try:
+                rec = json.loads(raw)
+            except ValueError:
+                raise SnapshotError(f"línea {n}: JSON inválido")
+            if not isinstance(rec, dict):
+                raise SnapshotError(f"línea {n}: se espera un objeto")
+            yield n, rec
+    except (OSError, EOFError, zlib.error):
+        raise SnapshotError("gzip inválido")
+
+
+def _required(rec: dict, field: str, n: int, tipo=str):
+    value = rec.get(field)
+    if not isinstance(value, tipo) or (tipo is str and not value.strip()):
+        raise SnapshotError(f"línea {n}: '{field}' inválido")
+    return value
+
+
+def _int(rec: dict, field: str, n: int, default=None) -> int:
+    value = rec.get(field, default)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise SnapshotError(f"línea {n}: '{field}' debe ser un entero")
+    return value
+
+
+def _tipo_pregunta(rec: dict, n: int) -> str:
+    value = rec.get("tipo_pregunta", _default(Pregunta.tipo))
+    if value not in TIPOS_PREGUNTA:
+        raise SnapshotError(f"línea {n}: 'tipo_pregunta' inválido {value!r} (se espera {sorted(TIPOS_PREGUNTA)})")
+    return value
+
+
+def import_course(records, docente_id: int, titulo: str = None) -> dict:
+    """Recrea el curso (BORRADOR, del docente dado) sin commit; devuelve ids nuevos y conteos.
+
+    Lecciones y opciones van en un executemany; quizzes y preguntas con INSERT ... RETURNING
+    ordenado por parámetro para remapear los ids del snapshot.
+    """
+    records = iter(records)
+    n, head = next(records, (0, {}))
+    if head.get("tipo") != "snapshot" or head.get("version") != VERSION:
+        raise SnapshotError(f"cabecera inválida (se espera snapshot versión {VERSION})")
+    por_tipo = {"curso": [], "leccion": [], "quiz": [], "pregunta": [], "opcion": []}
+    for n, rec in records:
+        lista = por_tipo.get(rec.get("tipo"))
+        if lista is None:
+            raise SnapshotError(f"línea {n}: tipo desconocido {rec.get('tipo')!r}")
+        lista.append((n, rec))
+    if len(por_tipo["curso"]) != 1:
+        raise SnapshotError("el snapshot debe tener exactamente un curso")
+
+    n, rec = por_tipo["curso"][0]
+    curso = Curso(titulo=(titulo or _required(rec, "titulo", n)).strip()[:120],
+                  descripcion=rec.get("descripcion"), docente_id=docente_id, estado=EstadoCurso.BORRADOR)
+    db.session.add(curso)
+    db.session.flush()
+
+    lecciones = [{"curso_id": curso.id, "titulo": _required(r, "titulo", n)[:120], "contenido": r.get("contenido"),
+                  "video_url": r.get("video_url"), "orden": _int(r, "orden", n, 1)} for n, r in por_tipo["leccion"]]
+    if lecciones:
+        db.session.execute(insert(Leccion), lecciones)
+
+    quiz_map = _insert_returning(Quiz, por_tipo["quiz"], lambda n, r: {
+        "curso_id": curso.id, "titulo": _required(r, "titulo", n)[:120],
+        "tiempo_limite_min": _int(r, "tiempo_limite_min", n, _default(Quiz.tiempo_limite_min)),
+        "intentos_max": _int(r, "intentos_max", n, _default(Quiz.intentos_max))})
+    pregunta_map = _insert_returning(Pregunta, por_tipo["pregunta"], lambda n, r: {
+        "quiz_id": _remap(quiz_map, r, "quiz_id", n), "enunciado": _required(r, "enunciado", n),
+        "tipo": _tipo_pregunta(r, n)})
+    opciones = [{"pregunta_id": _remap(pregunta_map, r, "pregunta_id", n), "texto": r.get("texto") or "",
+                 "correcta": _required(r, "correcta", n, bool) if "correcta" in r else False}
+                for n, r in por_tipo["opcion"]]
+    for i in range(0, len(opciones), 5000):
+        db.session.execute(insert(Opcion), opciones[i:i + 5000])
+    return {"id": curso.id, "titulo": curso.titulo, "lecciones": len(lecciones), "quizzes": len(quiz_map),
+            "preguntas": len(pregunta_map), "opciones": len(opciones)}
+
+
+def _default(column):
+    # Core executemany no aplica el default de la columna si la clave viene en la fila
+    return column.default.arg
+
+
+def _remap(mapa: dict, rec: dict, field: str, n: int) -> int:
+    viejo = _int(rec, field, n)
+    nuevo = mapa.get(viejo)
+    if nuevo is None:
+        raise SnapshotError(f"línea {n}: {field}={viejo!r} no aparece antes en el snapshot")
+    return nuevo
+
+
+def _insert_returning(model, items: list, row_fn) -> dict:
+    """{id del snapshot: id nuevo} insertando en bloque con RETURNING en orden de parámetros."""
+    if not items:
+        return {}
+    ids = [_int(r, "id", n) for n, r in items]
+    rows = [row_fn(n, r) for n, r in items]
+    stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+    nuevos = db.session.scalars(stmt, rows).all()
+    mapa = {}
+    for (n, _r), viejo, nuevo in zip(items, ids, nuevos):
+        if viejo in mapa:
+            raise SnapshotError(f"línea {n}: id {viejo!r} repetido")
+        mapa[viejo] = nuevo
+    return mapa
@@ -0,0 +1,73 @@
+from sqlalchemy import func, case
+from .. import db
+from ..models import CursoStats, Curso, Leccion, Inscripcion, Progreso, Quiz, IntentoQuiz
+from .bulk import dialect_insert, insert_ignore
+
+COUNTERS = ("inscritos", "lecciones", "intentos", "suma_puntaje", "completados")
+
+
+def ensure(curso_id: int) -> None:
+    """Crea la fila en cero si no existe (alta de curso)."""
+    db.session.execute(insert_ignore(CursoStats).values(curso_id=curso_id))
+
+
+def bump(curso_id: int, **deltas) -> None:
+    """Suma deltas a los contadores del curso en la transacción actual (UPSERT, sin commit)."""
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return
+    unknown = set(deltas) - set(COUNTERS)
+    if unknown:
+        raise ValueError(f"contadores desconocidos: {sorted(unknown)}")
+    row = {k: 0 for k in COUNTERS}
+    row.update(deltas, curso_id=curso_id)
+    stmt = dialect_insert(CursoStats).values(**row)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CursoStats.curso_id],
+        set_={k: getattr(CursoStats, k) + getattr(stmt.excluded, k) for k in deltas})
+    db.session.execute(stmt)
+
+
+def as_dict(st: CursoStats) -> dict:
+    return {
+        "inscritos": st.inscritos,
+        "lecciones": st.lecciones,
+        "intentos": st.intentos,
+        "promedio": round(st.suma_puntaje / st.intentos, 2) if st.intentos else None,
+        "tasa_completado": round(st.completados / st.inscritos, 4) if st.inscritos else 0.0,
+    }
+
+
+def reconcile(curso_id: int = None) -> int:
+    """Recalcula CursoStats desde las tablas base (todos los cursos o uno). Devuelve #filas."""
+    def per_course(col, *where):
+        q = db.session.query(col.label("curso_id"), func.count().label("n"))
+        return q.filter(*where).group_by(col).subquery()
+
+    ins = per_course(Inscripcion.curso_id)
+    lec = per_course(Leccion.curso_id)
+    prog = (db.session.query(Progreso.curso_id.label("curso_id"),
+                             func.sum(case((Progreso.porcentaje >= 100.0, 1), else_=0)).label("n"))
+            .group_by(Progreso.curso_id).subquery())
+    intentos = (db.session.query(Quiz.curso_id.label("curso_id"), func.count().label("n"),
+                                 func.coalesce(func.sum(IntentoQuiz.puntaje), 0.0).label("suma"))
+                .join(IntentoQuiz, IntentoQuiz.quiz_id == Quiz.id)
+                .filter(IntentoQuiz.entregado.is_(True))
+                .group_by(Quiz.curso_id).subquery())
+    q = (db.session.query(Curso.id,
+                          func.coalesce(ins.c.n, 0), func.coalesce(lec.c.n, 0),
+                          func.coalesce(intentos.c.n, 0), func.coalesce(intentos.c.suma, 0.0),
+                          func.coalesce(prog.c.n, 0))
+         .outerjoin(ins, ins.c.curso_id == Curso.id)
+         .outerjoin(lec, lec.c.curso_id == Curso.id)
+         .outerjoin(intentos, intentos.c.curso_id == Curso.id)
+         .outerjoin(prog, prog.c.curso_id == Curso.id))
+    stale = CursoStats.query
+    if curso_id is not None:
+        q = q.filter(Curso.id == curso_id)
+        stale = stale.filter(CursoStats.curso_id == curso_id)
+    rows = [dict(zip(("curso_id",) + COUNTERS, r)) for r in q.all()]
+    stale.delete(synchronize_session=False)
+    if rows:
+        db.session.execute(db.insert(CursoStats), rows)
+    return len(rows)
@@ -0,0 +1,153 @@
+"""Cola de entregas en la propia BD (SUBMIT_MODE=queue).
+
+El endpoint inserta una EntregaPendiente y responde 202; los workers toman lotes
+(UPDATE ... LIMIT con un token propio), corrigen en memoria y escriben todos los
+resultados del lote en una sola transacción.
+"""
+import json
+import threading
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, bindparam, or_, and_
+from .. import db
+from ..models import EntregaPendiente, IntentoQuiz, Quiz
+from . import attempts, grading, stats
+from .bulk import insert_ignore
+
+PENDIENTE, PROCESANDO, LISTO, ERROR = "PENDIENTE", "PROCESANDO", "LISTO", "ERROR"
+
+
+def enqueue(intento: IntentoQuiz, respuestas: dict):
+    """Encola la entrega (sin commit). Devuelve el id del ticket o None si el intento ya estaba en cola."""
+    stmt = (insert_ignore(EntregaPendiente)
+            .values(intento_id=intento.id, estudiante_id=intento.estudiante_id,
+                    respuestas=json.dumps(respuestas), estado=PENDIENTE, creado=datetime.utcnow())
+            .returning(EntregaPendiente.id))
+    return db.session.execute(stmt).scalar()
+
+
+def as_dict(entrega: EntregaPendiente) -> dict:
+    return {"ticket": entrega.id, "intento_id": entrega.intento_id, "estado": entrega.estado,
+            "resultado": json.loads(entrega.resultado) if entrega.resultado else None}
+
+
+def claim(batch_size: int, claim_timeout: float, now: datetime = None) -> str:
+    """Marca hasta `batch_size` entregas como PROCESANDO con un token nuevo y hace commit.
+
+    También retoma las PROCESANDO cuyo worker no terminó en `claim_timeout` segundos.
+    """
+    now = now or datetime.utcnow()
+    token = uuid.uuid4().hex
+    disponibles = (select(EntregaPendiente.id)
+                   .where(or_(EntregaPendiente.estado == PENDIENTE,
+                              and_(EntregaPendiente.estado == PROCESANDO,
+                                   EntregaPendiente.tomado_en < now - timedelta(seconds=claim_timeout))))
+                   .order_by(EntregaPendiente.id)
+                   .limit(batch_size))
+    db.session.execute(update(EntregaPendiente)
+                       .where(EntregaPendiente.id.in_(disponibles.scalar_subquery()))
+                       .values(estado=PROCESANDO, tomado_por=token, tomado_en=now)
+                       .execution_options(synchronize_session=False))
+    db.session.commit()
+    return token
+
+
+def process_claimed(token: str) -> int:
+    """Corrige las entregas del token en una transacción; devuelve cuántas se resolvieron."""
+    entregas = (db.session.query(EntregaPendiente.id, EntregaPendiente.intento_id,
+                                 EntregaPendiente.respuestas, EntregaPendiente.creado)
+                .filter(EntregaPendiente.tomado_por == token, EntregaPendiente.estado == PROCESANDO)
+                .order_by(EntregaPendiente.id).all())
+    if not entregas:
+        return 0
+    quiz_de = dict(db.session.query(IntentoQuiz.id, IntentoQuiz.quiz_id)
+                   .filter(IntentoQuiz.id.in_([e.intento_id for e in entregas])))
+    curso_de = dict(db.session.query(Quiz.id, Quiz.curso_id).filter(Quiz.id.in_(set(quiz_de.values()))))
+
+    finales, detalles, por_curso = [], [], {}
+    for e in entregas:
+        res = grading.grade(grading.get_answer_key(quiz_de[e.intento_id]), json.loads(e.respuestas))
+        # el plazo se evalúa contra la hora de encolado: el tiempo en cola no cuenta como atraso
+        if attempts.try_close(e.intento_id, res["puntaje"], now=e.creado):
+            detalles.append((e.intento_id, res["detalle"]))
+            agg = por_curso.setdefault(curso_de[quiz_de[e.intento_id]], [0, 0])
+            agg[0] += 1
+            agg[1] += res["puntaje"]
+            resultado = {k: res[k] for k in ("correctas", "total", "puntaje")}
+            estado = LISTO
+        else:
+            resultado, estado = {"error": attempts.close_reason(e.intento_id)}, ERROR
+        finales.append({"b_id": e.id, "b_estado": estado, "b_resultado": json.dumps(resultado)})
+
+    grading.save_results_many(detalles)
+    for curso_id, (n, suma) in por_curso.items():
+        stats.bump(curso_id, intentos=n, suma_puntaje=suma)
+    tabla = EntregaPendiente.__table__
+    # el filtro por token evita pisar un lote que otro worker retomó por timeout
+    db.session.execute(update(tabla)
+                       .where(tabla.c.id == bindparam("b_id"), tabla.c.tomado_por == token)
+                       .values(estado=bindparam("b_estado"), resultado=bindparam("b_resultado")),
+                       finales)
+    db.session.commit()
+    return len(finales)
+
+
+def process_pending(batch_size: int = 100, claim_timeout: float = 60.0) -> int:
+    """Toma y procesa un lote. Si falla, las filas quedan PROCESANDO y se retoman tras el timeout."""
+    token = claim(batch_size, claim_timeout)
+    try:
+        return process_claimed(token)
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def drain(batch_size: int = 100, claim_timeout: float = 60.0) -> int:
+    total = 0
+    while True:
+        n = process_pending(batch_size, claim_timeout)
+        if not n:
+            return total
+        total += n
+
+
+class SubmissionWorkers:
+    """Pool de hilos daemon que vacían la cola; notify() los despierta sin esperar al poll."""
+
+    def __init__(self, app, workers: int, batch_size: int = 100, poll_interval: float = 0.5,
+                 claim_timeout: float = 60.0):
+        self.app = app
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.claim_timeout = claim_timeout
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads = [threading.Thread(target=self._run, name=f"submission-worker-{i}", daemon=True)
+                         for i in range(workers)]
+
+    def start(self) -> None:
+        for t in self._threads:
+            t.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join()
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    n = process_pending(self.batch_size, self.claim_timeout)
+                except Exception:
+                    n = 0
+                    self.app.logger.exception("worker de entregas falló")
+                finally:
+                    db.session.remove()
+            if not n:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
@@ -0,0 +1,97 @@
+"""Análisis de ítems de un quiz con ~100k respuestas: agregación en SQL, cómputo y hit de caché.
+
+Compara contra el enfoque fila a fila (una consulta agregada por pregunta y otra por opción).
+
+Uso: python benchmarks/bench_analytics.py [--attempts 10000] [--questions 10]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import insert, func
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.models import Usuario, Curso, Quiz, Pregunta, Opcion, IntentoQuiz, RespuestaIntento  # noqa: E402
+from app.utils import analytics, grading  # noqa: E402
+
+
+def seed(n_attempts, n_preguntas, rnd):
+    doc = Usuario(email="doc@bench.io", password_hash="x")
+    db.session.add(doc)
+    db.session.flush()
+    curso = Curso(titulo="Bench", docente_id=doc.id)
+    db.session.add(curso)
+    db.session.flush()
+    quiz = Quiz(curso_id=curso.id, titulo="Final", intentos_max=0)
+    db.session.add(quiz)
+    db.session.flush()
+    db.session.execute(insert(Pregunta), [{"quiz_id": quiz.id, "enunciado": f"P{i}"} for i in range(n_preguntas)])
+    pids = [p for (p,) in db.session.query(Pregunta.id).order_by(Pregunta.id)]
+    db.session.execute(insert(Opcion), [{"pregunta_id": p, "texto": t, "correcta": t == "a"} for p in pids for t in "abcd"])
+    db.session.execute(insert(Usuario), [{"email": f"s{i}@bench.io", "password_hash": "x"} for i in range(n_attempts)])
+    alumnos = [u for (u,) in db.session.query(Usuario.id).filter(Usuario.id != doc.id)]
+    habilidad = {u: rnd.random() for u in alumnos}
+    db.session.execute(insert(IntentoQuiz), [{"quiz_id": quiz.id, "estudiante_id": u, "numero": 1, "entregado": True,
+                                              "puntaje": round(100 * habilidad[u])} for u in alumnos])
+    key = grading.load_answer_key(quiz.id)
+    filas = []
+    for it_id, est in db.session.query(IntentoQuiz.id, IntentoQuiz.estudiante_id):
+        for p, opciones in key.items():
+            ids = list(opciones)
+            sel = ids[0] if rnd.random() < habilidad[est] else rnd.choice(ids + [None])
+            filas.append({"intento_id": it_id, "pregunta_id": p, "opcion_id": sel, "correcta": sel == ids[0]})
+    for i in range(0, len(filas), 20000):
+        db.session.execute(insert(RespuestaIntento), filas[i:i + 20000])
+    db.session.commit()
+    return quiz.id, len(filas)
+
+
+def row_by_row(quiz_id):
+    out = []
+    for p in db.session.query(Pregunta.id).filter_by(quiz_id=quiz_id):
+        n, ok = (db.session.query(func.count(), func.sum(RespuestaIntento.correcta))
+                 .filter(RespuestaIntento.pregunta_id == p.id).one())
+        frec = {o.id: db.session.query(func.count()).filter(RespuestaIntento.opcion_id == o.id).scalar()
+                for o in db.session.query(Opcion.id).filter_by(pregunta_id=p.id)}
+        out.append((p.id, n, ok, frec))
+    return out
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--attempts", type=int, default=10000)
+    parser.add_argument("--questions", type=int, default=10)
+    args = parser.parse_args()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ["ATTEMPT_SWEEP_INTERVAL"] = "0"
+    os.environ["PROGRESS_FLUSH_INTERVAL"] = "0"
+    app = create_app()
+    with app.app_context():
+        quiz_id, n = seed(args.attempts, args.questions, random.Random(1))
+        key = grading.get_answer_key(quiz_id)
+        counts = []
+        load = timed(lambda: counts.append(analytics.load_counts(quiz_id, args.attempts)))
+        compute = timed(lambda: analytics.compute(key, *counts[0]))
+        cold = timed(lambda: analytics.quiz_analytics(quiz_id))
+        warm = timed(lambda: analytics.quiz_analytics(quiz_id))
+        legacy = timed(lambda: row_by_row(quiz_id))
+    print(f"{n} respuestas, {args.attempts} intentos, {args.questions} preguntas")
+    print(f"{'fase':<28} {'ms':>9}")
+    for name, ms in (("GROUP BY en SQL", load), ("totales en Python", compute), ("endpoint en frío", cold),
+                     ("endpoint cacheado", warm), ("fila a fila (por pregunta)", legacy)):
+        print(f"{name:<28} {ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
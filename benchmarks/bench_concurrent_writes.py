@@ -0,0 +1,110 @@
+"""Entregas concurrentes de quiz contra SQLite en archivo: perfil default vs production.
+
+Cada hilo entrega intentos reales (POST /api/quizzes/attempts/<id>/submit) mientras otros
+hilos leen el detalle del curso. Reporta entregas/s, p50/p95 y errores (p. ej. 'database is locked').
+
+Uso: python benchmarks/bench_concurrent_writes.py [--writers 16] [--readers 4] [--submits 400]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.models import Usuario, Curso, Quiz, Pregunta, Opcion, IntentoQuiz, EstadoCurso  # noqa: E402
+
+
+def setup(app, n_submits, n_preguntas=20):
+    with app.app_context():
+        doc = Usuario(email="doc@bench.io", password_hash="x")
+        db.session.add(doc)
+        db.session.flush()
+        curso = Curso(titulo="Bench", docente_id=doc.id, estado=EstadoCurso.PUBLICADO)
+        db.session.add(curso)
+        db.session.flush()
+        quiz = Quiz(curso_id=curso.id, titulo="Final", intentos_max=0)
+        db.session.add(quiz)
+        db.session.flush()
+        db.session.execute(insert(Pregunta), [{"quiz_id": quiz.id, "enunciado": f"P{i}"} for i in range(n_preguntas)])
+        pids = [pid for (pid,) in db.session.query(Pregunta.id)]
+        db.session.execute(insert(Opcion), [{"pregunta_id": p, "texto": t, "correcta": t == "a"} for p in pids for t in "abcd"])
+        db.session.execute(insert(Usuario), [{"email": f"s{i}@bench.io", "password_hash": "x"} for i in range(n_submits)])
+        alumnos = [uid for (uid,) in db.session.query(Usuario.id).filter(Usuario.id != doc.id)]
+        db.session.execute(insert(IntentoQuiz), [{"quiz_id": quiz.id, "estudiante_id": uid} for uid in alumnos])
+        db.session.commit()
+        intentos = [(it.id, create_access_token(identity=str(it.estudiante_id), additional_claims={"rol": "ESTUDIANTE"}))
+                    for it in IntentoQuiz.query.all()]
+        respuestas = {str(p): o for p, o in db.session.query(Opcion.pregunta_id, Opcion.id).filter(Opcion.correcta)}
+        return curso.id, intentos, respuestas
+
+
+def run(profile, args):
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ["DB_PROFILE"] = profile
+    os.environ["RATE_LIMIT_ENABLED"] = "0"
+    app = create_app()
+    curso_id, intentos, respuestas = setup(app, args.submits)
+
+    stop = threading.Event()
+    reads = []
+
+    def reader():
+        client = app.test_client()
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            client.get(f"/api/courses/{curso_id}")
+            reads.append(time.perf_counter() - t0)
+
+    def submit(item):
+        intento_id, token = item
+        client = app.test_client()
+        t0 = time.perf_counter()
+        try:
+            status = client.post(f"/api/quizzes/attempts/{intento_id}/submit", json={"respuestas": respuestas},
+                                 headers={"Authorization": f"Bearer {token}"}).status_code
+        except Exception:
+            status = 500
+        return status, time.perf_counter() - t0
+
+    readers = [threading.Thread(target=reader) for _ in range(args.readers)]
+    for t in readers:
+        t.start()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.writers) as ex:
+        results = list(ex.map(submit, intentos))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    for t in readers:
+        t.join()
+
+    lat = sorted(r[1] * 1000 for r in results)
+    errors = sum(1 for r in results if r[0] != 200)
+    read_p95 = sorted(reads)[int(len(reads) * 0.95) - 1] * 1000 if reads else 0.0
+    print(f"{profile:>11} {len(results) / elapsed:>10.1f} {statistics.median(lat):>8.1f} "
+          f"{lat[int(len(lat) * 0.95) - 1]:>8.1f} {errors:>7} {read_p95:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--submits", type=int, default=400)
+    parser.add_argument("--profiles", nargs="+", default=["default", "production"])
+    args = parser.parse_args()
+    print(f"{'perfil':>11} {'entregas/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'errores':>7} {'lectura p95':>12}")
+    for profile in args.profiles:
+        run(profile, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compara la corrección legacy (una consulta por pregunta) con app.utils.grading.
+
+Uso: python benchmarks/bench_grading.py [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+from sqlalchemy import event, insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.models import Usuario, Curso, Quiz, Pregunta, Opcion  # noqa: E402
+from app.utils import grading  # noqa: E402
+
+
+def seed_quiz(n_preguntas: int, opciones_por_pregunta: int = 4):
+    doc = Usuario(email=f"bench{n_preguntas}@lms.io", password_hash="x")
+    db.session.add(doc)
+    db.session.flush()
+    curso = Curso(titulo="Bench", docente_id=doc.id)
+    db.session.add(curso)
+    db.session.flush()
+    quiz = Quiz(curso_id=curso.id, titulo=f"Quiz {n_preguntas}")
+    db.session.add(quiz)
+    db.session.flush()
+    db.session.execute(insert(Pregunta), [{"quiz_id": quiz.id, "enunciado": f"P{i}"} for i in range(n_preguntas)])
+    pids = [pid for (pid,) in db.session.query(Pregunta.id).filter_by(quiz_id=quiz.id)]
+    db.session.execute(insert(Opcion), [{"pregunta_id": pid, "texto": f"O{j}", "correcta": j == 0}
+                                        for pid in pids for j in range(opciones_por_pregunta)])
+    db.session.commit()
+    respuestas = {str(pid): oid for pid, oid in
+                  db.session.query(Opcion.pregunta_id, Opcion.id).filter(Opcion.pregunta_id.in_(pids), Opcion.correcta)}
+    return quiz.id, respuestas
+
+
+def legacy_grade(quiz_id: int, respuestas: dict) -> dict:
+    """Réplica de la implementación original de submit_attempt."""
+    preguntas = Pregunta.query.filter_by(quiz_id=quiz_id).all()
+    correctas = 0
+    for p in preguntas:
+        sel = respuestas.get(str(p.id))
+        if sel is None:
+            continue
+        if Opcion.query.filter_by(id=int(sel), pregunta_id=p.id, correcta=True).first():
+            correctas += 1
+    return {"correctas": correctas, "total": len(preguntas)}
+
+
+def engine_grade(quiz_id: int, respuestas: dict) -> dict:
+    return grading.grade(grading.load_answer_key(quiz_id), respuestas)
+
+
+def measure(fn, quiz_id, respuestas, repeat):
+    stmts = []
+
+    def _log(*args):
+        stmts.append(1)
+
+    event.listen(db.engine, "before_cursor_execute", _log)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn(quiz_id, respuestas)
+        db.session.expunge_all()
+    elapsed = (time.perf_counter() - t0) / repeat
+    event.remove(db.engine, "before_cursor_execute", _log)
+    assert out["correctas"] == out["total"]
+    return len(stmts) // repeat, elapsed * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app(testing=True)
+    with app.app_context():
+        print(f"{'preguntas':>10} {'modo':>8} {'queries':>8} {'ms/entrega':>11}")
+        for n in (10, 100, 1000):
+            quiz_id, respuestas = seed_quiz(n)
+            for nombre, fn in (("legacy", legacy_grade), ("engine", engine_grade)):
+                queries, ms = measure(fn, quiz_id, respuestas, args.repeat)
+                print(f"{n:>10} {nombre:>8} {queries:>8} {ms:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Throughput de POST /api/auth/login bajo concurrencia.
+
+Corre el login real (test client, un hilo por cliente) contra una base SQLite temporal
+y reporta logins/s, p50/p95 y cuántos 503 devolvió el pool de verificación.
+
+Uso: python benchmarks/bench_login.py [--users 50] [--threads 1 8 32] [--rounds 29000] [--workers 4]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--rounds", type=int, default=29000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ["PASSWORD_HASH_ROUNDS"] = str(args.rounds)
+    os.environ["AUTH_VERIFY_WORKERS"] = str(args.workers)
+    os.environ["RATE_LIMIT_ENABLED"] = "0"  # se mide el pool de verificación, no la admisión
+
+    from app import create_app, db
+    from app.models import Usuario
+    from app.utils.security import hash_password
+
+    app = create_app()
+    with app.app_context():
+        pwd_hash = hash_password("pw")
+        db.session.add_all([Usuario(email=f"u{i}@bench.io", password_hash=pwd_hash) for i in range(args.users)])
+        db.session.commit()
+
+    def login(i):
+        client = app.test_client()
+        t0 = time.perf_counter()
+        status = client.post("/api/auth/login", json={"email": f"u{i % args.users}@bench.io", "password": "pw"}).status_code
+        return status, time.perf_counter() - t0
+
+    print(f"rounds={args.rounds} workers={args.workers}")
+    print(f"{'hilos':>6} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'503':>5}")
+    for n in args.threads:
+        total = max(args.users, n * 4)
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=n) as ex:
+            results = list(ex.map(login, range(total)))
+        elapsed = time.perf_counter() - t0
+        lat = sorted(r[1] * 1000 for r in results)
+        busy = sum(1 for r in results if r[0] == 503)
+        p95 = lat[int(len(lat) * 0.95) - 1]
+        print(f"{n:>6} {total / elapsed:>9.1f} {statistics.median(lat):>8.1f} {p95:>8.1f} {busy:>5}")
+
+
+if __name__ == "__main__":
+    main()
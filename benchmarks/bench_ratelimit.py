@@ -0,0 +1,60 @@
+"""Login bajo sobrecarga con y sin limitador: los excedentes fallan rápido (429) en vez de hacer cola.
+
+Uso: python benchmarks/bench_ratelimit.py [--threads 32] [--requests 400]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run(enabled: bool, args) -> dict:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ["ATTEMPT_SWEEP_INTERVAL"] = "0"
+    os.environ["PROGRESS_FLUSH_INTERVAL"] = "0"
+    os.environ["RATE_LIMIT_ENABLED"] = "1" if enabled else "0"
+    from app import create_app, db
+    from app.models import Usuario
+    from app.utils.security import hash_password
+    app = create_app()
+    with app.app_context():
+        db.session.add(Usuario(email="u@bench.io", password_hash=hash_password("pw")))
+        db.session.commit()
+
+    def login(_):
+        t0 = time.perf_counter()
+        status = app.test_client().post("/api/auth/login", json={"email": "u@bench.io", "password": "pw"}).status_code
+        return status, (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as ex:
+        results = list(ex.map(login, range(args.requests)))
+    elapsed = time.perf_counter() - t0
+    by_status = {}
+    for status, ms in results:
+        by_status.setdefault(status, []).append(ms)
+    return {"elapsed": elapsed, "by_status": by_status}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=400)
+    args = parser.parse_args()
+    print(f"{args.requests} logins desde una IP con {args.threads} hilos")
+    print(f"{'limitador':<10} {'status':>6} {'n':>5} {'p50 ms':>8} {'p95 ms':>8}")
+    for enabled in (False, True):
+        res = run(enabled, args)
+        for status, lat in sorted(res["by_status"].items()):
+            lat.sort()
+            print(f"{'sí' if enabled else 'no':<10} {status:>6} {len(lat):>5} {statistics.median(lat):>8.1f} "
+                  f"{lat[max(0, int(len(lat) * 0.95) - 1)]:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
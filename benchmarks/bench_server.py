@@ -0,0 +1,120 @@
+"""Arranque y throughput: `python run.py` (servidor de desarrollo) vs `python serve.py` (pre-fork).
+
+Levanta cada servidor como subproceso sobre la misma BD sintética y mide el tiempo hasta el
+primer 200, la latencia del primer request a una ruta con BD y el throughput con clientes
+concurrentes (un proceso por cliente, conexión keep-alive).
+
+Uso: python benchmarks/bench_server.py [--clients 8] [--seconds 5] [--workers 4] [--threads 8]
+"""
+import argparse
+import http.client
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PATHS = ("/api/courses/", "/api/courses/search?q=algebra", "/api/health")
+
+
+def seed(db_url: str) -> None:
+    os.environ["DATABASE_URL"] = db_url
+    os.environ["ATTEMPT_SWEEP_INTERVAL"] = "0"
+    os.environ["PROGRESS_FLUSH_INTERVAL"] = "0"
+    from app import create_app
+    from benchmarks import datagen
+    app = create_app(background=False)
+    with app.app_context():
+        datagen.generate(teachers=20, courses=10, students=500, enroll=2)
+
+
+def wait_ready(port: int, timeout: float = 30.0) -> float:
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < timeout:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/health")
+            if conn.getresponse().status == 200:
+                return time.perf_counter() - t0
+        except OSError:
+            time.sleep(0.01)
+    raise RuntimeError(f"el servidor no respondió en :{port}")
+
+
+def first_request(port: int) -> float:
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    t0 = time.perf_counter()
+    conn.request("GET", PATHS[0])
+    conn.getresponse().read()
+    return time.perf_counter() - t0
+
+
+def _client(port: int, seconds: float, out) -> None:
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    n, i, deadline = 0, 0, time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            conn.request("GET", PATHS[i % len(PATHS)])
+            resp = conn.getresponse()
+            resp.read()
+            if resp.getheader("Connection", "").lower() == "close" or resp.version == 10:
+                conn.close()
+            n += resp.status == 200
+        except (OSError, http.client.HTTPException):
+            conn.close()
+        i += 1
+    out.put(n)
+
+
+def throughput(port: int, clients: int, seconds: float) -> float:
+    q = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_client, args=(port, seconds, q)) for _ in range(clients)]
+    for p in procs:
+        p.start()
+    total = sum(q.get() for _ in procs)
+    for p in procs:
+        p.join()
+    return total / seconds
+
+
+def run_server(name, cmd, env, port, args) -> dict:
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        startup = wait_ready(port)
+        first = first_request(port)
+        rps = throughput(port, args.clients, args.seconds)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return {"servidor": name, "arranque_ms": startup * 1000, "primer_req_ms": first * 1000, "req_s": rps}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    db_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    seed(db_url)
+    env = {**os.environ, "DATABASE_URL": db_url, "MIGRATE_ON_START": "1", "SUBMIT_MODE": "sync",
+           "RATE_LIMIT_ENABLED": "0"}
+    resultados = [
+        run_server("run.py (dev)", [sys.executable, "run.py"], env, 5000, args),
+        run_server(f"serve.py ({args.workers}x{args.threads})",
+                   [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", "8001",
+                    "--workers", str(args.workers), "--threads", str(args.threads)], env, 8001, args),
+    ]
+    print(f"{args.clients} clientes keep-alive, {args.seconds:g} s por servidor")
+    print(f"{'servidor':<22} {'arranque ms':>12} {'1er req ms':>11} {'req/s':>9}")
+    for r in resultados:
+        print(f"{r['servidor']:<22} {r['arranque_ms']:>12.0f} {r['primer_req_ms']:>11.1f} {r['req_s']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
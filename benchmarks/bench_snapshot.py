@@ -0,0 +1,59 @@
+"""Clonado de un curso grande vía snapshot: export (gzip NDJSON) + import en una transacción.
+
+Por defecto 500 lecciones y 2.000 preguntas (10 quizzes x 200) con 4 opciones cada una.
+
+Uso: python benchmarks/bench_snapshot.py [--lessons 500] [--quizzes 10] [--questions 200]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.models import Curso  # noqa: E402
+from benchmarks import datagen  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lessons", type=int, default=500)
+    parser.add_argument("--quizzes", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=200)
+    args = parser.parse_args()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ["ATTEMPT_SWEEP_INTERVAL"] = "0"
+    os.environ["PROGRESS_FLUSH_INTERVAL"] = "0"
+    app = create_app()
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        datagen.generate(teachers=1, courses=1, lessons=args.lessons, quizzes=args.quizzes,
+                         questions=args.questions, options=4, students=0)
+        curso = db.session.query(Curso.id, Curso.docente_id).one()
+        token = create_access_token(identity=str(curso.docente_id), additional_claims={"rol": "DOCENTE"})
+    headers = {"Authorization": f"Bearer {token}"}
+    client = app.test_client()
+
+    t0 = time.perf_counter()
+    r = client.get(f"/api/courses/{curso.id}/snapshot", headers=headers)
+    body = r.data
+    export_ms = (time.perf_counter() - t0) * 1000
+    assert r.status_code == 200, r.status_code
+
+    t0 = time.perf_counter()
+    r = client.post("/api/courses/import", data=body, headers={**headers, "Content-Type": "application/gzip"})
+    import_ms = (time.perf_counter() - t0) * 1000
+    assert r.status_code == 201, r.get_json()
+    out = r.get_json()
+
+    print(f"{out['lecciones']} lecciones, {out['quizzes']} quizzes, {out['preguntas']} preguntas, "
+          f"{out['opciones']} opciones; snapshot {len(body) / 1024:.0f} KiB gzip")
+    print(f"{'fase':<22} {'ms':>9}")
+    for name, ms in (("export", export_ms), ("import", import_ms), ("clon completo", export_ms + import_ms)):
+        print(f"{name:<22} {ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
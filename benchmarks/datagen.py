@@ -0,0 +1,115 @@
+"""Generador de datos sintéticos con inserciones masivas (executemany), sin pasar por la API.
+
+Crea docentes, cursos, lecciones, quizzes con preguntas/opciones y estudiantes inscritos;
+al final reconcilia CursoStats y regenera el índice de búsqueda. Todos los usuarios tienen
+la contraseña PASSWORD. Reemplazo multiplataforma de scripts/seed_http.ps1 para volúmenes grandes.
+
+Uso: python benchmarks/datagen.py [--teachers 10] [--courses 5] [--lessons 20] [--quizzes 2]
+                                  [--questions 10] [--students 1000] [--enroll 3] [--seed 1]
+     (usa DATABASE_URL; ver .env.example)
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from sqlalchemy import insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.models import (Usuario, Rol, Curso, EstadoCurso, Leccion, Quiz, Pregunta, Opcion,  # noqa: E402
+                        Inscripcion, Progreso)
+from app.utils import search, stats  # noqa: E402
+from app.utils.bulk import chunks  # noqa: E402
+from app.utils.security import hash_password  # noqa: E402
+
+PASSWORD = "secreto123"
+PALABRAS = ("python", "algebra", "historia", "redes", "datos", "fisica", "quimica", "diseño", "ingles",
+            "estadistica", "marketing", "finanzas", "biologia", "arte", "musica", "sql", "flask", "web")
+
+
+def _bulk(model, rows: list) -> None:
+    for lote in chunks(rows, 1000):
+        db.session.execute(insert(model), lote)
+
+
+def _ids(query) -> list:
+    return [i for (i,) in query]
+
+
+def generate(teachers=10, courses=5, lessons=20, quizzes=2, questions=10, options=4, students=1000,
+             enroll=3, seed=1, prefix="synth") -> dict:
+    """Inserta el volumen pedido en la BD de la app actual y hace commit.
+
+    `courses`, `lessons`, `quizzes`, `questions` y `enroll` son por docente / curso / quiz /
+    estudiante respectivamente. Devuelve los ids generados para los escenarios de benchmark.
+    """
+    rnd = random.Random(seed)
+    pwd = hash_password(PASSWORD)
+    _bulk(Usuario, [{"email": f"{prefix}-doc{i}@bench.io", "password_hash": pwd, "rol": Rol.DOCENTE}
+                    for i in range(teachers)]
+          + [{"email": f"{prefix}-est{i}@bench.io", "password_hash": pwd, "rol": Rol.ESTUDIANTE}
+             for i in range(students)])
+    docentes = _ids(db.session.query(Usuario.id).filter(Usuario.email.like(f"{prefix}-doc%")).order_by(Usuario.id))
+    alumnos = _ids(db.session.query(Usuario.id).filter(Usuario.email.like(f"{prefix}-est%")).order_by(Usuario.id))
+
+    _bulk(Curso, [{"titulo": f"{' '.join(rnd.sample(PALABRAS, 2)).title()} {d}-{c}",
+                   "descripcion": f"Curso sintético de {rnd.choice(PALABRAS)}",
+                   "docente_id": d,
+                   "estado": EstadoCurso.PUBLICADO if rnd.random() < 0.9 else EstadoCurso.BORRADOR}
+                  for d in docentes for c in range(courses)])
+    cursos = _ids(db.session.query(Curso.id).filter(Curso.docente_id.in_(docentes)).order_by(Curso.id))
+    publicados = _ids(db.session.query(Curso.id).filter(Curso.id.in_(cursos),
+                                                        Curso.estado == EstadoCurso.PUBLICADO))
+
+    _bulk(Leccion, [{"curso_id": c, "titulo": f"Lección {n}", "contenido": "Lorem ipsum " * 20, "orden": n}
+                    for c in cursos for n in range(1, lessons + 1)])
+    _bulk(Quiz, [{"curso_id": c, "titulo": f"Quiz {n}", "tiempo_limite_min": 30, "intentos_max": 3}
+                 for c in cursos for n in range(1, quizzes + 1)])
+    quiz_ids = _ids(db.session.query(Quiz.id).filter(Quiz.curso_id.in_(cursos)).order_by(Quiz.id))
+    _bulk(Pregunta, [{"quiz_id": q, "enunciado": f"Pregunta {n}", "tipo": "MULTIPLE"}
+                     for q in quiz_ids for n in range(questions)])
+    preguntas = _ids(db.session.query(Pregunta.id).filter(Pregunta.quiz_id.in_(quiz_ids)))
+    _bulk(Opcion, [{"pregunta_id": p, "texto": f"Opción {k}", "correcta": k == 0}
+                   for p in preguntas for k in range(options)])
+
+    inscripciones = {(a, c) for a in alumnos for c in rnd.sample(publicados, min(enroll, len(publicados)))}
+    _bulk(Inscripcion, [{"estudiante_id": a, "curso_id": c} for a, c in inscripciones])
+    _bulk(Progreso, [{"estudiante_id": a, "curso_id": c, "porcentaje": 0.0} for a, c in inscripciones])
+    db.session.commit()
+
+    stats.reconcile()
+    db.session.commit()
+    if search.enabled():
+        search.rebuild()
+    return {"docentes": docentes, "estudiantes": alumnos, "cursos": cursos, "publicados": publicados,
+            "quizzes": quiz_ids, "inscripciones": sorted(inscripciones)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--teachers", type=int, default=10)
+    parser.add_argument("--courses", type=int, default=5, help="cursos por docente")
+    parser.add_argument("--lessons", type=int, default=20, help="lecciones por curso")
+    parser.add_argument("--quizzes", type=int, default=2, help="quizzes por curso")
+    parser.add_argument("--questions", type=int, default=10, help="preguntas por quiz")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--enroll", type=int, default=3, help="cursos por estudiante")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--prefix", default="synth", help="prefijo de emails (permite cargar varias veces)")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        t0 = time.perf_counter()
+        out = generate(args.teachers, args.courses, args.lessons, args.quizzes, args.questions, 4,
+                       args.students, args.enroll, args.seed, args.prefix)
+        print(f"{len(out['docentes'])} docentes, {len(out['cursos'])} cursos, {len(out['quizzes'])} quizzes, "
+              f"{len(out['estudiantes'])} estudiantes, {len(out['inscripciones'])} inscripciones "
+              f"en {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""Suite de carga: escenarios realistas contra la app real, con baselines para ver regresiones.
+
+Genera datos con benchmarks/datagen.py en una SQLite temporal y corre, en orden:
+  catalog      GET del catálogo (páginas, búsqueda y detalle de curso)
+  enroll       POST /enroll de estudiantes a cursos publicados donde no estaban
+  exam_start   POST /quizzes/<id>/attempts de cada estudiante inscrito
+  mass_submit  POST /attempts/<id>/submit de todos los intentos a la vez
+Por escenario reporta requests, errores, req/s, p50/p95/p99 (ms) y sentencias SQL por request.
+
+Con --server los requests van por HTTP a un servidor WSGI local (werkzeug, con hilos) en vez
+del test client. Los resultados se comparan con benchmarks/baselines.json; --save los guarda
+como nueva baseline y --check sale con código 1 si hay regresiones.
+
+Uso: python benchmarks/suite.py [--students 300] [--concurrency 8] [--server] [--profile production]
+                                [--save | --check] [--tolerance 0.5]
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+SCENARIOS = ("catalog", "enroll", "exam_start", "mass_submit")
+
+
+class SqlCounter:
+    """Cuenta sentencias del engine (todas las conexiones/hilos del proceso)."""
+
+    def __init__(self, engine):
+        self.n = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        with self._lock:
+            self.n += 1
+
+
+class TestClientDriver:
+    name = "testclient"
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, token=None):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        return client.open(path, method=method, json=body, headers=headers).status_code
+
+    def close(self):
+        pass
+
+
+class ServerDriver:
+    """Servidor werkzeug con hilos en un puerto libre; una conexión keep-alive por hilo cliente."""
+    name = "server"
+
+    def __init__(self, app):
+        from werkzeug.serving import make_server
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)  # sin una línea de log por request
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.server.RequestHandlerClass.protocol_version = "HTTP/1.1"
+        self.port = self.server.server_port
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, token=None):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        try:
+            conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            return resp.status
+        except (OSError, http.client.HTTPException):
+            self._local.conn = None
+            return 599
+
+    def close(self):
+        self.server.shutdown()
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(p / 100.0 * (len(sorted_values) - 1))))]
+
+
+def run_scenario(driver, sql, calls, concurrency, ok=(200, 201, 202, 304)):
+    """calls = [(method, path, body, token)]; devuelve las métricas del escenario."""
+    def one(call):
+        t0 = time.perf_counter()
+        status = driver.request(*call)
+        return status, time.perf_counter() - t0
+
+    sql_before = sql.n
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        results = list(ex.map(one, calls))
+    elapsed = time.perf_counter() - t0
+    lat = sorted(r[1] * 1000 for r in results)
+    return {
+        "requests": len(results),
+        "errors": sum(1 for status, _ in results if status not in ok),
+        "rps": round(len(results) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(lat, 50), 2),
+        "p95_ms": round(percentile(lat, 95), 2),
+        "p99_ms": round(percentile(lat, 99), 2),
+        "sql_per_req": round((sql.n - sql_before) / len(results), 2) if results else 0.0,
+    }
+
+
+def build_app(args, db_path):
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["DB_PROFILE"] = args.profile
+    os.environ["ATTEMPT_SWEEP_INTERVAL"] = "0"
+    os.environ["PROGRESS_FLUSH_INTERVAL"] = "0"
+    os.environ["RATE_LIMIT_ENABLED"] = "0"  # un solo cliente/IP: los límites falsearían las latencias
+    os.environ.setdefault("SUBMIT_MODE", "sync")
+    from app import create_app
+    return create_app()
+
+
+def run_suite(args) -> dict:
+    from flask_jwt_extended import create_access_token
+    from app import db
+    from app.models import Quiz, Pregunta, Opcion
+    import datagen
+
+    app = build_app(args, os.path.join(tempfile.mkdtemp(), "suite.db"))
+    rnd = random.Random(args.seed)
+    with app.app_context():
+        data = datagen.generate(teachers=args.teachers, courses=args.courses, lessons=args.lessons,
+                                quizzes=1, questions=args.questions, students=args.students,
+                                enroll=args.enroll, seed=args.seed)
+        tokens = {uid: create_access_token(identity=str(uid), additional_claims={"rol": "ESTUDIANTE"})
+                  for uid in data["estudiantes"]}
+        quiz_de = dict(db.session.query(Quiz.curso_id, Quiz.id).filter(Quiz.id.in_(data["quizzes"])))
+        correctas = {}
+        for quiz_id, pregunta_id, opcion_id in (db.session.query(Pregunta.quiz_id, Pregunta.id, Opcion.id)
+                                                .join(Opcion, Opcion.pregunta_id == Pregunta.id)
+                                                .filter(Opcion.correcta)):
+            correctas.setdefault(quiz_id, {})[str(pregunta_id)] = opcion_id
+        sql = SqlCounter(db.engine)
+        db.session.remove()
+
+    driver = ServerDriver(app) if args.server else TestClientDriver(app)
+    results = {}
+    try:
+        publicados = data["publicados"]
+        catalog = []
+        for _ in range(args.students):
+            r = rnd.random()
+            if r < 0.5:
+                catalog.append(("GET", f"/api/courses/?page={rnd.randint(1, 5)}&size=10", None, None))
+            elif r < 0.7:
+                catalog.append(("GET", f"/api/courses/?q={rnd.choice(datagen.PALABRAS)[:4]}", None, None))
+            else:
+                catalog.append(("GET", f"/api/courses/{rnd.choice(publicados)}", None, None))
+        results["catalog"] = run_scenario(driver, sql, catalog, args.concurrency)
+
+        inscritos = {}
+        for uid, curso_id in data["inscripciones"]:
+            inscritos.setdefault(uid, set()).add(curso_id)
+        enroll = []
+        for uid in data["estudiantes"]:
+            libres = [c for c in publicados if c not in inscritos.get(uid, ())]
+            if libres:
+                curso_id = rnd.choice(libres)
+                inscritos.setdefault(uid, set()).add(curso_id)
+                enroll.append(("POST", f"/api/courses/{curso_id}/enroll", None, tokens[uid]))
+        results["enroll"] = run_scenario(driver, sql, enroll, args.concurrency)
+
+        # todos rinden el quiz de uno de sus cursos: un pico de altas y luego de entregas
+        examen = [(uid, quiz_de[min(cursos)]) for uid, cursos in inscritos.items()]
+        starts = [("POST", f"/api/quizzes/{quiz_id}/attempts", None, tokens[uid]) for uid, quiz_id in examen]
+        results["exam_start"] = run_scenario(driver, sql, starts, args.concurrency)
+
+        with app.app_context():
+            from app.models import IntentoQuiz
+            abiertos = db.session.query(IntentoQuiz.id, IntentoQuiz.quiz_id, IntentoQuiz.estudiante_id).all()
+            db.session.remove()
+        submits = [("POST", f"/api/quizzes/attempts/{intento_id}/submit",
+                    {"respuestas": {p: o for p, o in correctas.get(quiz_id, {}).items() if rnd.random() < 0.7}},
+                    tokens[uid]) for intento_id, quiz_id, uid in abiertos]
+        results["mass_submit"] = run_scenario(driver, sql, submits, args.concurrency)
+    finally:
+        driver.close()
+        with app.app_context():
+            db.engine.dispose()
+    return results
+
+
+def load_baselines() -> dict:
+    if not os.path.exists(BASELINES):
+        return {}
+    with open(BASELINES, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(key, current, baseline, tolerance):
+    """Lista de regresiones del escenario contra su baseline."""
+    if not baseline:
+        return []
+    out = []
+    if current["p95_ms"] > baseline["p95_ms"] * (1 + tolerance):
+        out.append(f"p95 {current['p95_ms']}ms > {baseline['p95_ms']}ms")
+    if current["rps"] < baseline["rps"] * (1 - tolerance):
+        out.append(f"req/s {current['rps']} < {baseline['rps']}")
+    # el conteo de SQL casi no depende de la máquina: sólo varía por misses de caché concurrentes,
+    # así que un salto mayor que ese ruido es una regresión real (p. ej. un N+1 nuevo)
+    if current["sql_per_req"] > baseline["sql_per_req"] + max(0.5, 0.1 * baseline["sql_per_req"]):
+        out.append(f"sql/req {current['sql_per_req']} > {baseline['sql_per_req']}")
+    if current["errors"] > baseline.get("errors", 0):
+        out.append(f"errores {current['errors']} > {baseline.get('errors', 0)}")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--teachers", type=int, default=10)
+    parser.add_argument("--courses", type=int, default=5)
+    parser.add_argument("--lessons", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--enroll", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--server", action="store_true", help="HTTP contra un servidor WSGI local")
+    parser.add_argument("--profile", default="production", help="DB_PROFILE (default | production)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="margen relativo para p95 y req/s")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--save", action="store_true", help="guarda los resultados como baseline")
+    group.add_argument("--check", action="store_true", help="código de salida 1 si hay regresiones")
+    args = parser.parse_args()
+
+    results = run_suite(args)
+    driver = "server" if args.server else "testclient"
+    baselines = load_baselines()
+    regresiones = 0
+    print(f"{'escenario':<12} {'reqs':>6} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'sql/req':>8}")
+    for name in SCENARIOS:
+        r = results[name]
+        problemas = compare(f"{driver}:{name}", r, baselines.get(f"{driver}:{name}"), args.tolerance)
+        regresiones += len(problemas)
+        print(f"{name:<12} {r['requests']:>6} {r['errors']:>5} {r['rps']:>8} {r['p50_ms']:>8} "
+              f"{r['p95_ms']:>8} {r['p99_ms']:>8} {r['sql_per_req']:>8}"
+              + (f"  REGRESIÓN: {'; '.join(problemas)}" if problemas else ""))
+    if args.save:
+        baselines.update({f"{driver}:{name}": results[name] for name in SCENARIOS})
+        with open(BASELINES, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline guardada en {BASELINES}")
+    if args.check and regresiones:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
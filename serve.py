@@ -0,0 +1,5 @@
+﻿"""Entrada de producción: servidor pre-fork con la app precargada (ver app/server.py)."""
+from app.server import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import event
+from app import create_app, db
+
+
+@pytest.fixture()
+def app():
+    app = create_app(testing=True)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture()
+def sql_log(app):
+    """Lista con cada sentencia SQL emitida mientras dura el test."""
+    stmts = []
+
+    def _log(conn, cursor, statement, *args):
+        stmts.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _log)
+    yield stmts
+    event.remove(db.engine, "before_cursor_execute", _log)
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def register_and_login(client, email, rol="ESTUDIANTE", password="secreto123"):
+    """Crea un usuario vía API y devuelve el header Authorization listo para usar."""
+    client.post("/api/auth/register", json={"email": email, "password": password, "rol": rol})
+    token = client.post("/api/auth/login", json={"email": email, "password": password}).get_json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture()
+def docente(client):
+    return register_and_login(client, "docente@test.io", rol="DOCENTE")
+
+
+@pytest.fixture()
+def estudiante(client):
+    return register_and_login(client, "estudiante@test.io")
+
+
+@pytest.fixture()
+def quiz(client, docente):
+    """Curso + quiz con 3 preguntas; devuelve (quiz_id, [(pregunta_id, opcion_ok, opcion_mal), ...])."""
+    curso_id = client.post("/api/courses/", json={"titulo": "Algebra"}, headers=docente).get_json()["id"]
+    quiz_id = client.post("/api/quizzes/", json={"curso_id": curso_id, "titulo": "Parcial", "intentos_max": 3},
+                          headers=docente).get_json()["id"]
+    preguntas = []
+    for i in range(3):
+        body = {"enunciado": f"P{i}", "tipo": "MULTIPLE",
+                "opciones": [{"texto": "si", "correcta": True}, {"texto": "no"}]}
+        p = client.post(f"/api/quizzes/{quiz_id}/questions", json=body, headers=docente).get_json()
+        preguntas.append((p["id"], p["opciones"][0]["id"], p["opciones"][1]["id"]))
+    return quiz_id, preguntas
@@ -0,0 +1,57 @@
+import pytest
+from tests.conftest import register_and_login
+
+
+def _submit(client, quiz, headers, correctas, responder=3):
+    quiz_id, preguntas = quiz
+    it = client.post(f"/api/quizzes/{quiz_id}/attempts", headers=headers).get_json()["intento_id"]
+    resp = {str(p): (ok if i < correctas else mal) for i, (p, ok, mal) in enumerate(preguntas[:responder])}
+    client.post(f"/api/quizzes/attempts/{it}/submit", json={"respuestas": resp}, headers=headers)
+
+
+@pytest.fixture()
+def cohorte(client, quiz):
+    """4 alumnos con 3, 2, 1 y 0 aciertos; el último sólo responde la primera pregunta."""
+    for i, correctas in enumerate((3, 2, 1, 0)):
+        _submit(client, quiz, register_and_login(client, f"a{i}@test.io"), correctas,
+                responder=1 if correctas == 0 else 3)
+
+
+def test_item_statistics(client, quiz, docente, cohorte):
+    _, preguntas = quiz
+    data = client.get(f"/api/quizzes/{quiz[0]}/analytics", headers=docente).get_json()
+    assert data["intentos"] == 4 and data["respuestas"] == 12 and data["grupo_extremo"] == 1
+    p0, p1, p2 = data["preguntas"]
+    assert [p["dificultad"] for p in (p0, p1, p2)] == [0.75, 0.5, 0.25]
+    assert [p["discriminacion"] for p in (p0, p1, p2)] == [1.0, 1.0, 1.0]
+    assert p2["sin_respuesta"] == 1
+    assert p0["opciones"] == [
+        {"opcion_id": preguntas[0][1], "correcta": True, "frecuencia": 3, "proporcion": 0.75},
+        {"opcion_id": preguntas[0][2], "correcta": False, "frecuencia": 1, "proporcion": 0.25},
+    ]
+
+
+def test_cached_until_new_submission(client, quiz, docente, cohorte, sql_log):
+    url = f"/api/quizzes/{quiz[0]}/analytics"
+    client.get(url, headers=docente)
+    sql_log.clear()
+    assert client.get(url, headers=docente).get_json()["intentos"] == 4
+    assert not [s for s in sql_log if "FROM respuesta_intento" in s]
+    _submit(client, quiz, register_and_login(client, "tarde@test.io"), 3)
+    assert client.get(url, headers=docente).get_json()["intentos"] == 5
+
+
+def test_only_course_owner(client, quiz):
+    otro = register_and_login(client, "otro@test.io", rol="DOCENTE")
+    est = register_and_login(client, "est@test.io")
+    assert client.get(f"/api/quizzes/{quiz[0]}/analytics", headers=otro).status_code == 403
+    assert client.get(f"/api/quizzes/{quiz[0]}/analytics", headers=est).status_code == 403
+    assert client.get("/api/quizzes/999/analytics", headers=otro).status_code == 404
+
+
+def test_without_extreme_groups_discrimination_is_none(client, quiz, docente):
+    _submit(client, quiz, register_and_login(client, "solo@test.io"), 2)
+    data = client.get(f"/api/quizzes/{quiz[0]}/analytics", headers=docente).get_json()
+    assert data["grupo_extremo"] == 0 and data["respuestas"] == 3
+    assert [p["discriminacion"] for p in data["preguntas"]] == [None, None, None]
+    assert [p["dificultad"] for p in data["preguntas"]] == [1.0, 1.0, 0.0]
@@ -0,0 +1,108 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import Usuario, Curso, Quiz, Pregunta, Opcion, IntentoQuiz, CursoStats
+from app.utils import attempts
+
+
+@pytest.fixture()
+def file_app(tmp_path, monkeypatch):
+    """Base en archivo con WAL: la memoria compartida de los tests no sirve para concurrencia real."""
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'stress.db'}")
+    monkeypatch.setenv("ATTEMPT_SWEEP_INTERVAL", "0")
+    monkeypatch.setenv("DB_PROFILE", "production")
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "0")  # se mide la concurrencia en la BD, no la admisión
+    app = create_app(testing=False)
+    with app.app_context():
+        doc = Usuario(email="d@s.io", password_hash="x")
+        est = Usuario(email="e@s.io", password_hash="x")
+        db.session.add_all([doc, est])
+        db.session.flush()
+        curso = Curso(titulo="Stress", docente_id=doc.id)
+        db.session.add(curso)
+        db.session.flush()
+        quiz = Quiz(curso_id=curso.id, titulo="Q", intentos_max=3, tiempo_limite_min=10)
+        db.session.add(quiz)
+        db.session.flush()
+        p = Pregunta(quiz_id=quiz.id, enunciado="?")
+        db.session.add(p)
+        db.session.flush()
+        db.session.add(Opcion(pregunta_id=p.id, texto="si", correcta=True))
+        db.session.commit()
+        app.config["stress"] = {"quiz_id": quiz.id, "pregunta_id": p.id, "curso_id": curso.id,
+                                "headers": {"Authorization": f"Bearer {create_access_token(str(est.id))}"}}
+        db.session.remove()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+def _parallel(fn, n, workers=32):
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(lambda _: fn(), range(n)))
+
+
+def test_parallel_starts_never_exceed_limit(file_app):
+    cfg = file_app.config["stress"]
+
+    def start():
+        return file_app.test_client().post(f"/api/quizzes/{cfg['quiz_id']}/attempts", headers=cfg["headers"]).status_code
+
+    statuses = _parallel(start, 200)
+    assert statuses.count(200) == 3 and statuses.count(409) == 197
+    with file_app.app_context():
+        assert sorted(n for (n,) in db.session.query(IntentoQuiz.numero)) == [1, 2, 3]
+
+
+def test_parallel_submits_grade_exactly_once(file_app):
+    cfg = file_app.config["stress"]
+    client = file_app.test_client()
+    intento = client.post(f"/api/quizzes/{cfg['quiz_id']}/attempts", headers=cfg["headers"]).get_json()["intento_id"]
+    body = {"respuestas": {str(cfg["pregunta_id"]): 1}}
+
+    def submit():
+        url = f"/api/quizzes/attempts/{intento}/submit"
+        return file_app.test_client().post(url, json=body, headers=cfg["headers"]).status_code
+
+    statuses = _parallel(submit, 100)
+    assert statuses.count(200) == 1 and statuses.count(409) == 99
+    with file_app.app_context():
+        assert db.session.get(CursoStats, cfg["curso_id"]).intentos == 1
+
+
+def test_late_submit_is_rejected_and_sweeper_closes_expired(file_app):
+    cfg = file_app.config["stress"]
+    client = file_app.test_client()
+    ids = [client.post(f"/api/quizzes/{cfg['quiz_id']}/attempts", headers=cfg["headers"]).get_json()["intento_id"]
+           for _ in range(3)]
+    with file_app.app_context():
+        IntentoQuiz.query.filter(IntentoQuiz.id.in_(ids)).update(
+            {"limite": datetime.utcnow() - timedelta(seconds=1)}, synchronize_session=False)
+        db.session.commit()
+    resp = client.post(f"/api/quizzes/attempts/{ids[0]}/submit", json={"respuestas": {}}, headers=cfg["headers"])
+    assert resp.status_code == 409 and resp.get_json()["error"] == "tiempo agotado"
+    with file_app.app_context():
+        assert attempts.sweep(batch_size=2) == 3
+        assert attempts.sweep() == 0
+        assert {(it.entregado, it.puntaje) for it in IntentoQuiz.query} == {(True, 0.0)}
+        assert db.session.get(CursoStats, cfg["curso_id"]).intentos == 3
+
+
+def test_start_lost_races_are_retryable_not_limit(client, estudiante, quiz):
+    from sqlalchemy import event
+    from sqlalchemy.exc import IntegrityError
+    quiz_id, _ = quiz
+
+    def choca(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO intento_quiz"):
+            raise IntegrityError(statement, parameters, Exception("UNIQUE constraint failed"))
+
+    event.listen(db.engine, "before_cursor_execute", choca)
+    try:
+        r = client.post(f"/api/quizzes/{quiz_id}/attempts", headers=estudiante)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", choca)
+    assert r.status_code == 503 and r.headers["Retry-After"] == "1"
+    assert client.post(f"/api/quizzes/{quiz_id}/attempts", headers=estudiante).get_json()["numero"] == 1
@@ -0,0 +1,54 @@
+import pytest
+from passlib.hash import pbkdf2_sha256
+from app import db
+from app.models import Usuario, Rol
+from app.utils.security import PasswordVerifier, VerifierBusy
+
+
+def _login(client, email, password):
+    return client.post("/api/auth/login", json={"email": email, "password": password})
+
+
+def test_login_rehashes_outdated_hash(client):
+    db.session.add(Usuario(email="viejo@test.io", password_hash=pbkdf2_sha256.using(rounds=500).hash("pw"), rol=Rol.ESTUDIANTE))
+    db.session.commit()
+    assert _login(client, "viejo@test.io", "mal").status_code == 401
+    assert _login(client, "viejo@test.io", "pw").status_code == 200
+    nuevo = Usuario.query.filter_by(email="viejo@test.io").one().password_hash
+    assert pbkdf2_sha256.from_string(nuevo).rounds == client.application.config["PASSWORD_HASH_ROUNDS"]
+    assert _login(client, "viejo@test.io", "pw").status_code == 200
+    assert _login(client, "viejo@test.io", None).status_code == 401
+
+
+def test_login_fails_fast_when_verifier_is_saturated(client, estudiante):
+    client.application.extensions["password_verifier"] = PasswordVerifier(workers=1, queue=0)
+    client.application.extensions["password_verifier"]._slots.acquire()
+    resp = _login(client, "estudiante@test.io", "secreto123")
+    assert resp.status_code == 503 and resp.headers["Retry-After"] == "1"
+
+
+def test_verifier_raises_busy_without_slots():
+    v = PasswordVerifier(workers=1, queue=0)
+    v._slots.acquire()
+    with pytest.raises(VerifierBusy):
+        v.verify_and_update("x", pbkdf2_sha256.hash("x"))
+
+
+def test_verifier_keeps_slot_until_timed_out_job_finishes():
+    v = PasswordVerifier(workers=1, queue=1, timeout=0.01)
+    lento = pbkdf2_sha256.using(rounds=1_000_000).hash("x")
+    with pytest.raises(VerifierBusy):
+        v.verify_and_update("x", lento)
+    assert v._slots._value == 1  # sigue corriendo en el pool: su lugar no se libera
+    with pytest.raises(VerifierBusy):
+        v.verify_and_update("x", lento)
+    assert v._slots._value == 1  # estaba en cola detrás del primero: se cancela y libera al vencer
+    v.shutdown()
+    assert v._slots._value == 2
+
+
+def test_profile_uses_identity_cache(client, estudiante, sql_log):
+    assert client.get("/api/me/profile", headers=estudiante).get_json()["email"] == "estudiante@test.io"
+    del sql_log[:]
+    client.get("/api/me/profile", headers=estudiante)
+    assert sql_log == []
@@ -0,0 +1,75 @@
+import pytest
+import flask_jwt_extended.view_decorators as jwt_views
+from tests.conftest import register_and_login
+
+
+@pytest.fixture()
+def decodes(monkeypatch):
+    """Cuenta cuántas veces se decodifica/verifica un JWT."""
+    calls = []
+    original = jwt_views.decode_token
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(jwt_views, "decode_token", counting)
+    return calls
+
+
+def test_role_check_decodes_token_once(client, docente, decodes):
+    r = client.post("/api/courses/", json={"titulo": "Unico"}, headers=docente)
+    assert r.status_code == 201
+    assert len(decodes) == 1
+
+
+def test_role_check_under_jwt_required_decodes_once(app, client, decodes):
+    from flask_jwt_extended import jwt_required
+    from app.utils.authz import require_role
+    app.add_url_rule("/api/_apilado", "apilado", jwt_required()(require_role("DOCENTE")(lambda: {"ok": True})))
+    docente = register_and_login(client, "apilado@test.io", rol="DOCENTE")
+    decodes.clear()
+    assert client.get("/api/_apilado", headers=docente).get_json() == {"ok": True}
+    assert len(decodes) == 1
+    assert client.get("/api/_apilado").status_code == 401
+
+
+def test_ownership_answered_from_cache(client, docente, sql_log):
+    cid = client.post("/api/courses/", json={"titulo": "Propio"}, headers=docente).get_json()["id"]
+    url = f"/api/courses/{cid}/lessons/reorder"
+    assert client.post(url, json=[], headers=docente).status_code == 200
+    sql_log.clear()
+    assert client.post(url, json=[], headers=docente).status_code == 200
+    assert not [s for s in sql_log if "curso.docente_id" in s]
+
+
+def test_owner_checks(client, docente):
+    cid = client.post("/api/courses/", json={"titulo": "Propio"}, headers=docente).get_json()["id"]
+    otro = register_and_login(client, "otro@test.io", rol="DOCENTE")
+    est = register_and_login(client, "est@test.io")
+    assert client.post(f"/api/courses/{cid}/hide", headers=otro).status_code == 403
+    assert client.post(f"/api/courses/{cid}/hide", headers=est).status_code == 403
+    assert client.post("/api/courses/9999/hide", headers=docente).status_code == 404
+    assert client.post(f"/api/courses/{cid}/hide", headers=docente).get_json()["estado"] == "OCULTO"
+
+
+def test_content_writes_require_course_owner(client, docente, quiz):
+    quiz_id, _ = quiz
+    cid = client.get(f"/api/quizzes/{quiz_id}").get_json()["curso_id"]
+    otro = register_and_login(client, "otro@test.io", rol="DOCENTE")
+    pregunta = {"enunciado": "¿?", "tipo": "MULTIPLE", "opciones": [{"texto": "a", "correcta": True}]}
+    ajenas = [("post", f"/api/courses/{cid}/publish", None), ("post", f"/api/courses/{cid}/lessons", {"titulo": "L"}),
+              ("get", f"/api/courses/{cid}/metrics", None), ("post", "/api/quizzes/", {"curso_id": cid, "titulo": "Q"}),
+              ("post", f"/api/quizzes/{quiz_id}/questions", pregunta)]
+    for metodo, url, body in ajenas:
+        assert getattr(client, metodo)(url, json=body, headers=otro).status_code == 403, url
+    assert client.post("/api/courses/9999/publish", headers=docente).status_code == 404
+    assert client.post("/api/quizzes/", json={"curso_id": 9999, "titulo": "Q"}, headers=docente).status_code == 404
+    assert client.post("/api/quizzes/9999/questions", json=pregunta, headers=docente).status_code == 404
+    assert client.post(f"/api/quizzes/{quiz_id}/questions", json=pregunta, headers=docente).status_code == 201
+
+
+def test_claims_do_not_leak_between_requests(client, docente):
+    assert client.post("/api/courses/", json={"titulo": "Con token"}, headers=docente).status_code == 201
+    # mismo app context en los tests: sin header debe volver a exigir el JWT
+    assert client.post("/api/courses/", json={"titulo": "Sin token"}).status_code == 401
@@ -0,0 +1,37 @@
+from app.utils.cache import VersionedLRUCache
+
+
+def test_lru_evicts_least_recently_used():
+    c = VersionedLRUCache(maxsize=2)
+    c.put(1, 0, "a")
+    c.put(2, 0, "b")
+    assert c.get(1) == "a"
+    c.put(3, 0, "c")
+    assert c.get(2) is None
+    assert c.stats() == {"size": 2, "maxsize": 2, "hits": 1, "misses": 1, "evictions": 1}
+
+
+def test_bump_discards_entries_loaded_with_old_version():
+    c = VersionedLRUCache()
+    v = c.version("q")
+    c.bump("q")
+    c.put("q", v, "viejo")
+    assert c.get("q") is None
+    assert c.get_or_load("q", lambda: "nuevo") == "nuevo"
+    assert c.get("q") == "nuevo"
+
+
+def test_add_question_invalidates_answer_key(client, docente, estudiante, quiz):
+    quiz_id, preguntas = quiz
+    intento = client.post(f"/api/quizzes/{quiz_id}/attempts", headers=estudiante).get_json()["intento_id"]
+    respuestas = {str(p): ok for p, ok, _ in preguntas}
+    client.post(f"/api/quizzes/attempts/{intento}/submit", json={"respuestas": respuestas}, headers=estudiante)
+
+    body = {"enunciado": "P nueva", "tipo": "MULTIPLE", "opciones": [{"texto": "x", "correcta": True}]}
+    client.post(f"/api/quizzes/{quiz_id}/questions", json=body, headers=docente)
+
+    intento = client.post(f"/api/quizzes/{quiz_id}/attempts", headers=estudiante).get_json()["intento_id"]
+    out = client.post(f"/api/quizzes/attempts/{intento}/submit", json={"respuestas": respuestas}, headers=estudiante)
+    assert out.get_json()["total"] == 4
+    stats = client.get("/api/_cache").get_json()["answer_keys"]
+    assert stats["misses"] == 2 and stats["evictions"] == 1
@@ -0,0 +1,51 @@
+import pytest
+from app import db
+from app.models import Curso, EstadoCurso, Usuario
+from app.utils import search
+
+
+@pytest.fixture()
+def catalogo(app):
+    doc = Usuario(email="cat@test.io", password_hash="x")
+    db.session.add(doc)
+    db.session.flush()
+    # títulos repetidos para ejercitar el desempate por id
+    for i in range(23):
+        db.session.add(Curso(titulo=f"Curso {i % 7}", descripcion="python" if i % 2 else "",
+                             estado=EstadoCurso.PUBLICADO, docente_id=doc.id))
+    db.session.add(Curso(titulo="Borrador", docente_id=doc.id))
+    db.session.commit()
+    search.rebuild()
+
+
+def _walk(client, params):
+    ids, cursor = [], ""
+    while cursor is not None:
+        data = client.get("/api/courses/", query_string={**params, "cursor": cursor, "size": 5}).get_json()
+        ids += [c["id"] for c in data["items"]]
+        cursor = data["next_cursor"]
+    return ids
+
+
+@pytest.mark.parametrize("params", [{}, {"order": "desc"}, {"sort": "id"}, {"q": "python"}])
+def test_cursor_mode_matches_offset_mode(client, catalogo, params):
+    offset = client.get("/api/courses/", query_string={**params, "size": 100}).get_json()
+    assert offset["items"]
+    assert _walk(client, params) == [c["id"] for c in offset["items"]]
+
+
+def test_cursor_mode_total_is_opt_in(client, catalogo):
+    data = client.get("/api/courses/?cursor=&size=5").get_json()
+    assert "total" not in data
+    assert client.get("/api/courses/?cursor=&total=1").get_json()["total"] == 23
+
+
+def test_cursor_rejects_tampered_or_mismatched_token(client, catalogo):
+    nxt = client.get("/api/courses/?cursor=&size=5").get_json()["next_cursor"]
+    assert client.get(f"/api/courses/?cursor={nxt}&sort=id").status_code == 400
+    assert client.get("/api/courses/?cursor=basura").status_code == 400
+
+
+def test_page_mode_still_works(client, catalogo):
+    data = client.get("/api/courses/?page=2&size=10").get_json()
+    assert data["page"] == 2 and data["total"] == 23 and len(data["items"]) == 10
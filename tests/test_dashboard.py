@@ -0,0 +1,58 @@
+import pytest
+from app import db
+from app.models import Quiz
+
+
+@pytest.fixture()
+def inscrito(client, quiz, docente, estudiante):
+    """El estudiante inscripto en el curso del quiz (3 intentos) y en un segundo curso sin quizzes."""
+    curso_id = db.session.get(Quiz, quiz[0]).curso_id
+    otro = client.post("/api/courses/", json={"titulo": "Zoologia"}, headers=docente).get_json()["id"]
+    for cid in (curso_id, otro):
+        client.post(f"/api/courses/{cid}/enroll", headers=estudiante)
+    return curso_id, otro
+
+
+def test_dashboard_aggregates_everything(client, quiz, estudiante, inscrito):
+    curso_id, otro = inscrito
+    quiz_id, preguntas = quiz
+    it = client.post(f"/api/quizzes/{quiz_id}/attempts", headers=estudiante).get_json()["intento_id"]
+    client.post(f"/api/quizzes/attempts/{it}/submit", headers=estudiante,
+                json={"respuestas": {str(p): ok for p, ok, _ in preguntas}})
+    abierto = client.post(f"/api/quizzes/{quiz_id}/attempts", headers=estudiante).get_json()["intento_id"]
+
+    body = client.get("/api/me/dashboard", headers=estudiante).get_json()
+    assert body["profile"]["email"] == "estudiante@test.io"
+    assert [e["curso_id"] for e in body["enrollments"]] == [curso_id, otro]
+    assert body["enrollments"][0]["porcentaje"] == 0.0
+    assert body["quizzes"] == [{
+        "quiz_id": quiz_id, "curso_id": curso_id, "titulo": "Parcial", "tiempo_limite_min": 30,
+        "intentos_usados": 2, "intentos_restantes": 1, "mejor_puntaje": 100.0, "intento_abierto": abierto}]
+
+
+def test_exhausted_quizzes_are_not_pending(client, quiz, estudiante, inscrito):
+    quiz_id, _ = quiz
+    for _ in range(3):
+        it = client.post(f"/api/quizzes/{quiz_id}/attempts", headers=estudiante).get_json()["intento_id"]
+        client.post(f"/api/quizzes/attempts/{it}/submit", headers=estudiante, json={"respuestas": {}})
+    assert client.get("/api/me/dashboard?fields=quizzes", headers=estudiante).get_json() == {"quizzes": []}
+
+
+def test_field_selection_skips_sections(client, estudiante, inscrito, sql_log):
+    sql_log.clear()
+    body = client.get("/api/me/dashboard?fields=enrollments.curso_titulo", headers=estudiante).get_json()
+    assert body == {"enrollments": [{"curso_titulo": "Algebra"}, {"curso_titulo": "Zoologia"}]}
+    assert not [s for s in sql_log if "FROM quiz" in s or "FROM usuario" in s]
+    assert client.get("/api/me/dashboard?fields=notas", headers=estudiante).status_code == 400
+
+
+def test_query_count_is_fixed(client, docente, estudiante, sql_log):
+    for i in range(15):
+        cid = client.post("/api/courses/", json={"titulo": f"C{i}"}, headers=docente).get_json()["id"]
+        client.post("/api/quizzes/", json={"curso_id": cid, "titulo": "Q"}, headers=docente)
+        client.post(f"/api/courses/{cid}/enroll", headers=estudiante)
+    client.get("/api/me/dashboard", headers=estudiante)  # calienta la caché de identidad
+    sql_log.clear()
+    body = client.get("/api/me/dashboard", headers=estudiante).get_json()
+    assert len(body["enrollments"]) == 15 and len(body["quizzes"]) == 15
+    assert len([s for s in sql_log if s.lstrip().upper().startswith("SELECT")]) == 2
@@ -0,0 +1,18 @@
+from app import db
+from app.models import Usuario, Curso, Leccion, Quiz, Opcion, Inscripcion, Progreso, CursoStats
+from benchmarks import datagen
+
+
+def test_generate_bulk_inserts_consistent_dataset(app, client):
+    out = datagen.generate(teachers=2, courses=3, lessons=4, quizzes=2, questions=5, options=4,
+                           students=20, enroll=2, seed=7)
+    assert Usuario.query.count() == 22 and Curso.query.count() == 6
+    assert Leccion.query.count() == 24 and Quiz.query.count() == 12
+    assert Opcion.query.count() == 12 * 5 * 4 and Opcion.query.filter_by(correcta=True).count() == 60
+    assert Inscripcion.query.count() == Progreso.query.count() == len(out["inscripciones"]) == 40
+    assert {c for _, c in out["inscripciones"]} <= set(out["publicados"])
+    assert sum(st.inscritos for st in CursoStats.query) == 40
+    # las cuentas generadas pueden loguearse con la contraseña documentada
+    r = client.post("/api/auth/login", json={"email": "synth-est0@bench.io", "password": datagen.PASSWORD})
+    assert r.status_code == 200
+    assert db.session.get(Curso, out["cursos"][0]).docente_id in out["docentes"]
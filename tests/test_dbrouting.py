@@ -0,0 +1,74 @@
+import time
+import pytest
+from app import create_app, db
+from app.utils import dbrouting
+from tests.conftest import register_and_login
+
+
+@pytest.fixture()
+def routed(tmp_path, monkeypatch):
+    """App con primario y réplica en dos archivos SQLite; la réplica se copia con sync."""
+    for key, value in {"DATABASE_URL": f"sqlite:///{tmp_path / 'primario.db'}",
+                       "DATABASE_REPLICA_URL": f"sqlite:///{tmp_path / 'replica.db'}",
+                       "DB_READ_STICKY_SECONDS": "0.3", "PASSWORD_HASH_ROUNDS": "1000",
+                       "ATTEMPT_SWEEP_INTERVAL": "0", "PROGRESS_FLUSH_INTERVAL": "0",
+                       "SUBMIT_MODE": "sync"}.items():
+        monkeypatch.setenv(key, value)
+    app = create_app()
+    with app.app_context():
+        dbrouting.sync_sqlite_replica(db)
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def _curso_publicado(client, headers):
+    cid = client.post("/api/courses/", json={"titulo": "Replicado"}, headers=headers).get_json()["id"]
+    client.post(f"/api/courses/{cid}/publish", headers=headers)
+    return cid
+
+
+def test_catalog_reads_from_replica(routed):
+    docente = register_and_login(routed.test_client(), "doc@test.io", rol="DOCENTE")
+    _curso_publicado(routed.test_client(use_cookies=False), docente)
+    anonimo = routed.test_client()
+    assert anonimo.get("/api/courses/").get_json()["total"] == 0  # réplica aún sin el curso
+    dbrouting.sync_sqlite_replica(db)
+    assert anonimo.get("/api/courses/").get_json()["total"] == 1
+    assert routed.test_client().get("/api/_cache").get_json()["db_routing"]["replica"] >= 2
+
+
+def test_read_your_writes_window(routed):
+    client = routed.test_client(use_cookies=False)  # sólo la caché por usuario, sin cookie
+    docente = register_and_login(client, "doc@test.io", rol="DOCENTE")
+    _curso_publicado(client, docente)
+    assert len(client.get("/api/courses/mine", headers=docente).get_json()["items"]) == 1  # primario
+    time.sleep(0.35)
+    assert client.get("/api/courses/mine", headers=docente).get_json()["items"] == []  # réplica atrasada
+
+
+def test_sticky_cookie_after_write(routed):
+    client = routed.test_client()
+    docente = register_and_login(client, "doc@test.io", rol="DOCENTE")
+    r = client.post("/api/courses/", json={"titulo": "Con cookie"}, headers=docente)
+    assert dbrouting.STICKY_COOKIE in r.headers.get("Set-Cookie", "")
+    routed.extensions["db_routing"].recent_writers.pop("1")
+    assert len(client.get("/api/courses/mine", headers=docente).get_json()["items"]) == 1
+
+
+def test_routing_disabled_without_replica(app):
+    assert "db_routing" not in app.extensions
+    assert dbrouting.replica_url("sqlite:///:memory:", read_pool=True) is None
+    assert dbrouting.replica_url("sqlite:////srv/lms.db", read_pool=True) == "sqlite:///file:/srv/lms.db?mode=ro&uri=true"
+
+
+def test_flush_inside_get_pins_rest_of_request_to_primary(routed):
+    from flask import g
+    from app.models import Curso, EstadoCurso
+    with routed.test_request_context("/api/courses/", method="GET"):
+        assert db.session.query(Curso).count() == 0 and g.db_route is True  # réplica
+        db.session.add(Curso(titulo="En un GET", docente_id=1, estado=EstadoCurso.BORRADOR))
+        db.session.flush()
+        assert g.db_wrote and db.session.query(Curso).count() == 1  # lee lo propio, del primario
+        db.session.rollback()
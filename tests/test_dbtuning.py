@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import text
+from app import create_app, db
+from app.utils import dbtuning
+
+
+def test_production_profile_sets_sqlite_pragmas(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'prod.db'}")
+    monkeypatch.setenv("ATTEMPT_SWEEP_INTERVAL", "0")
+    monkeypatch.setenv("DB_PROFILE", "production")
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "1234")
+    app = create_app()
+    with app.app_context():
+        pragma = {name: db.session.execute(text(f"PRAGMA {name}")).scalar()
+                  for name in ("journal_mode", "synchronous", "busy_timeout", "cache_size")}
+        db.session.remove()
+        db.engine.dispose()
+    assert pragma == {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 1234, "cache_size": -65536}
+
+
+def test_server_urls_get_sized_pool(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "5")
+    settings = dbtuning.load_settings("production")
+    assert dbtuning.engine_options("postgresql://u@h/db", settings) == {
+        "pool_size": 5, "max_overflow": 20, "pool_recycle": 1800, "pool_pre_ping": True}
+    assert dbtuning.engine_options("sqlite:///x.db", settings) == {}
+    assert dbtuning.sqlite_pragmas(dbtuning.load_settings("default")) == []
+
+
+def test_invalid_settings_fail_loudly(monkeypatch):
+    with pytest.raises(ValueError):
+        dbtuning.load_settings("turbo")
+    monkeypatch.setenv("SQLITE_SYNCHRONOUS", "normal; DROP TABLE usuario")
+    with pytest.raises(ValueError):
+        dbtuning.load_settings("default")
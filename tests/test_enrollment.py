@@ -0,0 +1,62 @@
+from tests.conftest import register_and_login
+from app.models import Inscripcion, Progreso
+
+
+def _curso(client, docente):
+    return client.post("/api/courses/", json={"titulo": "Cohorte"}, headers=docente).get_json()["id"]
+
+
+def test_single_enroll_is_atomic_and_rejects_duplicates(client, docente, estudiante):
+    cid = _curso(client, docente)
+    assert client.post(f"/api/courses/{cid}/enroll", headers=estudiante).status_code == 200
+    assert client.post(f"/api/courses/{cid}/enroll", headers=estudiante).status_code == 409
+    assert Inscripcion.query.filter_by(curso_id=cid).count() == 1
+    assert Progreso.query.filter_by(curso_id=cid).count() == 1
+    assert client.post("/api/courses/999/enroll", headers=estudiante).status_code == 404
+
+
+def test_bulk_enroll_reports_per_row_results(client, docente, estudiante, sql_log):
+    cid = _curso(client, docente)
+    client.post(f"/api/courses/{cid}/enroll", headers=estudiante)
+    ids = [client.post("/api/auth/register", json={"email": f"s{i}@t.io", "password": "x"}).get_json()["id"]
+           for i in range(40)]
+    ya = Inscripcion.query.first().estudiante_id
+    del sql_log[:]
+    resp = client.post(f"/api/courses/{cid}/enroll/bulk", json={"estudiante_ids": ids + [ya, 1, ids[0]]}, headers=docente)
+    body = resp.get_json()
+    estados = {r["estudiante_id"]: r["estado"] for r in body["resultados"]}
+    assert body["inscritos"] == 40
+    assert estados[ya] == "ya_inscrito" and estados[1] == "estudiante_invalido"
+    assert Inscripcion.query.filter_by(curso_id=cid).count() == 41
+    assert Progreso.query.filter_by(curso_id=cid).count() == 41
+    inserts = [s for s in sql_log if s.startswith(("INSERT INTO inscripcion", "INSERT INTO progreso"))]
+    assert len(inserts) == 2
+
+
+def test_bulk_enroll_requires_course_owner(client, docente):
+    cid = _curso(client, docente)
+    otro = register_and_login(client, "otro@test.io", rol="DOCENTE")
+    assert client.post(f"/api/courses/{cid}/enroll/bulk", json={"estudiante_ids": [1]}, headers=otro).status_code == 403
+    assert client.post(f"/api/courses/{cid}/enroll/bulk", json={"estudiante_ids": []}, headers=docente).status_code == 422
+
+
+def test_bulk_enroll_counts_only_rows_it_inserted(client, docente, estudiante):
+    from sqlalchemy import event
+    from app import db
+    from app.models import CursoStats
+    cid = _curso(client, docente)
+    est_id = client.get("/api/me/profile", headers=estudiante).get_json()["id"]
+
+    def gana_otro(conn, cursor, statement, parameters, context, executemany):
+        # otra inscripción entra entre la lectura de previos y el INSERT del lote
+        if statement.startswith("INSERT INTO inscripcion"):
+            cursor.execute("INSERT OR IGNORE INTO inscripcion (estudiante_id, curso_id) VALUES (?, ?)", (est_id, cid))
+
+    event.listen(db.engine, "before_cursor_execute", gana_otro)
+    try:
+        r = client.post(f"/api/courses/{cid}/enroll/bulk", json={"estudiante_ids": [est_id]}, headers=docente)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", gana_otro)
+    body = r.get_json()
+    assert body == {"inscritos": 0, "resultados": [{"estudiante_id": est_id, "estado": "ya_inscrito"}]}
+    assert db.session.get(CursoStats, cid).inscritos == 0
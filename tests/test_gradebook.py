@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+from app import db
+from app.models import Quiz
+from tests.conftest import register_and_login
+
+
+def _attempt(client, quiz, headers, correctas):
+    quiz_id, preguntas = quiz
+    it = client.post(f"/api/quizzes/{quiz_id}/attempts", headers=headers).get_json()
+    resp = {str(p): (ok if i < correctas else mal) for i, (p, ok, mal) in enumerate(preguntas)}
+    client.post(f"/api/quizzes/attempts/{it['intento_id']}/submit", json={"respuestas": resp}, headers=headers)
+
+
+def _setup(client, quiz, n_alumnos=4):
+    curso_id = db.session.get(Quiz, quiz[0]).curso_id
+    alumnos = []
+    for i in range(n_alumnos):
+        h = register_and_login(client, f"a{i}@test.io")
+        client.post(f"/api/courses/{curso_id}/enroll", headers=h)
+        alumnos.append(h)
+    return curso_id, alumnos
+
+
+def test_csv_has_best_and_last_per_quiz(client, quiz, docente):
+    curso_id, alumnos = _setup(client, quiz)
+    _attempt(client, quiz, alumnos[0], correctas=3)
+    _attempt(client, quiz, alumnos[0], correctas=1)
+    _attempt(client, quiz, alumnos[1], correctas=2)
+
+    r = client.get(f"/api/courses/{curso_id}/gradebook.csv", headers=docente)
+    assert r.status_code == 200 and r.mimetype == "text/csv"
+    assert r.is_streamed
+    rows = list(csv.reader(io.StringIO(r.get_data(as_text=True))))
+    assert rows[0] == ["estudiante_id", "email", "Parcial (mejor)", "Parcial (ultimo)", "Parcial (intentos)"]
+    por_email = {row[1]: row[2:] for row in rows[1:]}
+    assert por_email["a0@test.io"] == ["100", "33", "2"]
+    assert por_email["a1@test.io"] == ["67", "67", "1"]
+    assert por_email["a3@test.io"] == ["", "", "0"]
+    assert len(rows) == 1 + 4
+
+
+def test_ndjson_and_non_enrolled_attempts_are_ignored(client, quiz, docente, estudiante):
+    curso_id, alumnos = _setup(client, quiz, n_alumnos=2)
+    _attempt(client, quiz, estudiante, correctas=3)  # no inscripto
+    _attempt(client, quiz, alumnos[1], correctas=3)
+    lines = client.get(f"/api/courses/{curso_id}/gradebook.ndjson", headers=docente).get_data(as_text=True).splitlines()
+    assert json.loads(lines[0]) == {"quizzes": [{"id": quiz[0], "titulo": "Parcial"}]}
+    items = [json.loads(x) for x in lines[1:]]
+    assert [i["email"] for i in items] == ["a0@test.io", "a1@test.io"]
+    assert items[0]["notas"] == {}
+    assert items[1]["notas"] == {str(quiz[0]): {"mejor": 100.0, "ultimo": 100.0, "intentos": 1}}
+
+
+def test_query_count_does_not_grow_with_students(client, quiz, docente, sql_log):
+    curso_id, _ = _setup(client, quiz, n_alumnos=30)
+    sql_log.clear()
+    client.get(f"/api/courses/{curso_id}/gradebook.csv", headers=docente).get_data()
+    selects = [s for s in sql_log if s.lstrip().upper().startswith("SELECT")]
+    assert len(selects) <= 4  # JWT/curso, dueño, quizzes y la consulta agregada
+
+
+def test_only_owner_and_known_formats(client, quiz, docente):
+    curso_id, _ = _setup(client, quiz, n_alumnos=1)
+    otro = register_and_login(client, "otro@test.io", rol="DOCENTE")
+    assert client.get(f"/api/courses/{curso_id}/gradebook.csv", headers=otro).status_code == 403
+    assert client.get(f"/api/courses/{curso_id}/gradebook.xlsx", headers=docente).status_code == 404
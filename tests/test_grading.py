@@ -0,0 +1,48 @@
+from app.models import RespuestaIntento
+
+
+def test_submit_grades_and_persists_detail(client, estudiante, quiz):
+    quiz_id, preguntas = quiz
+    intento_id = client.post(f"/api/quizzes/{quiz_id}/attempts", headers=estudiante).get_json()["intento_id"]
+    (p1, ok1, _), (p2, _, mal2), (p3, _, _) = preguntas
+    resp = client.post(f"/api/quizzes/attempts/{intento_id}/submit",
+                       json={"respuestas": {str(p1): ok1, str(p2): mal2, str(p3): 99999}}, headers=estudiante)
+    assert resp.get_json() == {"correctas": 1, "total": 3, "puntaje": 33}
+
+    detalle = {r.pregunta_id: r for r in RespuestaIntento.query.filter_by(intento_id=intento_id)}
+    assert detalle[p1].correcta and detalle[p1].opcion_id == ok1
+    assert not detalle[p2].correcta and detalle[p2].opcion_id == mal2
+    assert detalle[p3].opcion_id is None
+
+
+def test_submit_loads_answer_key_in_one_query(client, estudiante, quiz, sql_log):
+    quiz_id, preguntas = quiz
+    intento_id = client.post(f"/api/quizzes/{quiz_id}/attempts", headers=estudiante).get_json()["intento_id"]
+    del sql_log[:]
+    respuestas = {str(p): ok for p, ok, _ in preguntas}
+    client.post(f"/api/quizzes/attempts/{intento_id}/submit", json={"respuestas": respuestas}, headers=estudiante)
+    key_queries = [s for s in sql_log if "FROM pregunta" in s]
+    assert len(key_queries) == 1
+
+
+def test_process_caches_follow_versions_bumped_by_another_worker(app, client, quiz):
+    from app import db
+    from app.models import Leccion, Opcion, Quiz
+    from app.utils import grading, httpcache, progress
+    quiz_id, preguntas = quiz
+    p1, ok1, mal1 = preguntas[0]
+    with app.test_request_context():
+        assert grading.get_answer_key(quiz_id)[p1][ok1] is True
+        # otro worker corrige la opción: escribe en la BD y sube la versión, sin tocar esta caché
+        db.session.get(Opcion, ok1).correcta, db.session.get(Opcion, mal1).correcta = False, True
+        httpcache.bump(httpcache.quiz_key(quiz_id))
+        db.session.commit()
+        assert grading.get_answer_key(quiz_id)[p1] == {ok1: False, mal1: True}
+        curso_id = db.session.get(Quiz, quiz_id).curso_id
+        assert progress.lesson_positions(curso_id) == ({}, 0)
+        leccion = Leccion(curso_id=curso_id, titulo="L1", orden=1)
+        db.session.add(leccion)
+        httpcache.bump(httpcache.curso_key(curso_id))
+        db.session.commit()
+        assert progress.lesson_positions(curso_id) == ({leccion.id: 1}, 1)
+    assert "lesson_positions" in client.get("/api/_cache").get_json()
@@ -0,0 +1,61 @@
+import pytest
+from app import create_app, db
+from tests.conftest import register_and_login
+
+
+def _curso(client, docente):
+    cid = client.post("/api/courses/", json={"titulo": "Cacheable"}, headers=docente).get_json()["id"]
+    client.post(f"/api/courses/{cid}/publish", headers=docente)
+    return cid
+
+
+def test_etag_304_and_invalidation_on_edit(client, docente):
+    cid = _curso(client, docente)
+    first = client.get(f"/api/courses/{cid}")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.headers["Cache-Control"] == "public, no-cache"
+    assert first.headers["Last-Modified"]
+
+    again = client.get(f"/api/courses/{cid}", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.data == b""
+
+    client.post(f"/api/courses/{cid}/lessons", json={"titulo": "Nueva"}, headers=docente)
+    changed = client.get(f"/api/courses/{cid}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert [le["titulo"] for le in changed.get_json()["lecciones"]] == ["Nueva"]
+
+
+def test_catalog_and_quiz_are_conditional(client, docente, quiz):
+    quiz_id, _ = quiz
+    catalogo = client.get("/api/courses/")
+    assert catalogo.headers["Cache-Control"] == "public, max-age=30"
+    assert client.get("/api/courses/", headers={"If-None-Match": catalogo.headers["ETag"]}).status_code == 304
+
+    q = client.get(f"/api/quizzes/{quiz_id}")
+    assert client.get(f"/api/quizzes/{quiz_id}", headers={"If-None-Match": q.headers["ETag"]}).status_code == 304
+    body = {"enunciado": "otra", "tipo": "MULTIPLE", "opciones": [{"texto": "a", "correcta": True}]}
+    client.post(f"/api/quizzes/{quiz_id}/questions", json=body, headers=docente)
+    assert client.get(f"/api/quizzes/{quiz_id}", headers={"If-None-Match": q.headers["ETag"]}).status_code == 200
+    assert client.get("/api/quizzes/999").status_code == 404
+
+
+@pytest.fixture()
+def cached_app(monkeypatch):
+    monkeypatch.setenv("RESPONSE_CACHE_SIZE", "16")
+    app = create_app(testing=True)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_response_cache_serves_bytes_until_write(cached_app):
+    client = cached_app.test_client()
+    docente = register_and_login(client, "doc@cache.io", rol="DOCENTE")
+    cid = _curso(client, docente)
+    client.get(f"/api/courses/{cid}/lessons")
+    client.get(f"/api/courses/{cid}/lessons")
+    assert cached_app.extensions["response_cache"].stats()["hits"] == 1
+
+    client.post(f"/api/courses/{cid}/lessons", json={"titulo": "L"}, headers=docente)
+    assert client.get(f"/api/courses/{cid}/lessons").get_json()["items"][0]["titulo"] == "L"
@@ -0,0 +1,29 @@
+import logging
+from app import db
+from app.models import Curso
+
+
+def test_metrics_endpoint_reports_latency_and_sql_per_endpoint(client, docente):
+    client.post("/api/courses/", json={"titulo": "Medido"}, headers=docente)
+    client.get("/api/courses/1/lessons")
+    body = client.get("/api/_metrics").get_data(as_text=True)
+    assert 'lms_request_duration_seconds_count{endpoint="courses.list_lessons"} 1' in body
+    assert 'lms_request_duration_seconds_bucket{endpoint="courses.create_course",le="+Inf"} 1' in body
+    sql = [line for line in body.splitlines() if line.startswith('lms_sql_statements_total{endpoint="courses.list_lessons"}')]
+    assert sql and int(sql[0].split()[-1]) >= 1
+    assert "lms_answer_key_cache_hits" in body
+
+
+def test_n_plus_one_is_logged_over_threshold(app, client, caplog):
+    app.extensions["request_metrics"].n_plus_one_threshold = 3
+
+    @app.get("/_test/n1")
+    def n1():
+        for i in range(5):
+            db.session.get(Curso, i + 100)
+        return {"ok": True}
+
+    with caplog.at_level(logging.WARNING):
+        client.get("/_test/n1")
+    assert any("posible N+1 en n1: 5 x" in r.getMessage() for r in caplog.records)
+    assert 'lms_n_plus_one_total{endpoint="n1"} 1' in client.get("/api/_metrics").get_data(as_text=True)
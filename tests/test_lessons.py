@@ -0,0 +1,87 @@
+import json
+import pytest
+from app import db
+from app.models import Leccion, CursoStats
+
+
+@pytest.fixture()
+def curso_id(client, docente):
+    return client.post("/api/courses/", json={"titulo": "Importado"}, headers=docente).get_json()["id"]
+
+
+def _ordenes(curso_id):
+    return [(le.titulo, le.orden) for le in Leccion.query.filter_by(curso_id=curso_id).order_by(Leccion.orden)]
+
+
+def test_bulk_import_array_in_one_insert(client, docente, curso_id, sql_log):
+    body = [{"titulo": f"L{i}"} for i in range(200)]
+    sql_log.clear()
+    r = client.post(f"/api/courses/{curso_id}/lessons/bulk", json=body, headers=docente)
+    assert r.status_code == 201
+    data = r.get_json()
+    assert data["creadas"] == 200 and [i["orden"] for i in data["items"]] == list(range(1, 201))
+    assert len([s for s in sql_log if s.startswith("INSERT INTO leccion")]) == 1
+    assert db.session.get(CursoStats, curso_id).lecciones == 200
+    assert Leccion.query.get(data["items"][5]["id"]).titulo == "L5"
+
+
+def test_bulk_import_ndjson_appends_after_existing(client, docente, curso_id):
+    client.post(f"/api/courses/{curso_id}/lessons", json={"titulo": "Intro", "orden": 10}, headers=docente)
+    ndjson = "\n".join(json.dumps(x) for x in [{"titulo": "A", "orden": 3}, {"titulo": "B"}, {"titulo": "C"}])
+    r = client.post(f"/api/courses/{curso_id}/lessons/bulk", data=ndjson + "\n",
+                    content_type="application/x-ndjson", headers=docente)
+    assert r.status_code == 201
+    assert _ordenes(curso_id) == [("A", 3), ("Intro", 10), ("B", 11), ("C", 12)]
+
+
+@pytest.mark.parametrize("body", [
+    [{"titulo": "A", "orden": 1}, {"titulo": "B", "orden": 1}],
+    [{"titulo": "A", "orden": 5}],  # choca con la existente
+    [{"titulo": ""}],
+])
+def test_bulk_import_rejects_whole_batch(client, docente, curso_id, body):
+    client.post(f"/api/courses/{curso_id}/lessons", json={"titulo": "Existente", "orden": 5}, headers=docente)
+    r = client.post(f"/api/courses/{curso_id}/lessons/bulk", json=body, headers=docente)
+    assert r.status_code == 422 and "fila" in r.get_json()
+    assert _ordenes(curso_id) == [("Existente", 5)]
+
+
+def test_reorder_single_update_and_no_reread(client, docente, curso_id, sql_log):
+    items = client.post(f"/api/courses/{curso_id}/lessons/bulk", json=[{"titulo": t} for t in "ABCD"],
+                        headers=docente).get_json()["items"]
+    ids = [i["id"] for i in items]
+    sql_log.clear()
+    r = client.post(f"/api/courses/{curso_id}/lessons/reorder", headers=docente,
+                    json=[{"id": ids[0], "orden": 4}, {"id": ids[3], "orden": 1}])
+    assert r.status_code == 200
+    assert [i["titulo"] for i in r.get_json()["items"]] == ["D", "B", "C", "A"]
+    assert len([s for s in sql_log if s.startswith("UPDATE leccion")]) == 1
+    assert len([s for s in sql_log if "FROM leccion" in s]) == 1
+    assert _ordenes(curso_id) == [("D", 1), ("B", 2), ("C", 3), ("A", 4)]
+
+
+def test_reorder_validates_uniqueness_and_ownership(client, docente, curso_id):
+    ids = [i["id"] for i in client.post(f"/api/courses/{curso_id}/lessons/bulk", json=[{"titulo": t} for t in "AB"],
+                                        headers=docente).get_json()["items"]]
+    url = f"/api/courses/{curso_id}/lessons/reorder"
+    assert client.post(url, headers=docente, json=[{"id": ids[0], "orden": 2}]).status_code == 422
+    assert client.post(url, headers=docente, json=[{"id": 9999, "orden": 7}]).status_code == 422
+    assert _ordenes(curso_id) == [("A", 1), ("B", 2)]
+
+
+def test_bulk_import_ids_ignore_concurrent_same_orden(client, docente, curso_id):
+    from sqlalchemy import event
+
+    def gana_otro(conn, cursor, statement, parameters, context, executemany):
+        # otra importación inserta el mismo `orden` entre el INSERT del lote y el commit
+        if statement.startswith("INSERT INTO leccion"):
+            conn.connection.cursor().execute("INSERT INTO leccion (curso_id, titulo, orden) VALUES (?, 'ajena', 1)",
+                                             (curso_id,))
+
+    event.listen(db.engine, "after_cursor_execute", gana_otro)
+    try:
+        r = client.post(f"/api/courses/{curso_id}/lessons/bulk", json=[{"titulo": "propia"}], headers=docente)
+    finally:
+        event.remove(db.engine, "after_cursor_execute", gana_otro)
+    (item,) = r.get_json()["items"]
+    assert db.session.get(Leccion, item["id"]).titulo == "propia"
@@ -0,0 +1,67 @@
+import sqlite3
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+from app import create_app, db
+from app import migrations
+
+# Esquema tal como lo dejaba create_all() antes de los índices (sólo PK y email único)
+LEGACY_DDL = """
+CREATE TABLE usuario (id INTEGER PRIMARY KEY, email VARCHAR(120) NOT NULL UNIQUE, password_hash VARCHAR(255) NOT NULL,
+                      rol VARCHAR(10) NOT NULL);
+CREATE TABLE curso (id INTEGER PRIMARY KEY, titulo VARCHAR(120) NOT NULL, descripcion TEXT, estado VARCHAR(9) NOT NULL,
+                    docente_id INTEGER NOT NULL REFERENCES usuario(id));
+CREATE TABLE leccion (id INTEGER PRIMARY KEY, curso_id INTEGER NOT NULL, titulo VARCHAR(120) NOT NULL, contenido TEXT,
+                      video_url VARCHAR(255), orden INTEGER);
+CREATE TABLE inscripcion (id INTEGER PRIMARY KEY, estudiante_id INTEGER NOT NULL, curso_id INTEGER NOT NULL, fecha DATETIME);
+CREATE TABLE progreso (id INTEGER PRIMARY KEY, estudiante_id INTEGER NOT NULL, curso_id INTEGER NOT NULL,
+                       ultima_leccion_id INTEGER, porcentaje FLOAT);
+CREATE TABLE quiz (id INTEGER PRIMARY KEY, curso_id INTEGER NOT NULL, titulo VARCHAR(120) NOT NULL,
+                   tiempo_limite_min INTEGER, intentos_max INTEGER);
+CREATE TABLE pregunta (id INTEGER PRIMARY KEY, quiz_id INTEGER NOT NULL, enunciado TEXT NOT NULL, tipo VARCHAR(10));
+CREATE TABLE opcion (id INTEGER PRIMARY KEY, pregunta_id INTEGER NOT NULL, texto VARCHAR(255) NOT NULL, correcta BOOLEAN);
+CREATE TABLE intento_quiz (id INTEGER PRIMARY KEY, quiz_id INTEGER NOT NULL, estudiante_id INTEGER NOT NULL,
+                           fecha DATETIME, puntaje FLOAT, entregado BOOLEAN);
+INSERT INTO usuario VALUES (1, 'e@x.io', 'x', 'ESTUDIANTE');
+INSERT INTO curso VALUES (1, 'C', '', 'PUBLICADO', 1);
+INSERT INTO inscripcion VALUES (1, 1, 1, NULL), (2, 1, 1, NULL);
+INSERT INTO progreso VALUES (1, 1, 1, NULL, 0.0), (2, 1, 1, NULL, 0.0);
+INSERT INTO intento_quiz VALUES (1, 7, 1, NULL, NULL, 0), (2, 8, 1, NULL, NULL, 0), (3, 7, 1, NULL, NULL, 0);
+"""
+
+
+def test_upgrade_adds_indexes_to_legacy_database(tmp_path, monkeypatch):
+    path = tmp_path / "legacy.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript(LEGACY_DDL)
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{path}")
+    monkeypatch.setenv("ATTEMPT_SWEEP_INTERVAL", "0")
+    app = create_app()
+    with app.app_context():
+        insp = inspect(db.engine)
+        indexes = {ix["name"] for t in insp.get_table_names() for ix in insp.get_indexes(t)}
+        assert {"ix_leccion_curso_orden", "ix_pregunta_quiz", "ix_opcion_pregunta", "ix_intento_quiz_estudiante",
+                "ix_curso_docente", "uq_inscripcion_estudiante_curso"} <= indexes
+        assert migrations.current_version() == migrations.HEAD
+        assert db.session.execute(db.text("SELECT count(*) FROM inscripcion")).scalar() == 1
+        assert db.session.execute(db.text("SELECT numero FROM intento_quiz ORDER BY id")).scalars().all() == [1, 1, 2]
+        assert migrations.upgrade() == []  # idempotente
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_fresh_database_is_stamped_at_head(app):
+    assert migrations.current_version() == migrations.HEAD
+
+
+def test_failing_migration_is_not_reported_as_applied(app, monkeypatch):
+    def duplicada(conn):
+        conn.execute(db.text("INSERT INTO usuario (email, password_hash, rol) VALUES ('d@x.io', 'x', 'ESTUDIANTE')"))
+        conn.execute(db.text("INSERT INTO usuario (email, password_hash, rol) VALUES ('d@x.io', 'x', 'ESTUDIANTE')"))
+
+    version = migrations.HEAD + 1
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [(version, "falla", duplicada)])
+    with pytest.raises(IntegrityError):
+        migrations.upgrade()
+    assert migrations.current_version() == migrations.HEAD
+    assert db.session.execute(db.text("SELECT count(*) FROM usuario")).scalar() == 0  # se revirtió
@@ -0,0 +1,78 @@
+import pytest
+from app import db
+from app.models import Progreso, CursoStats
+from tests.conftest import register_and_login
+
+
+@pytest.fixture()
+def curso(client, docente, estudiante):
+    """Curso con 4 lecciones (orden 1..4) y el estudiante inscripto; devuelve (curso_id, [leccion_ids])."""
+    curso_id = client.post("/api/courses/", json={"titulo": "Video"}, headers=docente).get_json()["id"]
+    lecciones = [client.post(f"/api/courses/{curso_id}/lessons", json={"titulo": f"L{i}", "orden": i},
+                             headers=docente).get_json()["id"] for i in (1, 2, 3, 4)]
+    client.post(f"/api/courses/{curso_id}/enroll", headers=estudiante)
+    return curso_id, lecciones
+
+
+def _beat(client, headers, curso_id, leccion_id):
+    return client.post("/api/me/progress", json={"curso_id": curso_id, "leccion_id": leccion_id}, headers=headers)
+
+
+def test_heartbeats_coalesce_into_one_write(app, client, estudiante, curso, sql_log):
+    curso_id, lecciones = curso
+    for leccion_id in lecciones[:3]:
+        r = _beat(client, estudiante, curso_id, leccion_id)
+        assert r.status_code == 202
+    assert r.get_json() == {"curso_id": curso_id, "ultima_leccion_id": lecciones[2], "porcentaje": 75.0}
+    assert not [s for s in sql_log if s.startswith("UPDATE progreso")]
+
+    buffer = app.extensions["progress_buffer"]
+    assert buffer.stats()["coalesced"] == 2
+    assert buffer.flush() == 1
+    p = Progreso.query.one()
+    db.session.refresh(p)
+    assert (p.ultima_leccion_id, p.porcentaje) == (lecciones[2], 75.0)
+
+
+def test_read_merges_unflushed_state_and_percentage_never_drops(app, client, estudiante, curso):
+    curso_id, lecciones = curso
+    _beat(client, estudiante, curso_id, lecciones[3])
+    app.extensions["progress_buffer"].flush()
+    _beat(client, estudiante, curso_id, lecciones[0])  # vuelve a ver la primera lección
+    items = client.get("/api/me/progress", headers=estudiante).get_json()["items"]
+    assert items == [{"curso_id": curso_id, "ultima_leccion_id": lecciones[0], "porcentaje": 100.0}]
+    app.extensions["progress_buffer"].flush()
+    p = Progreso.query.one()
+    db.session.refresh(p)
+    assert (p.ultima_leccion_id, p.porcentaje) == (lecciones[0], 100.0)
+
+
+def test_completion_bumps_stats_once(app, client, estudiante, curso):
+    curso_id, lecciones = curso
+    buffer = app.extensions["progress_buffer"]
+    for _ in range(2):
+        _beat(client, estudiante, curso_id, lecciones[3])
+        buffer.flush()
+    assert db.session.get(CursoStats, curso_id).completados == 1
+
+
+def test_size_threshold_flushes_inline(app, client, estudiante, curso):
+    curso_id, lecciones = curso
+    app.extensions["progress_buffer"].max_entries = 1
+    _beat(client, estudiante, curso_id, lecciones[1])
+    assert app.extensions["progress_buffer"].stats()["pending"] == 0
+    assert Progreso.query.one().porcentaje == 50.0
+
+
+def test_reorder_updates_positions(client, docente, estudiante, curso):
+    curso_id, lecciones = curso
+    client.post(f"/api/courses/{curso_id}/lessons/reorder", headers=docente,
+                json=[{"id": lecciones[0], "orden": 9}])
+    assert _beat(client, estudiante, curso_id, lecciones[0]).get_json()["porcentaje"] == 100.0
+
+
+def test_rejects_foreign_lesson_and_non_enrolled(client, estudiante, curso):
+    curso_id, lecciones = curso
+    assert _beat(client, estudiante, curso_id, 9999).status_code == 422
+    otro = register_and_login(client, "otro@test.io")
+    assert _beat(client, otro, curso_id, lecciones[0]).status_code == 403
@@ -0,0 +1,44 @@
+"""Regresión de planes: ninguna consulta caliente puede caer en un full scan (SQLite)."""
+import pytest
+from sqlalchemy import func, tuple_
+from app import db
+from app.models import (Curso, EstadoCurso, Leccion, Inscripcion, Quiz, Pregunta, Opcion, IntentoQuiz,
+                        RespuestaIntento)
+
+
+def _plan(query):
+    sql = str(query.statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in db.session.execute(db.text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+HOT_QUERIES = {
+    "lecciones de un curso": lambda: Leccion.query.filter_by(curso_id=1).order_by(Leccion.orden),
+    "inscripciones del estudiante": lambda: (db.session.query(Inscripcion, Curso)
+                                             .join(Curso, Curso.id == Inscripcion.curso_id)
+                                             .filter(Inscripcion.estudiante_id == 1)),
+    "inscritos del curso": lambda: db.session.query(func.count()).select_from(Inscripcion).filter(Inscripcion.curso_id == 1),
+    "preguntas del quiz": lambda: Pregunta.query.filter_by(quiz_id=1),
+    "clave de respuestas": lambda: (db.session.query(Pregunta.id, Opcion.id, Opcion.correcta)
+                                    .outerjoin(Opcion, Opcion.pregunta_id == Pregunta.id)
+                                    .filter(Pregunta.quiz_id == 1)),
+    "opciones de la pregunta": lambda: Opcion.query.filter_by(pregunta_id=1),
+    "intentos del estudiante": lambda: IntentoQuiz.query.filter_by(quiz_id=1, estudiante_id=1),
+    "cursos del docente": lambda: Curso.query.filter_by(docente_id=1).order_by(Curso.id.desc()),
+    "quizzes del curso": lambda: Quiz.query.filter_by(curso_id=1),
+    "respuestas del intento": lambda: RespuestaIntento.query.filter_by(intento_id=1),
+    "catálogo keyset": lambda: (Curso.query.filter(Curso.estado == EstadoCurso.PUBLICADO)
+                                .filter(tuple_(Curso.titulo, Curso.id) > ("m", 10))
+                                .order_by(Curso.titulo, Curso.id).limit(10)),
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(app, name):
+    plan = _plan(HOT_QUERIES[name]())
+    scans = [step for step in plan if step.startswith("SCAN") and "USING" not in step]
+    assert not scans, f"{name}: {plan}"
+
+
+def test_lessons_and_catalog_need_no_sort_step(app):
+    for name in ("lecciones de un curso", "catálogo keyset"):
+        assert not any("TEMP B-TREE" in step for step in _plan(HOT_QUERIES[name]())), name
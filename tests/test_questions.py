@@ -0,0 +1,40 @@
+from sqlalchemy import insert
+from app import db
+from app.models import Pregunta, Opcion
+from tests.conftest import register_and_login
+
+
+def _bulk_questions(quiz_id, n):
+    db.session.execute(insert(Pregunta), [{"quiz_id": quiz_id, "enunciado": f"Q{i}"} for i in range(n)])
+    pids = [pid for (pid,) in db.session.query(Pregunta.id).filter_by(quiz_id=quiz_id)]
+    db.session.execute(insert(Opcion), [{"pregunta_id": pid, "texto": t, "correcta": t == "a"}
+                                        for pid in pids for t in "abcd"])
+    db.session.commit()
+
+
+def test_student_view_hides_correct_flag(client, estudiante, docente, quiz):
+    quiz_id, _ = quiz
+    docente_view = client.get(f"/api/quizzes/{quiz_id}/questions", headers=docente).get_json()
+    estudiante_view = client.get(f"/api/quizzes/{quiz_id}/questions", headers=estudiante).get_json()
+    assert all("correcta" in o for p in docente_view for o in p["opciones"])
+    assert all("correcta" not in o for p in estudiante_view for o in p["opciones"])
+    assert [p["id"] for p in docente_view] == [p["id"] for p in estudiante_view]
+
+
+def test_other_teacher_gets_student_view(client, quiz):
+    quiz_id, _ = quiz
+    otro = register_and_login(client, "otro@test.io", rol="DOCENTE")
+    items = client.get(f"/api/quizzes/{quiz_id}/questions", headers=otro).get_json()
+    assert items and all("correcta" not in o for p in items for o in p["opciones"])
+
+
+def test_list_questions_issues_one_statement_for_hundreds_of_questions(client, estudiante, quiz, sql_log):
+    quiz_id, _ = quiz
+    _bulk_questions(quiz_id, 600)
+    del sql_log[:]
+    items = client.get(f"/api/quizzes/{quiz_id}/questions", headers=estudiante).get_json()
+    assert len(items) == 603
+    assert sum(len(p["opciones"]) for p in items) == 3 * 2 + 603 * 4  # el helper añade 4 opciones también a las 3 del fixture
+    # una sentencia para las preguntas + la lectura por PK de la versión del quiz
+    assert len([s for s in sql_log if "FROM pregunta" in s]) == 1
+    assert len(sql_log) == 2 and "FROM contenido_version" in sql_log[0]
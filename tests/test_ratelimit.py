@@ -0,0 +1,100 @@
+import json
+import pytest
+from app import create_app, db
+from app.utils import ratelimit
+from tests.conftest import register_and_login
+
+REGLAS = {
+    "auth.login": {"rate": "2/minute", "key": "ip"},
+    "courses.list_public_courses": {"rate": "1/minute", "key": "ip", "arg": "q"},
+    "quizzes.submit_attempt": {"rate": "1/minute", "key": "user"},
+    "me": {"concurrency": 1},
+}
+
+
+@pytest.fixture()
+def limited(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "1")
+    monkeypatch.setenv("RATE_LIMITS", json.dumps(REGLAS))
+    app = create_app(testing=True)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_login_rate_limited_by_ip(limited):
+    client = limited.test_client()
+    client.post("/api/auth/register", json={"email": "a@test.io", "password": "secreto123"})
+    cred = {"email": "a@test.io", "password": "secreto123"}
+    assert [client.post("/api/auth/login", json=cred).status_code for _ in range(2)] == [200, 200]
+    r = client.post("/api/auth/login", json=cred)
+    assert r.status_code == 429 and 1 <= int(r.headers["Retry-After"]) <= 30
+    assert r.get_json()["retry_after"] == int(r.headers["Retry-After"])
+    metrics = client.get("/api/_metrics").get_data(as_text=True)
+    assert 'lms_rate_limited_total{rule="auth.login",limit="rate"} 1' in metrics
+    otra_ip = {"X-Forwarded-For": "203.0.113.9"}  # sin TRUSTED_PROXIES el header no cambia la clave
+    assert client.post("/api/auth/login", json=cred, headers=otra_ip).status_code == 429
+
+
+@pytest.fixture()
+def behind_proxy(monkeypatch, request):
+    monkeypatch.setenv("TRUSTED_PROXIES", "1")
+    return request.getfixturevalue("limited")
+
+
+def test_ip_key_uses_forwarded_for_behind_trusted_proxy(behind_proxy):
+    client = behind_proxy.test_client()
+    cred = {"email": "nadie@test.io", "password": "x"}
+    uno, dos = {"X-Forwarded-For": "203.0.113.1"}, {"X-Forwarded-For": "198.51.100.7, 203.0.113.2"}
+    assert [client.post("/api/auth/login", json=cred, headers=uno).status_code for _ in range(3)] == [401, 401, 429]
+    assert client.post("/api/auth/login", json=cred, headers=dos).status_code == 401  # último salto: otro cliente
+
+
+def test_search_rule_only_with_query_arg(limited):
+    client = limited.test_client()
+    assert [client.get("/api/courses/").status_code for _ in range(3)] == [200, 200, 200]
+    assert client.get("/api/courses/?q=algebra").status_code == 200
+    assert client.get("/api/courses/?q=algebra").status_code == 429
+
+
+def test_submit_keyed_by_jwt_identity(limited):
+    client = limited.test_client()
+    uno, dos = register_and_login(client, "uno@test.io"), register_and_login(client, "dos@test.io")
+    url = "/api/quizzes/attempts/999/submit"
+    assert client.post(url, json={}, headers=uno).status_code == 404
+    assert client.post(url, json={}, headers=uno).status_code == 429
+    assert client.post(url, json={}, headers=dos).status_code == 404  # otro bucket
+
+
+def test_concurrency_fails_fast_and_releases(limited):
+    client = limited.test_client()
+    headers = register_and_login(client, "c@test.io")
+    limiter = limited.extensions["rate_limiter"]
+    assert limiter.backend.acquire("c:me:*", 1)  # un request "en curso"
+    r = client.get("/api/me/profile", headers=headers)
+    assert r.status_code == 429 and r.headers["Retry-After"] == "1"
+    limiter.backend.release("c:me:*")
+    assert client.get("/api/me/profile", headers=headers).status_code == 200
+    assert client.get("/api/me/profile", headers=headers).status_code == 200  # el lugar se liberó
+    assert limiter.stats() == {"me:concurrency": 1}
+
+
+def test_rules_validation():
+    assert "auth.login" not in ratelimit.load_rules('{"auth.login": null}')
+    assert ratelimit.load_rules('{"me": {"rate": "6/minute"}}')["me"]["rate"] == 0.1
+    for raw in ('{"me": {"rate": "10/fortnight"}}', '{"me": {"key": "cookie", "concurrency": 1}}',
+                '{"me": {}}', '[1]', '{"me": {"concurrency": "8"}}', '{"me": {"concurrency": 0}}',
+                '{"me": {"rate": "1/second", "burst": 0}}', '{"me": {"rate": "1/second", "burst": 2.5}}',
+                '{"me": {"burst": 5, "concurrency": 1}}'):
+        with pytest.raises(ValueError):
+            ratelimit.load_rules(raw)
+
+
+def test_counter_backend_is_abstract():
+    class Incompleto(ratelimit.CounterBackend):
+        def take(self, key, rate, burst):
+            return 0.0
+
+    with pytest.raises(TypeError):
+        Incompleto()
@@ -0,0 +1,58 @@
+from app import db
+from app.models import Curso, EstadoCurso
+from app.utils import search
+
+
+def _curso(client, docente, titulo, descripcion="", lecciones=(), publicar=True):
+    cid = client.post("/api/courses/", json={"titulo": titulo, "descripcion": descripcion}, headers=docente).get_json()["id"]
+    for i, (t, contenido) in enumerate(lecciones, 1):
+        client.post(f"/api/courses/{cid}/lessons", json={"titulo": t, "contenido": contenido, "orden": i}, headers=docente)
+    if publicar:
+        client.post(f"/api/courses/{cid}/publish", headers=docente)
+    return cid
+
+
+def _ids(client, q, **params):
+    return [c["id"] for c in client.get("/api/courses/search", query_string={"q": q, **params}).get_json()["items"]]
+
+
+def test_search_covers_lessons_prefix_and_ranking(client, docente):
+    en_titulo = _curso(client, docente, "Programación funcional", "lambdas y cierres")
+    en_leccion = _curso(client, docente, "Algoritmos", lecciones=[("Intro", "programacion dinamica")])
+    borrador = _curso(client, docente, "Programación avanzada", publicar=False)
+
+    assert _ids(client, "program") == [en_titulo, en_leccion]  # prefijo, sin tildes, título pesa más
+    assert borrador not in _ids(client, "avanzada")
+    assert _ids(client, "dinam") == [en_leccion]
+    assert _ids(client, "%%") == []
+
+
+def test_hide_and_update_keep_index_in_sync(client, docente):
+    cid = _curso(client, docente, "Redes neuronales")
+    client.patch(f"/api/courses/{cid}", json={"titulo": "Grafos"}, headers=docente)
+    assert _ids(client, "neuronales") == []
+    assert _ids(client, "grafos") == [cid]
+    client.post(f"/api/courses/{cid}/hide", headers=docente)
+    assert _ids(client, "grafos") == []
+
+
+def test_catalog_rank_sort_and_rebuild_command(app, client, docente):
+    cid = _curso(client, docente, "Bases de datos", "sql")
+    db.session.add(Curso(titulo="SQL práctico", estado=EstadoCurso.PUBLICADO, docente_id=1))
+    db.session.commit()
+    assert [c["id"] for c in client.get("/api/courses/?q=sql&sort=rank").get_json()["items"]] == [cid]
+
+    out = app.test_cli_runner().invoke(args=["rebuild-search"])
+    assert "indexados 2 cursos" in out.output
+    ids = [c["id"] for c in client.get("/api/courses/?q=sql&sort=rank").get_json()["items"]]
+    assert ids[1] == cid and len(ids) == 2
+    assert client.get("/api/courses/?q=sql&sort=rank&cursor=").status_code == 400
+    assert search.enabled()
+
+
+def test_index_created_on_existing_database_is_filled(app, client, docente):
+    cid = _curso(client, docente, "Estadística bayesiana")
+    db.session.execute(db.text("DROP TABLE curso_fts"))  # base anterior al índice FTS5
+    db.session.commit()
+    search.init_search(app)
+    assert _ids(client, "bayes") == [cid]
@@ -0,0 +1,99 @@
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import pytest
+from app.server import PooledWSGIServer, warm
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_pooled_server_keeps_connection_alive(app):
+    sock = socket.create_server(("127.0.0.1", 0))
+    server = PooledWSGIServer(sock, app, threads=2, keepalive=5)
+    t = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05})
+    t.start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", sock.getsockname()[1], timeout=5)
+        for _ in range(2):  # misma conexión: HTTP/1.1 keep-alive
+            conn.request("GET", "/api/health")
+            resp = conn.getresponse()
+            assert resp.status == 200 and resp.read() == b'{"status":"ok"}\n'
+        conn.close()
+    finally:
+        server.shutdown()
+        server.drain()
+        t.join()
+        server.server_close()
+        sock.close()
+
+
+def test_pooled_server_sheds_load_when_queue_is_full(app):
+    sock = socket.create_server(("127.0.0.1", 0))
+    server = PooledWSGIServer(sock, app, threads=1, keepalive=5, max_pending=0)
+    t = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05})
+    t.start()
+    port = sock.getsockname()[1]
+    try:
+        ocioso = socket.create_connection(("127.0.0.1", port))  # retiene el único hilo sin enviar nada
+        deadline = time.monotonic() + 5
+        while server._inflight < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        conn.request("GET", "/api/health")
+        resp = conn.getresponse()
+        assert (resp.status, resp.getheader("Retry-After")) == (503, "1")
+        assert resp.read() == b'{"error":"servidor saturado"}\n' and server.shed == 1
+        ocioso.close()
+        while server._inflight and time.monotonic() < deadline:
+            time.sleep(0.01)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        conn.request("GET", "/api/health")
+        assert conn.getresponse().status == 200
+    finally:
+        server.shutdown()
+        server.drain()
+        t.join()
+        server.server_close()
+        sock.close()
+
+
+def test_warm_preloads_caches(app, quiz):
+    quiz_id, _ = quiz
+    app.extensions["answer_keys"].bump(quiz_id)
+    assert warm(app) == {"quizzes": 1, "cursos": 1}
+    assert app.extensions["answer_keys"].get(quiz_id) is not None
+    assert app.extensions["course_owners"].stats()["size"] == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork requiere os.fork")
+def test_prefork_serves_and_stops_on_sigterm(tmp_path):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'srv.db'}", "SUBMIT_MODE": "sync"}
+    proc = subprocess.Popen([sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port),
+                             "--workers", "2", "--threads", "2"], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        deadline = time.monotonic() + 15
+        while True:
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+                conn.request("GET", "/api/health")
+                assert conn.getresponse().status == 200
+                break
+            except ConnectionRefusedError:
+                assert time.monotonic() < deadline and proc.poll() is None
+                time.sleep(0.05)
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=15) == 0
+        assert b"apagando 2 workers" in proc.stderr.read()
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.stderr.close()
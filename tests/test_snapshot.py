@@ -0,0 +1,80 @@
+import gzip
+import json
+from tests.conftest import register_and_login
+
+
+def _records(body: bytes) -> list:
+    return [json.loads(line) for line in gzip.decompress(body).splitlines()]
+
+
+def test_export_import_roundtrip(client, quiz, docente):
+    quiz_id, preguntas = quiz
+    cid = client.get("/api/courses/mine", headers=docente).get_json()["items"][0]["id"]
+    client.post(f"/api/courses/{cid}/lessons", json={"titulo": "Intro", "orden": 1}, headers=docente)
+    r = client.get(f"/api/courses/{cid}/snapshot", headers=docente)
+    assert r.status_code == 200 and r.mimetype == "application/gzip"
+    recs = _records(r.data)
+    assert recs[0] == {"tipo": "snapshot", "version": 1}
+    assert [x["tipo"] for x in recs].count("opcion") == 2 * len(preguntas)
+
+    otro = register_and_login(client, "otro@test.io", rol="DOCENTE")
+    r = client.post("/api/courses/import?titulo=Copia", data=r.data,
+                    headers={**otro, "Content-Type": "application/gzip"})
+    assert r.status_code == 201
+    nuevo = r.get_json()
+    assert (nuevo["titulo"], nuevo["lecciones"], nuevo["quizzes"], nuevo["preguntas"], nuevo["opciones"]) == \
+        ("Copia", 1, 1, 3, 6)
+    copia = _records(client.get(f"/api/courses/{nuevo['id']}/snapshot", headers=otro).data)
+    assert [x for x in copia if x["tipo"] == "opcion"] != [x for x in recs if x["tipo"] == "opcion"]  # ids remapeados
+    sin_ids = [{k: v for k, v in x.items() if not k.endswith("id") and k != "titulo"} for x in copia]
+    assert sin_ids == [{k: v for k, v in x.items() if not k.endswith("id") and k != "titulo"} for x in recs]
+    assert client.get(f"/api/courses/{nuevo['id']}/metrics", headers=otro).get_json()["lecciones"] == 1
+
+
+def test_plain_ndjson_and_validation(client, docente):
+    lines = [{"tipo": "snapshot", "version": 1}, {"tipo": "curso", "titulo": "Plano"},
+             {"tipo": "quiz", "id": 7, "titulo": "Q"},
+             {"tipo": "pregunta", "id": 1, "quiz_id": 7, "enunciado": "¿?"},
+             {"tipo": "opcion", "pregunta_id": 1, "texto": "si", "correcta": True}]
+    body = "\n".join(json.dumps(x) for x in lines)
+    hdr = {**docente, "Content-Type": "application/x-ndjson"}
+    r = client.post("/api/courses/import", data=body, headers=hdr)
+    assert r.status_code == 201 and r.get_json()["opciones"] == 1
+
+    huerfana = body + "\n" + json.dumps({"tipo": "opcion", "pregunta_id": 99, "texto": "x"})
+    r = client.post("/api/courses/import", data=huerfana, headers=hdr)
+    assert r.status_code == 422 and "pregunta_id" in r.get_json()["error"]
+    assert client.post("/api/courses/import", data=b"\x1f\x8bbasura",
+                       headers={**docente, "Content-Type": "application/gzip"}).status_code == 422
+    assert len(client.get("/api/courses/mine", headers=docente).get_json()["items"]) == 1  # sin restos
+
+
+def test_snapshot_requires_owner(client, docente):
+    cid = client.post("/api/courses/", json={"titulo": "Propio"}, headers=docente).get_json()["id"]
+    otro = register_and_login(client, "otro@test.io", rol="DOCENTE")
+    assert client.get(f"/api/courses/{cid}/snapshot", headers=otro).status_code == 403
+    est = register_and_login(client, "est@test.io")
+    assert client.post("/api/courses/import", data=b"", headers=est).status_code == 403
+
+
+def test_import_rejects_bad_types(client, docente):
+    base = [{"tipo": "snapshot", "version": 1}, {"tipo": "curso", "titulo": "Tipos"},
+            {"tipo": "quiz", "id": 7, "titulo": "Q"},
+            {"tipo": "pregunta", "id": 1, "quiz_id": 7, "enunciado": "¿?"}]
+    hdr = {**docente, "Content-Type": "application/x-ndjson"}
+    malos = [
+        ({"tipo": "leccion", "titulo": "L", "orden": "1"}, "orden"),
+        ({"tipo": "quiz", "id": 8, "titulo": "Q2", "intentos_max": "3"}, "intentos_max"),
+        ({"tipo": "quiz", "id": 8, "titulo": "Q2", "tiempo_limite_min": 1.5}, "tiempo_limite_min"),
+        ({"tipo": "quiz", "id": [8], "titulo": "Q2"}, "id"),
+        ({"tipo": "pregunta", "id": 2, "quiz_id": [7], "enunciado": "x"}, "quiz_id"),
+        ({"tipo": "pregunta", "id": 2, "quiz_id": 7, "enunciado": "x", "tipo_pregunta": "ABIERTA"}, "tipo_pregunta"),
+        ({"tipo": "opcion", "pregunta_id": {"a": 1}, "texto": "x"}, "pregunta_id"),
+        ({"tipo": "opcion", "pregunta_id": 1, "texto": "x", "correcta": "false"}, "correcta"),
+    ]
+    for extra, campo in malos:
+        body = "\n".join(json.dumps(x) for x in base + [extra])
+        r = client.post("/api/courses/import", data=body, headers=hdr)
+        assert r.status_code == 422, extra
+        assert r.get_json()["error"].startswith("línea ") and campo in r.get_json()["error"]
+    assert client.get("/api/courses/mine", headers=docente).get_json()["items"] == []
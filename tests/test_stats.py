@@ -0,0 +1,36 @@
+from app import db
+from app.models import CursoStats
+
+
+def _metrics(client, cid, headers):
+    return client.get(f"/api/courses/{cid}/metrics", headers=headers).get_json()
+
+
+def test_write_paths_keep_stats_incrementally(client, docente, estudiante, quiz, sql_log):
+    quiz_id, preguntas = quiz
+    cid = 1
+    client.post(f"/api/courses/{cid}/lessons", json={"titulo": "L1"}, headers=docente)
+    client.post(f"/api/courses/{cid}/enroll", headers=estudiante)
+    for respuestas in ({str(p): ok for p, ok, _ in preguntas}, {}):
+        intento = client.post(f"/api/quizzes/{quiz_id}/attempts", headers=estudiante).get_json()["intento_id"]
+        client.post(f"/api/quizzes/attempts/{intento}/submit", json={"respuestas": respuestas}, headers=estudiante)
+
+    del sql_log[:]
+    m = _metrics(client, cid, docente)
+    assert m == {"inscritos": 1, "lecciones": 1, "intentos": 2, "promedio": 50.0, "tasa_completado": 0.0}
+    assert len(sql_log) == 1 and "FROM curso_stats" in sql_log[0]
+
+
+def test_reconcile_rebuilds_from_scratch(app, client, docente, estudiante, quiz):
+    client.post("/api/courses/1/enroll", headers=estudiante)
+    esperado = _metrics(client, 1, docente)
+    CursoStats.query.delete()
+    db.session.commit()
+    assert _metrics(client, 1, docente) == esperado  # materializa en el primer acceso
+
+    db.session.get(CursoStats, 1).inscritos = 99
+    db.session.commit()
+    out = app.test_cli_runner().invoke(args=["reconcile-stats"])
+    assert "reconciliados 1 cursos" in out.output
+    assert _metrics(client, 1, docente) == esperado
+    assert client.get("/api/courses/42/metrics", headers=docente).status_code == 404
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models import IntentoQuiz, EntregaPendiente, CursoStats, RespuestaIntento
+from app.utils import submissions, attempts
+from tests.conftest import register_and_login
+
+
+@pytest.fixture()
+def queue_mode(app):
+    app.config["SUBMIT_MODE"] = "queue"
+
+
+def _submit(client, quiz, headers, correctas=3):
+    quiz_id, preguntas = quiz
+    it = client.post(f"/api/quizzes/{quiz_id}/attempts", headers=headers).get_json()
+    resp = {str(p): (ok if i < correctas else mal) for i, (p, ok, mal) in enumerate(preguntas)}
+    return it["intento_id"], client.post(f"/api/quizzes/attempts/{it['intento_id']}/submit",
+                                         json={"respuestas": resp}, headers=headers)
+
+
+def test_queued_submit_returns_ticket_and_result_after_processing(client, quiz, estudiante, queue_mode):
+    intento_id, r = _submit(client, quiz, estudiante, correctas=2)
+    assert r.status_code == 202
+    ticket = r.get_json()["ticket"]
+    assert r.headers["Location"] == f"/api/quizzes/submissions/{ticket}"
+    pendiente = client.get(f"/api/quizzes/submissions/{ticket}", headers=estudiante)
+    assert pendiente.get_json()["estado"] == "PENDIENTE" and pendiente.headers["Retry-After"] == "1"
+    assert db.session.get(IntentoQuiz, intento_id).entregado is False
+
+    assert submissions.drain() == 1
+    body = client.get(f"/api/quizzes/submissions/{ticket}", headers=estudiante).get_json()
+    assert body["estado"] == "LISTO"
+    assert body["resultado"] == {"correctas": 2, "total": 3, "puntaje": 67}
+    db.session.expire_all()
+    assert db.session.get(IntentoQuiz, intento_id).puntaje == 67
+    assert RespuestaIntento.query.filter_by(intento_id=intento_id).count() == 3
+
+
+def test_duplicate_enqueue_is_rejected(client, quiz, estudiante, queue_mode):
+    intento_id, r = _submit(client, quiz, estudiante)
+    assert r.status_code == 202
+    again = client.post(f"/api/quizzes/attempts/{intento_id}/submit", json={"respuestas": {}}, headers=estudiante)
+    assert again.status_code == 409
+    assert EntregaPendiente.query.count() == 1
+
+
+def test_ticket_is_private(client, quiz, estudiante, queue_mode):
+    _, r = _submit(client, quiz, estudiante)
+    otro = register_and_login(client, "otro@test.io")
+    assert client.get(f"/api/quizzes/submissions/{r.get_json()['ticket']}", headers=otro).status_code == 403
+
+
+def test_batch_writes_all_results_in_one_transaction(client, quiz, queue_mode, sql_log):
+    for i in range(5):
+        _submit(client, quiz, register_and_login(client, f"e{i}@test.io"), correctas=i % 4)
+    sql_log.clear()
+    assert submissions.process_pending(batch_size=10) == 5
+    inserts = [s for s in sql_log if s.startswith("INSERT INTO respuesta_intento")]
+    assert len(inserts) == 1
+    assert EntregaPendiente.query.filter_by(estado="LISTO").count() == 5
+    assert CursoStats.query.one().intentos == 5
+
+
+def test_time_in_queue_does_not_count_as_late(client, quiz, estudiante, queue_mode):
+    intento_id, r = _submit(client, quiz, estudiante)
+    it = db.session.get(IntentoQuiz, intento_id)
+    # vence justo después de encolar: al correr el worker ya pasó el deadline
+    it.limite = EntregaPendiente.query.one().creado + timedelta(milliseconds=1)
+    db.session.commit()
+    assert it.limite < datetime.utcnow()
+    # el sweeper tampoco debe cerrarlo mientras está en cola
+    assert attempts.sweep(now=datetime.utcnow() + timedelta(minutes=5)) == 0
+    submissions.drain()
+    assert EntregaPendiente.query.one().estado == "LISTO"
+
+
+def test_stale_claims_are_retaken(client, quiz, estudiante, queue_mode):
+    _submit(client, quiz, estudiante)
+    submissions.claim(10, claim_timeout=60)  # worker que muere sin procesar
+    assert submissions.process_pending(claim_timeout=60) == 0
+    db.session.query(EntregaPendiente).update({"tomado_en": datetime.utcnow() - timedelta(minutes=5)})
+    db.session.commit()
+    assert submissions.process_pending(claim_timeout=60) == 1